@@ -0,0 +1 @@
+"""Micro-benchmarks for the keycloak_auth hot path (not shipped in the wheel)."""
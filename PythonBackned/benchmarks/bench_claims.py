@@ -0,0 +1,91 @@
+"""Compare per-request cost of ``TokenClaims`` vs ``TrustedTokenClaims``.
+
+Run from ``PythonBackned/``::
+
+    python -m benchmarks.bench_claims
+
+Each case builds the claims object from a verified payload and reads the
+values a typical request handler touches (``sub``, realm roles and one
+client's roles).
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+import tracemalloc
+from typing import Any
+
+from keycloak_auth.models import TokenClaims, TrustedTokenClaims
+
+
+def make_payload(clients: int, roles_per_client: int) -> dict[str, Any]:
+    return {
+        "sub": "f3b1c2d4-0000-4000-8000-000000000000",
+        "exp": 4102444800,
+        "iat": 4102441200,
+        "iss": "http://localhost:8080/realms/myrealm",
+        "aud": "account",
+        "azp": "my-angular-app",
+        "preferred_username": "alice",
+        "email": "alice@example.com",
+        "email_verified": True,
+        "name": "Alice Example",
+        "scope": "openid profile email",
+        "realm_access": {"roles": ["offline_access", "uma_authorization", "user"]},
+        "resource_access": {
+            f"client-{c}": {"roles": [f"role-{r}" for r in range(roles_per_client)]}
+            for c in range(clients)
+        },
+    }
+
+
+def _use(claims: Any) -> None:
+    claims.sub
+    "user" in claims.realm_roles
+    "role-1" in claims.client_roles("client-0")
+
+
+def _pydantic(payload: dict[str, Any]) -> None:
+    _use(TokenClaims(**payload, raw=payload))
+
+
+def _trusted(payload: dict[str, Any]) -> None:
+    _use(TrustedTokenClaims(payload))
+
+
+def _per_call_us(fn, payload: dict[str, Any], number: int) -> float:
+    best = min(timeit.repeat(lambda: fn(payload), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def _retained_bytes(cls_factory, payload: dict[str, Any], count: int = 1000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [cls_factory(payload) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+CASES = {
+    "small": make_payload(clients=2, roles_per_client=3),
+    "large": make_payload(clients=50, roles_per_client=20),
+}
+
+
+def main(number: int = 20_000) -> None:
+    print(f"{'case':<8}{'TokenClaims us':>16}{'Trusted us':>12}{'speedup':>9}"
+          f"{'TokenClaims B':>15}{'Trusted B':>11}")
+    for name, payload in CASES.items():
+        slow = _per_call_us(_pydantic, payload, number)
+        fast = _per_call_us(_trusted, payload, number)
+        slow_mem = _retained_bytes(lambda p: TokenClaims(**p, raw=p), payload)
+        fast_mem = _retained_bytes(TrustedTokenClaims, payload)
+        print(f"{name:<8}{slow:>16.2f}{fast:>12.2f}{slow / fast:>8.1f}x"
+              f"{slow_mem:>15.0f}{fast_mem:>11.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,81 @@
+"""Throughput of async JWKS validation per execution strategy and pool size.
+
+Run from ``PythonBackned/``::
+
+    python -m benchmarks.bench_executor [tokens] [concurrency]
+
+Every token is distinct and the verified-token cache is off, so each
+request pays for a full RS256 verification. On a standard (GIL) build the
+thread pool mainly keeps the loop free; scaling beyond one core shows up
+with the process pool, or with threads on a free-threaded build.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from keycloak_auth import KeycloakSettings
+from keycloak_auth.executors import (
+    FREE_THREADED,
+    InlineExecutor,
+    ProcessPoolVerificationExecutor,
+    ThreadPoolVerificationExecutor,
+    VerificationExecutor,
+)
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.validators import AsyncJWKSTokenValidator
+
+from .common import BenchKeys
+
+POOL_SIZES = (1, 2, 4, 8)
+
+
+def make_fixture(count: int) -> tuple[KeycloakSettings, JWKSKeyManager, list[str]]:
+    settings = KeycloakSettings(server_url="http://kc.invalid", realm="bench")
+    keys = BenchKeys(settings)
+    tokens = [keys.make_token({"sub": f"user-{i}"}) for i in range(count)]
+    return settings, keys.key_manager(), tokens
+
+
+async def _drive(validator: AsyncJWKSTokenValidator, tokens: list[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(token: str) -> None:
+        async with semaphore:
+            await validator.validate(token)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(t) for t in tokens))
+    return len(tokens) / (time.perf_counter() - started)
+
+
+def run(count: int = 2000, concurrency: int = 64) -> list[dict]:
+    settings, manager, tokens = make_fixture(count)
+    strategies: list[tuple[str, int, VerificationExecutor]] = [("inline", 1, InlineExecutor())]
+    strategies += [("thread", n, ThreadPoolVerificationExecutor(n)) for n in POOL_SIZES]
+    strategies += [("process", n, ProcessPoolVerificationExecutor(n)) for n in POOL_SIZES]
+
+    results = []
+    for kind, workers, executor in strategies:
+        validator = AsyncJWKSTokenValidator(settings, key_manager=manager, executor=executor)
+        # Warm up pools (process start-up, per-worker key parsing).
+        asyncio.run(_drive(validator, tokens[: workers * 4], concurrency))
+        ops = asyncio.run(_drive(validator, tokens, concurrency))
+        executor.shutdown()
+        results.append({"executor": kind, "workers": workers, "ops_per_sec": round(ops, 1)})
+    return results
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    print(f"free-threaded build: {FREE_THREADED}")
+    print(f"{'executor':<10}{'workers':>8}{'ops/sec':>12}")
+    for row in run(count, concurrency):
+        print(f"{row['executor']:<10}{row['workers']:>8}{row['ops_per_sec']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Cold-start cost of importing keycloak_auth.
+
+Run from ``PythonBackned/``::
+
+    python -m benchmarks.bench_import [runs]
+
+Each statement runs in a fresh interpreter *runs* times (default 15);
+the median wall time is reported next to a bare interpreter start, so
+the difference is what the import adds to every worker start.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STATEMENTS = {
+    "python -c pass": "pass",
+    "import keycloak_auth": "import keycloak_auth",
+    "KeycloakSettings": "from keycloak_auth import KeycloakSettings",
+    "Authenticator (JWKS)": "from keycloak_auth import Authenticator",
+    "+ keycloak_auth.fastapi": (
+        "from keycloak_auth import Authenticator\n"
+        "import keycloak_auth.fastapi"
+    ),
+}
+
+
+def median_ms(statement: str, runs: int, cwd: str) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=cwd, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    with tempfile.TemporaryDirectory() as cwd:  # no config.yaml here
+        baseline = median_ms("pass", runs, cwd)
+        print(f"{'statement':<28}{'median ms':>12}{'added ms':>12}")
+        for label, statement in STATEMENTS.items():
+            ms = baseline if statement == "pass" else median_ms(statement, runs, cwd)
+            print(f"{label:<28}{ms:>12.1f}{ms - baseline:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
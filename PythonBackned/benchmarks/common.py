@@ -0,0 +1,78 @@
+"""Shared fixtures for the benchmarks: a signing key, its JWKS and tokens.
+
+Mirrors ``tests/conftest.py`` (``make_token``) but without pytest, and
+wires a :class:`JWKSKeyManager` to the in-memory JWKS so no benchmark
+touches the network.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from functools import cached_property
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from keycloak_auth import KeycloakSettings
+from keycloak_auth.jwks import JWKSKeyManager
+
+KID = "bench-key"
+
+
+class BenchKeys:
+    """An RSA key pair published as a one-key JWKS."""
+
+    def __init__(self, settings: KeycloakSettings):
+        self.settings = settings
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    @cached_property
+    def jwks(self) -> dict[str, Any]:
+        jwk = json.loads(
+            jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key())
+        )
+        jwk.update({"kid": KID, "alg": "RS256", "use": "sig"})
+        return {"keys": [jwk]}
+
+    def key_manager(self, settings: KeycloakSettings | None = None) -> JWKSKeyManager:
+        """A warmed-up key manager that serves :attr:`jwks` without HTTP."""
+        manager = JWKSKeyManager(settings or self.settings)
+        attach_jwks(manager, self.jwks)
+        manager.refresh()
+        return manager
+
+    def make_token(self, claims: dict[str, Any] | None = None, **headers: Any) -> str:
+        now = int(time.time())
+        payload: dict[str, Any] = {
+            "sub": "user-123",
+            "iss": self.settings.issuer,
+            "iat": now,
+            "exp": now + 3600,
+            "preferred_username": "benchuser",
+            "email": "bench@example.com",
+            "name": "Bench User",
+            "realm_access": {"roles": ["user", "admin"]},
+            "resource_access": {},
+            "scope": "openid profile email",
+        }
+        payload.update(claims or {})
+        return jwt.encode(
+            payload,
+            self.private_key,
+            algorithm="RS256",
+            headers={"kid": KID, **headers},
+        )
+
+
+def attach_jwks(manager: JWKSKeyManager, jwks: dict[str, Any]) -> None:
+    """Make *manager* fetch *jwks* from memory instead of the JWKS endpoint."""
+    manager._client.fetch_data = lambda: jwks
+
+
+def large_resource_access(clients: int = 50, roles_per_client: int = 20) -> dict[str, Any]:
+    return {
+        f"client-{c}": {"roles": [f"role-{r}" for r in range(roles_per_client)]}
+        for c in range(clients)
+    }
@@ -0,0 +1,356 @@
+"""A Keycloak stand-in for load tests: one realm, served as a plain ASGI app.
+
+Run it on its own from ``PythonBackned/``::
+
+    python -m benchmarks.fake_keycloak --port 8081 --latency 0.02 --rotate-every 60
+
+or embed it with :func:`serve_in_thread` (as ``benchmarks.loadtest`` does).
+It implements the endpoints ``keycloak_auth`` talks to, under
+``/realms/<realm>/protocol/openid-connect``:
+
+  - ``GET  /certs`` – the JWKS: the current signing key plus the
+    previous ``keep_keys - 1`` keys, as Keycloak keeps rotated keys
+    published until their tokens have expired.
+  - ``POST /token/introspect`` – RFC 7662 introspection for registered
+    clients; a token is active when its signature, issuer and expiry check
+    out against the published keys.
+  - ``POST /token`` – ``client_credentials`` and ``password`` grants.
+
+Every request waits ``latency`` (plus up to ``jitter``) seconds and fails
+with 503 at ``failure_rate``; keys rotate every ``rotate_every`` seconds
+or on :meth:`FakeKeycloak.rotate`. Request counts per endpoint and status
+are kept in :attr:`FakeKeycloak.stats`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qs
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+DEFAULT_CLIENTS = {"loadtest-client": "loadtest-secret"}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    private_key: rsa.RSAPrivateKey
+    jwk: dict[str, Any]
+
+    @classmethod
+    def generate(cls) -> SigningKey:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        kid = uuid.uuid4().hex
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+        return cls(kid, private_key, jwk)
+
+
+class FakeKeycloak:
+    """ASGI app emulating one Keycloak realm (see the module docstring)."""
+
+    def __init__(
+        self,
+        realm: str = "loadtest",
+        base_url: str = "http://127.0.0.1:8081",
+        *,
+        clients: Mapping[str, str] = DEFAULT_CLIENTS,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        rotate_every: float = 0.0,
+        keep_keys: int = 2,
+        token_lifespan: int = 300,
+        seed: int | None = None,
+    ):
+        self.realm = realm
+        self.base_url = base_url
+        self.clients = dict(clients)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rotate_every = rotate_every
+        self.keep_keys = max(1, keep_keys)
+        self.token_lifespan = token_lifespan
+        self.stats: Counter[tuple[str, int]] = Counter()
+        self._random = random.Random(seed)
+        self._keys = [SigningKey.generate()]
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+        prefix = f"/realms/{realm}/protocol/openid-connect"
+        self._routes: dict[tuple[str, str], tuple[str, Callable[..., Any]]] = {
+            ("GET", f"{prefix}/certs"): ("certs", self._certs),
+            ("POST", f"{prefix}/token/introspect"): ("introspect", self._introspect),
+            ("POST", f"{prefix}/token"): ("token", self._token),
+        }
+
+    # --- Realm state -------------------------------------------------------
+
+    @property
+    def issuer(self) -> str:
+        return f"{self.base_url}/realms/{self.realm}"
+
+    @property
+    def jwks(self) -> dict[str, Any]:
+        self._maybe_rotate()
+        return {"keys": [key.jwk for key in self._keys]}
+
+    @property
+    def current_kid(self) -> str:
+        self._maybe_rotate()
+        return self._keys[0].kid
+
+    def rotate(self) -> SigningKey:
+        """Sign with a new key from now on; keep ``keep_keys`` published."""
+        key = SigningKey.generate()
+        with self._lock:
+            self._keys = [key, *self._keys][: self.keep_keys]
+            self._rotated_at = time.monotonic()
+        return key
+
+    def issue_token(
+        self,
+        claims: Mapping[str, Any] | None = None,
+        *,
+        lifespan: int | None = None,
+        key: SigningKey | None = None,
+    ) -> str:
+        """A signed access token for ``user-1`` unless *claims* say otherwise."""
+        self._maybe_rotate()
+        key = key or self._keys[0]
+        now = int(time.time())
+        payload: dict[str, Any] = {
+            "jti": uuid.uuid4().hex,
+            "sub": "user-1",
+            "iss": self.issuer,
+            "iat": now,
+            "exp": now + (self.token_lifespan if lifespan is None else lifespan),
+            "typ": "Bearer",
+            "azp": next(iter(self.clients), "account"),
+            "sid": uuid.uuid4().hex,
+            "preferred_username": "user-1",
+            "realm_access": {"roles": ["user"]},
+            "resource_access": {},
+            "scope": "openid profile email",
+        }
+        payload.update(claims or {})
+        return jwt.encode(
+            payload, key.private_key, algorithm="RS256", headers={"kid": key.kid}
+        )
+
+    def _maybe_rotate(self) -> None:
+        due = time.monotonic() - self._rotated_at >= self.rotate_every
+        if self.rotate_every and due:
+            self.rotate()
+
+    # --- ASGI ----------------------------------------------------------------
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        route = self._routes.get((scope["method"], scope["path"]))
+        if route is None:
+            await _send_json(send, 404, {"error": "not_found"})
+            return
+        name, handler = route
+        body = await _read_body(receive)
+        delay = self.latency + self._random.random() * self.jitter
+        if delay:
+            await asyncio.sleep(delay)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            status, payload = 503, {"error": "temporarily_unavailable"}
+        else:
+            status, payload = handler(scope, parse_qs(body.decode("latin-1")))
+        self.stats[name, status] += 1
+        await _send_json(send, status, payload)
+
+    # --- Endpoints -----------------------------------------------------------
+
+    def _certs(self, scope: Scope, form: dict[str, list[str]]) -> tuple[int, Any]:
+        return 200, self.jwks
+
+    def _introspect(self, scope: Scope, form: dict[str, list[str]]) -> tuple[int, Any]:
+        if self._client_id(scope, form) is None:
+            return 401, {"error": "invalid_client"}
+        claims = self._verify(_first(form, "token") or "")
+        if claims is None:
+            return 200, {"active": False}
+        return 200, {**claims, "active": True, "client_id": claims.get("azp")}
+
+    def _token(self, scope: Scope, form: dict[str, list[str]]) -> tuple[int, Any]:
+        client_id = self._client_id(scope, form)
+        if client_id is None:
+            return 401, {"error": "invalid_client"}
+        grant = _first(form, "grant_type")
+        if grant == "client_credentials":
+            claims = {
+                "sub": f"service-account-{client_id}",
+                "preferred_username": f"service-account-{client_id}",
+                "azp": client_id,
+                "sid": None,
+            }
+        elif grant == "password" and _first(form, "username"):
+            username = _first(form, "username")
+            claims = {"sub": username, "preferred_username": username, "azp": client_id}
+        else:
+            return 400, {"error": "unsupported_grant_type"}
+        token = self.issue_token({k: v for k, v in claims.items() if v is not None})
+        return 200, {
+            "access_token": token,
+            "expires_in": self.token_lifespan,
+            "token_type": "Bearer",
+            "scope": "openid profile email",
+        }
+
+    def _client_id(self, scope: Scope, form: dict[str, list[str]]) -> str | None:
+        client_id, secret = _first(form, "client_id"), _first(form, "client_secret")
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:6].lower() == b"basic ":
+                decoded = base64.b64decode(value[6:]).decode()
+                client_id, _, secret = decoded.partition(":")
+        if client_id is None or self.clients.get(client_id) != secret:
+            return None
+        return client_id
+
+    def _verify(self, token: str) -> dict[str, Any] | None:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            return None
+        for key in self._keys:
+            if key.kid == kid:
+                try:
+                    return jwt.decode(
+                        token,
+                        key.private_key.public_key(),
+                        algorithms=["RS256"],
+                        issuer=self.issuer,
+                        options={"verify_aud": False},
+                    )
+                except jwt.InvalidTokenError:
+                    return None
+        return None
+
+
+def _first(form: dict[str, list[str]], name: str) -> str | None:
+    values = form.get(name)
+    return values[0] if values else None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send_json(send: Send, status: int, payload: Any) -> None:
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+# --- Serving -------------------------------------------------------------------
+
+class RunningServer:
+    """A uvicorn server running :class:`FakeKeycloak` on a daemon thread."""
+
+    def __init__(self, server: Any, thread: threading.Thread):
+        self._server = server
+        self._thread = thread
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def serve_in_thread(fake: FakeKeycloak, host: str = "127.0.0.1") -> RunningServer:
+    """Serve *fake* on a free local port and point its ``base_url`` there."""
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind((host, 0))
+    fake.base_url = f"http://{host}:{sock.getsockname()[1]}"
+    config = uvicorn.Config(fake, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(
+        target=server.run, kwargs={"sockets": [sock]}, name="fake-keycloak", daemon=True
+    )
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("fake Keycloak did not start")
+        time.sleep(0.01)
+    return RunningServer(server, thread)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--realm", default="loadtest")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rotate-every", type=float, default=0.0, help="seconds")
+    parser.add_argument("--token-lifespan", type=int, default=300, help="seconds")
+    args = parser.parse_args(argv)
+
+    fake = FakeKeycloak(
+        args.realm,
+        f"http://{args.host}:{args.port}",
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        rotate_every=args.rotate_every,
+        token_lifespan=args.token_lifespan,
+    )
+    client_id, secret = next(iter(fake.clients.items()))
+    print(f"issuer:  {fake.issuer}\nclient:  {client_id} / {secret}")
+    print(f"token:   {fake.issue_token(lifespan=86400)}")
+    uvicorn.run(fake, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""End-to-end load test of ``app.main:app`` against a local fake Keycloak.
+
+Run from ``PythonBackned/``::
+
+    python -m benchmarks.loadtest                                 # 10 s, JWKS only
+    python -m benchmarks.loadtest --rotate-every 3                # key rotation
+    python -m benchmarks.loadtest --introspect-sample-rate 1      # introspect all
+    python -m benchmarks.loadtest --latency 0.05 --failure-rate 0.2 \\
+        --mix valid=50,expired=20,unknown_kid=20,garbage=10
+
+:mod:`benchmarks.fake_keycloak` runs on a local port and the app is
+configured (through ``KEYCLOAK_*`` variables) to use it, so JWKS fetches
+and introspection calls go over real HTTP. Requests reach the app in
+process through ``httpx.ASGITransport``; ``--concurrency`` workers send
+them for ``--duration`` seconds.
+
+Each request draws a token kind from ``--mix``:
+
+  - ``valid`` / ``admin`` – ``/api/profile`` and ``/api/admin`` (200);
+  - ``forbidden`` – ``/api/admin`` without the admin role (403);
+  - ``expired``, ``unknown_kid`` (signed by an unpublished key),
+    ``garbage`` and ``missing`` (no header) – 401.
+
+Tokens come from a pool of ``--users`` subjects, reissued with the new
+key after every rotation. The report shows throughput, latency
+percentiles and status codes per kind (statuses a kind should not get
+are counted as errors), and the requests the fake Keycloak served.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import httpx
+
+from .fake_keycloak import FakeKeycloak, SigningKey, serve_in_thread
+
+EXPECTED_STATUS = {
+    "valid": 200,
+    "admin": 200,
+    "forbidden": 403,
+    "expired": 401,
+    "unknown_kid": 401,
+    "garbage": 401,
+    "missing": 401,
+}
+DEFAULT_MIX = "valid=85,admin=5,forbidden=2,expired=3,unknown_kid=2,garbage=2,missing=1"
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """``"valid=90,expired=10"`` -> ``{"valid": 90.0, "expired": 10.0}``."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in EXPECTED_STATUS:
+            raise argparse.ArgumentTypeError(
+                f"unknown token kind {name!r}; choose from {', '.join(EXPECTED_STATUS)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class TokenPool:
+    """Tokens per kind for ``users`` subjects, reissued after a key rotation."""
+
+    def __init__(self, fake: FakeKeycloak, users: int):
+        self._fake = fake
+        self._users = users
+        self._rogue_key = SigningKey.generate()
+        self._kid: str | None = None
+        self._tokens: dict[str, list[str]] = {}
+
+    def get(self, kind: str, rng: random.Random) -> str | None:
+        if self._kid != self._fake.current_kid:
+            self._issue()
+        tokens = self._tokens.get(kind)
+        return rng.choice(tokens) if tokens else None
+
+    def _issue(self) -> None:
+        fake = self._fake
+        self._kid = fake.current_kid
+        users = [f"user-{i}" for i in range(self._users)]
+        admin = {"realm_access": {"roles": ["user", "admin"]}}
+        self._tokens = {
+            "valid": [fake.issue_token({"sub": u}) for u in users],
+            "admin": [fake.issue_token({"sub": u, **admin}) for u in users],
+            "forbidden": [fake.issue_token({"sub": u}) for u in users],
+            "expired": [fake.issue_token({"sub": u}, lifespan=-60) for u in users],
+            "unknown_kid": [
+                fake.issue_token({"sub": u}, key=self._rogue_key) for u in users
+            ],
+            "garbage": ["not-a-jwt", "a.b.c", "eyJhbGciOiJub25lIn0.e30."],
+        }
+
+
+@dataclass
+class KindStats:
+    latencies_ns: list[int] = field(default_factory=list)
+    statuses: Counter[int] = field(default_factory=Counter)
+    errors: int = 0
+
+
+@dataclass
+class KindReport:
+    kind: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    statuses: dict[str, int]
+
+
+def _percentile(sorted_ns: list[int], pct: float) -> float:
+    if not sorted_ns:
+        return 0.0
+    index = min(len(sorted_ns) - 1, int(round(pct / 100 * (len(sorted_ns) - 1))))
+    return round(sorted_ns[index] / 1e6, 3)
+
+
+def configure_app(fake: FakeKeycloak, args: argparse.Namespace) -> Any:
+    """Point ``app.main`` at *fake* and import it."""
+    client_id, secret = next(iter(fake.clients.items()))
+    os.environ.update({
+        "KEYCLOAK_SERVER_URL": fake.base_url,
+        "KEYCLOAK_REALM": fake.realm,
+        "KEYCLOAK_CLIENT_ID": client_id,
+        "KEYCLOAK_CLIENT_SECRET": secret,
+        "KEYCLOAK_TOKEN_CACHE_SIZE": str(args.token_cache_size),
+        "KEYCLOAK_INTROSPECTION_CACHE_TTL": str(args.introspection_cache_ttl),
+        "KEYCLOAK_INTROSPECT_SAMPLE_RATE": str(args.introspect_sample_rate),
+        "KEYCLOAK_VERIFY_EXECUTOR": args.executor,
+        "KEYCLOAK_JWKS_UNKNOWN_KID_INTERVAL": str(args.unknown_kid_interval),
+        "KEYCLOAK_METRICS_ENABLED": "true",
+        "KEYCLOAK_MULTI_REALM": "false",
+    })
+    from app import main  # imported late so the environment above applies
+
+    return main
+
+
+async def drive(
+    app: Any, pool: TokenPool, mix: dict[str, float], args: argparse.Namespace
+) -> tuple[dict[str, KindStats], float]:
+    kinds, weights = list(mix), list(mix.values())
+    stats: dict[str, KindStats] = defaultdict(KindStats)
+    clock = time.perf_counter_ns
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://loadtest"
+    )
+
+    async def _worker(seed: int, deadline: float) -> None:
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            token = pool.get(kind, rng)
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            path = "/api/admin" if kind in ("admin", "forbidden") else "/api/profile"
+            t0 = clock()
+            response = await client.get(path, headers=headers)
+            entry = stats[kind]
+            entry.latencies_ns.append(clock() - t0)
+            entry.statuses[response.status_code] += 1
+            if response.status_code != EXPECTED_STATUS[kind]:
+                entry.errors += 1
+
+    async with client:
+        started = time.perf_counter()
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            *(_worker(args.seed + i, deadline) for i in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+def summarise(stats: dict[str, KindStats]) -> list[KindReport]:
+    reports = []
+    for kind in EXPECTED_STATUS:
+        entry = stats.get(kind)
+        if entry is None:
+            continue
+        samples = sorted(entry.latencies_ns)
+        reports.append(KindReport(
+            kind=kind,
+            requests=len(samples),
+            errors=entry.errors,
+            p50_ms=_percentile(samples, 50),
+            p95_ms=_percentile(samples, 95),
+            p99_ms=_percentile(samples, 99),
+            statuses={str(s): n for s, n in sorted(entry.statuses.items())},
+        ))
+    return reports
+
+
+def _print_report(
+    reports: list[KindReport], elapsed: float, fake: FakeKeycloak
+) -> None:
+    total = sum(r.requests for r in reports)
+    print(f"{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s")
+    print(f"{'kind':<14}{'requests':>10}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}  statuses")
+    for r in reports:
+        statuses = " ".join(f"{s}:{n}" for s, n in r.statuses.items())
+        print(f"{r.kind:<14}{r.requests:>10}{r.errors:>8}{r.p50_ms:>9.2f}"
+              f"{r.p95_ms:>9.2f}{r.p99_ms:>9.2f}  {statuses}")
+    print("fake keycloak: " + (", ".join(
+        f"{name} {status}: {count}"
+        for (name, status), count in sorted(fake.stats.items())
+    ) or "no requests"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--users", type=int, default=100, help="distinct subjects")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="fake Keycloak response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="fraction of fake Keycloak responses that are 503")
+    parser.add_argument("--rotate-every", type=float, default=0.0,
+                        help="rotate the signing key every N seconds")
+    parser.add_argument("--unknown-kid-interval", type=float, default=10.0,
+                        help="jwks_unknown_kid_interval of the app (seconds)")
+    parser.add_argument("--token-cache-size", type=int, default=10000)
+    parser.add_argument("--introspection-cache-ttl", type=int, default=0)
+    parser.add_argument("--introspect-sample-rate", type=float, default=0.0)
+    parser.add_argument("--executor", choices=("inline", "thread", "process"),
+                        default="thread")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--show-metrics", action="store_true",
+                        help="print the app's Prometheus metrics afterwards")
+    args = parser.parse_args(argv)
+
+    fake = FakeKeycloak(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        rotate_every=args.rotate_every,
+        keep_keys=5,
+        token_lifespan=3600,
+        seed=args.seed,
+    )
+    server = serve_in_thread(fake)
+    try:
+        app_module = configure_app(fake, args)
+        pool = TokenPool(fake, args.users)
+        stats, elapsed = asyncio.run(drive(app_module.app, pool, args.mix, args))
+    finally:
+        server.stop()
+
+    reports = summarise(stats)
+    _print_report(reports, elapsed, fake)
+    if args.show_metrics and app_module.metrics is not None:
+        print(app_module.metrics.render())
+    if args.output:
+        document = {
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+            "elapsed": round(elapsed, 3),
+            "results": [asdict(r) for r in reports],
+            "keycloak": [
+                {"endpoint": name, "status": status, "count": count}
+                for (name, status), count in sorted(fake.stats.items())
+            ],
+        }
+        with open(args.output, "w") as fh:
+            json.dump(document, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Benchmark suite for the authentication hot path.
+
+Run from ``PythonBackned/``::
+
+    python -m benchmarks.suite                        # print a table
+    python -m benchmarks.suite --output bench.json    # also write JSON
+    python -m benchmarks.suite --baseline bench.json  # compare, exit 1 on regression
+    python -m benchmarks.suite -k jwks -k claims      # only matching cases
+
+Every case reports ops/sec and p50/p95/p99 latency in microseconds.
+Results are plain JSON so a stored baseline can be diffed in CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+from keycloak_auth import Authenticator, KeycloakSettings
+from keycloak_auth.cache import TokenCache
+from keycloak_auth.models import TokenClaims, TrustedTokenClaims
+from keycloak_auth.validators import IntrospectionTokenValidator, JWKSTokenValidator
+
+from .common import BenchKeys, attach_jwks, large_resource_access
+
+
+@dataclass
+class Result:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+
+
+def _percentile(sorted_ns: list[int], pct: float) -> float:
+    index = min(len(sorted_ns) - 1, int(round(pct / 100 * (len(sorted_ns) - 1))))
+    return sorted_ns[index] / 1000
+
+
+def _summarise(name: str, samples: list[int], elapsed: float) -> Result:
+    samples.sort()
+    return Result(
+        name=name,
+        iterations=len(samples),
+        ops_per_sec=round(len(samples) / elapsed, 1),
+        p50_us=round(_percentile(samples, 50), 2),
+        p95_us=round(_percentile(samples, 95), 2),
+        p99_us=round(_percentile(samples, 99), 2),
+    )
+
+
+def measure(name: str, fn: Callable[[], Any], iterations: int, warmup: int) -> Result:
+    for _ in range(warmup):
+        fn()
+    clock = time.perf_counter_ns
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    return _summarise(name, samples, time.perf_counter() - started)
+
+
+def measure_async(
+    name: str, fn: Callable[[], Awaitable[Any]], iterations: int, warmup: int
+) -> Result:
+    async def _run() -> Result:
+        for _ in range(warmup):
+            await fn()
+        clock = time.perf_counter_ns
+        samples = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = clock()
+            await fn()
+            samples.append(clock() - t0)
+        return _summarise(name, samples, time.perf_counter() - started)
+
+    return asyncio.run(_run())
+
+
+# --- Cases -----------------------------------------------------------------
+
+SETTINGS = KeycloakSettings(
+    server_url="http://kc.invalid",
+    realm="bench",
+    client_id="bench-client",
+    client_secret="bench-secret",
+)
+
+
+def case_authenticate_jwks(keys: BenchKeys, n: int) -> Result:
+    validator = JWKSTokenValidator(SETTINGS, key_manager=keys.key_manager())
+    auth = Authenticator(SETTINGS, validator=validator)
+    token = keys.make_token()
+    return measure("authenticate_jwks", lambda: auth.authenticate(token), n, n // 10)
+
+
+def case_authenticate_jwks_cached(keys: BenchKeys, n: int) -> Result:
+    validator = JWKSTokenValidator(
+        SETTINGS, key_manager=keys.key_manager(), token_cache=TokenCache()
+    )
+    auth = Authenticator(SETTINGS, validator=validator)
+    token = keys.make_token()
+    return measure(
+        "authenticate_jwks_cached", lambda: auth.authenticate(token), n, n // 10
+    )
+
+
+def case_authenticate_introspection(keys: BenchKeys, n: int) -> Result:
+    body = {"active": True, "sub": "user-123", "exp": int(time.time()) + 3600,
+            "realm_access": {"roles": ["user"]}}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+    validator = IntrospectionTokenValidator(
+        SETTINGS, client=httpx.Client(transport=transport)
+    )
+    auth = Authenticator(SETTINGS, validator=validator)
+    return measure(
+        "authenticate_introspection", lambda: auth.authenticate("opaque"), n, n // 10
+    )
+
+
+def _claims_payload(large: bool) -> dict[str, Any]:
+    return {
+        "sub": "user-123",
+        "exp": 4102444800,
+        "iss": SETTINGS.issuer,
+        "preferred_username": "benchuser",
+        "scope": "openid profile",
+        "realm_access": {"roles": ["user", "admin"]},
+        "resource_access": (
+            large_resource_access() if large
+            else {"bench-client": {"roles": ["viewer"]}}
+        ),
+    }
+
+
+def case_claims(keys: BenchKeys, n: int) -> list[Result]:
+    results = []
+    for size in ("small", "large"):
+        payload = _claims_payload(size == "large")
+        results.append(measure(
+            f"token_claims_{size}",
+            lambda p=payload: TokenClaims(**p, raw=p), n, n // 10,
+        ))
+        results.append(measure(
+            f"trusted_claims_{size}",
+            lambda p=payload: TrustedTokenClaims(p), n, n // 10,
+        ))
+    return results
+
+
+def case_require_roles(keys: BenchKeys, n: int) -> Result:
+    validator = JWKSTokenValidator(SETTINGS, key_manager=keys.key_manager())
+    auth = Authenticator(SETTINGS, validator=validator)
+    claims = TrustedTokenClaims(_claims_payload(large=False))
+    required = {"admin"}
+    return measure(
+        "require_roles", lambda: auth.require_roles(claims, required), n, n // 10
+    )
+
+
+def case_fastapi_profile(keys: BenchKeys, n: int) -> Result:
+    os.environ.setdefault("KEYCLOAK_SERVER_URL", SETTINGS.server_url)
+    os.environ.setdefault("KEYCLOAK_REALM", SETTINGS.realm)
+    os.environ.setdefault("KEYCLOAK_CLIENT_ID", SETTINGS.client_id)
+    from app import main  # imported late so the env above applies
+
+    attach_jwks(main.authenticator.validator._key_manager, keys.jwks)
+    token = keys.make_token({"iss": main.settings.issuer})
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app), base_url="http://bench"
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def _request() -> None:
+        response = await client.get("/api/profile", headers=headers)
+        assert response.status_code == 200, response.text
+
+    return measure_async("fastapi_profile", _request, n, n // 10)
+
+
+CASES: dict[str, Callable[[BenchKeys, int], Result | list[Result]]] = {
+    "authenticate_jwks": case_authenticate_jwks,
+    "authenticate_jwks_cached": case_authenticate_jwks_cached,
+    "authenticate_introspection": case_authenticate_introspection,
+    "claims": case_claims,
+    "require_roles": case_require_roles,
+    "fastapi_profile": case_fastapi_profile,
+}
+
+
+# --- Reporting -------------------------------------------------------------
+
+def run(selected: list[str] | None, iterations: int) -> list[Result]:
+    keys = BenchKeys(SETTINGS)
+    results: list[Result] = []
+    for name, case in CASES.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        outcome = case(keys, iterations)
+        results.extend(outcome if isinstance(outcome, list) else [outcome])
+    return results
+
+
+def compare(
+    results: list[Result], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return a message per case whose throughput dropped more than *tolerance*."""
+    previous = {row["name"]: row for row in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result.name)
+        if before is None:
+            continue
+        ratio = result.ops_per_sec / before["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{result.name}: {before['ops_per_sec']:.0f} -> "
+                f"{result.ops_per_sec:.0f} ops/s ({(ratio - 1) * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def _print_table(results: list[Result]) -> None:
+    print(f"{'case':<30}{'ops/sec':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+    for r in results:
+        print(f"{r.name:<30}{r.ops_per_sec:>12.1f}{r.p50_us:>10.2f}"
+              f"{r.p95_us:>10.2f}{r.p99_us:>10.2f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="select", action="append", help="substring filter")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed throughput drop vs baseline (default 0.15)")
+    args = parser.parse_args(argv)
+
+    results = run(args.select, args.iterations)
+    _print_table(results)
+
+    document = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "timestamp": int(time.time()),
+        "results": [asdict(r) for r in results],
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(document, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,85 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from keycloak_auth import Authenticator, KeycloakSettings
-from keycloak_auth.fastapi import register_auth_error_handlers
+from keycloak_auth import (
+    Authenticator,
+    InMemoryMetrics,
+    IntrospectionPolicy,
+    JWKSTokenValidator,
+    KeycloakSettings,
+    RealmRegistry,
+    RevocationList,
+    TieredTokenValidator,
+)
+from keycloak_auth.fastapi import (
+    DEFAULT_PUBLIC_PATHS,
+    KeycloakAuthMiddleware,
+    register_auth_error_handlers,
+    register_backchannel_logout,
+    register_metrics_endpoint,
+)
+from keycloak_auth.reload import SettingsWatcher
 
 settings = KeycloakSettings()
-authenticator = Authenticator(settings)
+metrics = InMemoryMetrics() if settings.metrics_enabled else None
+revocations = (
+    RevocationList.from_settings(settings)
+    if settings.backchannel_logout_enabled
+    else None
+)
 
-app = FastAPI(title="Keycloak Protected API", version="0.1.0")
+
+def build_authenticator(settings: KeycloakSettings) -> Authenticator:
+    """JWKS validation, plus introspection when a policy is configured."""
+    policy = IntrospectionPolicy.from_settings(settings)
+    if not settings.client_secret or policy.never:
+        return Authenticator(settings, metrics=metrics, revocations=revocations)
+    offline = JWKSTokenValidator(settings, metrics=metrics, revocations=revocations)
+    validator = TieredTokenValidator(settings, offline=offline, metrics=metrics)
+    return Authenticator(settings, validator=validator, metrics=metrics)
+
+
+# With ``multi_realm`` enabled the realm comes from the SPA's X-Relm header.
+authenticator: Authenticator | RealmRegistry = (
+    RealmRegistry(settings, factory=build_authenticator)
+    if settings.multi_realm
+    else build_authenticator(settings)
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Apply config.yaml / KEYCLOAK_* changes without restarting workers.
+    watcher = None
+    if settings.reload_interval > 0:
+        watcher = SettingsWatcher(authenticator, settings.reload_interval)
+        watcher.start()
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+
+app = FastAPI(title="Keycloak Protected API", version="0.1.0", lifespan=lifespan)
+
+# Authenticate every request except the public paths before routing; the
+# route dependencies then reuse the claims. Added before CORS so that CORS
+# stays outermost and error responses still carry its headers.
+public_paths = [*DEFAULT_PUBLIC_PATHS]
+if metrics is not None:
+    public_paths.append(settings.metrics_path)
+if revocations is not None:
+    public_paths.append(settings.backchannel_logout_path)
+app.add_middleware(
+    KeycloakAuthMiddleware, authenticator=authenticator, public_paths=public_paths
+)
 
 # CORS — allow the Angular frontend
 app.add_middleware(
@@ -23,6 +92,12 @@ app.add_middleware(
 )
 
 register_auth_error_handlers(app)
+if metrics is not None:
+    register_metrics_endpoint(app, metrics, settings.metrics_path)
+if revocations is not None:
+    register_backchannel_logout(
+        app, authenticator, revocations, settings.backchannel_logout_path
+    )
 
 
 # Deferred import to avoid circular dependency (routes imports authenticator)
@@ -6,36 +6,105 @@ Public API
 
     from keycloak_auth import Authenticator, KeycloakSettings, TokenClaims
 
+Names are imported lazily on first access, so ``import keycloak_auth``
+is nearly free and e.g. ``from keycloak_auth import KeycloakSettings``
+does not load PyJWT or the cryptography backends.
 """
 
-from .authenticator import Authenticator
-from .config import KeycloakSettings
-from .exceptions import (
-    AuthError,
-    InsufficientPermissions,
-    KeycloakUnavailable,
-    TokenExpired,
-    TokenInvalid,
-    TokenMissing,
-)
-from .models import TokenClaims
-from .validators import (
-    IntrospectionTokenValidator,
-    JWKSTokenValidator,
-    TokenValidator,
-)
-
-__all__ = [
-    "Authenticator",
-    "AuthError",
-    "InsufficientPermissions",
-    "IntrospectionTokenValidator",
-    "JWKSTokenValidator",
-    "KeycloakSettings",
-    "KeycloakUnavailable",
-    "TokenClaims",
-    "TokenExpired",
-    "TokenInvalid",
-    "TokenMissing",
-    "TokenValidator",
-]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .authenticator import Authenticator
+    from .backends import CacheBackend, MemoryBackend, SharedMemoryBackend
+    from .cache import TokenCache
+    from .config import KeycloakSettings
+    from .exceptions import (
+        AuthError,
+        CircuitOpen,
+        InsufficientPermissions,
+        KeycloakUnavailable,
+        SigningKeyNotFound,
+        TokenExpired,
+        TokenInvalid,
+        TokenMissing,
+        TokenRevoked,
+    )
+    from .metrics import InMemoryMetrics, Metrics
+    from .models import TokenClaims, TrustedTokenClaims
+    from .policies import AllOf, AnyOf, compile_policy
+    from .realms import RealmRegistry
+    from .resilience import Bulkhead, CircuitBreaker, KeycloakGuard
+    from .revocation import RevocationList
+    from .service_tokens import ServiceTokenAuth, ServiceTokenProvider
+    from .validators import (
+        AsyncIntrospectionTokenValidator,
+        AsyncJWKSTokenValidator,
+        AsyncTieredTokenValidator,
+        AsyncTokenValidator,
+        IntrospectionPolicy,
+        IntrospectionTokenValidator,
+        JWKSTokenValidator,
+        ThreadedTokenValidator,
+        TieredTokenValidator,
+        TokenValidator,
+    )
+
+_EXPORTS = {
+    "AllOf": ".policies",
+    "AnyOf": ".policies",
+    "AsyncIntrospectionTokenValidator": ".validators",
+    "AsyncJWKSTokenValidator": ".validators",
+    "AsyncTieredTokenValidator": ".validators",
+    "AsyncTokenValidator": ".validators",
+    "Authenticator": ".authenticator",
+    "AuthError": ".exceptions",
+    "Bulkhead": ".resilience",
+    "CacheBackend": ".backends",
+    "CircuitBreaker": ".resilience",
+    "CircuitOpen": ".exceptions",
+    "InMemoryMetrics": ".metrics",
+    "InsufficientPermissions": ".exceptions",
+    "IntrospectionPolicy": ".validators",
+    "IntrospectionTokenValidator": ".validators",
+    "JWKSTokenValidator": ".validators",
+    "KeycloakGuard": ".resilience",
+    "KeycloakSettings": ".config",
+    "KeycloakUnavailable": ".exceptions",
+    "MemoryBackend": ".backends",
+    "Metrics": ".metrics",
+    "RealmRegistry": ".realms",
+    "RevocationList": ".revocation",
+    "ServiceTokenAuth": ".service_tokens",
+    "ServiceTokenProvider": ".service_tokens",
+    "SharedMemoryBackend": ".backends",
+    "SigningKeyNotFound": ".exceptions",
+    "ThreadedTokenValidator": ".validators",
+    "TieredTokenValidator": ".validators",
+    "TokenCache": ".cache",
+    "TokenClaims": ".models",
+    "TokenExpired": ".exceptions",
+    "TokenInvalid": ".exceptions",
+    "TokenMissing": ".exceptions",
+    "TokenRevoked": ".exceptions",
+    "TokenValidator": ".validators",
+    "TrustedTokenClaims": ".models",
+    "compile_policy": ".policies",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -6,31 +6,292 @@ checking, providing a single entry point for token verification.
 
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from .cache import TokenCache
 from .config import KeycloakSettings
-from .exceptions import InsufficientPermissions, TokenMissing
+from .exceptions import AuthError, TokenMissing
+from .executors import VerificationExecutor, executor_from_settings, shared_executor
+from .jwks import JWKSKeyManager
+from .metrics import NULL_METRICS, Metrics, outcome_of
 from .models import TokenClaims
-from .validators import JWKSTokenValidator, TokenValidator
+from .policies import role_policy, scope_policy
+from .revocation import RevocationList, verify_logout_token
+from .validators import (
+    AsyncIntrospectionTokenValidator,
+    AsyncJWKSTokenValidator,
+    AsyncTieredTokenValidator,
+    AsyncTokenValidator,
+    BatchResult,
+    IntrospectionPolicy,
+    IntrospectionTokenValidator,
+    JWKSTokenValidator,
+    ThreadedTokenValidator,
+    TieredTokenValidator,
+    TokenValidator,
+)
+
+
+class _Pipeline:
+    """The settings and validators in use; replaced as a whole on reconfigure."""
+
+    __slots__ = ("settings", "validator", "async_validator", "logout_keys")
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        validator: TokenValidator,
+        async_validator: AsyncTokenValidator,
+    ):
+        self.settings = settings
+        self.validator = validator
+        self.async_validator = async_validator
+        # Keys for logout tokens when the validator has no key manager.
+        self.logout_keys: JWKSKeyManager | None = None
 
 
 class Authenticator:
-    """Facade that validates a Bearer token and checks permissions."""
+    """Facade that validates a Bearer token and checks permissions.
+
+    *token_cache* and *revocations* are handed to the default
+    :class:`JWKSTokenValidator`; a custom *validator* should be given its
+    own instead.
+
+    :meth:`authenticate_async` uses *async_validator* when given, otherwise
+    the async counterpart of *validator* (or a thread-offloading adapter
+    for custom validators). *executor* — ``"inline"``, ``"thread"``,
+    ``"process"`` or a :class:`VerificationExecutor` — decides where the
+    signature check runs (``KeycloakSettings.verify_executor`` by default).
+
+    *metrics* receives validation outcomes and latencies here, and JWKS
+    and introspection events from the default validators.
+
+    :meth:`reconfigure` swaps in new settings at runtime (see
+    :mod:`keycloak_auth.reload`).
+    """
 
     def __init__(
         self,
         settings: KeycloakSettings,
         validator: TokenValidator | None = None,
+        token_cache: TokenCache | None = None,
+        async_validator: AsyncTokenValidator | None = None,
+        executor: str | VerificationExecutor | None = None,
+        metrics: Metrics | None = None,
+        revocations: RevocationList | None = None,
     ):
-        self._settings = settings
-        self._validator = validator or JWKSTokenValidator(settings)
+        if validator is not None and (
+            token_cache is not None or revocations is not None
+        ):
+            raise ValueError(
+                "token_cache and revocations only apply to the default JWKS validator"
+            )
+        self._metrics = metrics or NULL_METRICS
+        self._executor_choice = executor
+        self._custom_async_validator = async_validator
+        self._reconfigure_lock = threading.Lock()
+        validator = validator or JWKSTokenValidator(
+            settings, token_cache=token_cache, metrics=metrics, revocations=revocations
+        )
+        self._pipeline = self._build(settings, validator)
+
+    def _build(
+        self, settings: KeycloakSettings, validator: TokenValidator
+    ) -> _Pipeline:
+        executor = self._executor_choice
+        if isinstance(executor, str):
+            executor = shared_executor(executor, settings.verify_workers)
+        executor = executor or executor_from_settings(settings)
+        async_validator = self._custom_async_validator
+        if async_validator is None:
+            async_validator = self._default_async_validator(settings, validator, executor)
+        return _Pipeline(settings, validator, async_validator)
+
+    def _default_async_validator(
+        self,
+        settings: KeycloakSettings,
+        validator: TokenValidator,
+        executor: VerificationExecutor,
+    ) -> AsyncTokenValidator:
+        if isinstance(validator, JWKSTokenValidator):
+            return AsyncJWKSTokenValidator(
+                settings,
+                sync_validator=validator,
+                executor=executor,
+            )
+        if isinstance(validator, IntrospectionTokenValidator):
+            return AsyncIntrospectionTokenValidator(
+                settings,
+                cache=validator.cache,
+                metrics=self._metrics,
+                guard=validator.guard,
+            )
+        if isinstance(validator, TieredTokenValidator):
+            return AsyncTieredTokenValidator(
+                settings, validator, executor=executor, metrics=self._metrics
+            )
+        return ThreadedTokenValidator(validator, executor=executor)
+
+    @property
+    def settings(self) -> KeycloakSettings:
+        return self._pipeline.settings
+
+    @property
+    def validator(self) -> TokenValidator:
+        return self._pipeline.validator
+
+    @property
+    def async_validator(self) -> AsyncTokenValidator:
+        return self._pipeline.async_validator
+
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
+    @property
+    def token_cache(self) -> TokenCache | None:
+        """The verified-token cache in use, if the validator has one."""
+        return getattr(self._pipeline.validator, "token_cache", None)
+
+    @property
+    def revocations(self) -> RevocationList | None:
+        """The revocation list consulted by the validator, if any."""
+        return getattr(self._pipeline.validator, "revocations", None)
+
+    def reconfigure(self, settings: KeycloakSettings) -> frozenset[str]:
+        """Switch to *settings* and return the names of the fields that changed.
+
+        The validators are rebuilt with :meth:`TokenValidator.reconfigured`.
+        Signing keys and cached claims are dropped only when fields they
+        depend on changed. The swap is a single reference assignment, so
+        requests already in flight finish with the previous validators.
+        A replaced async validator closes its HTTP client ``http_timeout``
+        seconds later.
+        """
+        with self._reconfigure_lock:
+            current = self._pipeline
+            changed = current.settings.changed_fields(settings)
+            if changed:
+                validator = current.validator.reconfigured(settings, changed)
+                self._pipeline = self._build(settings, validator)
+                if self._pipeline.async_validator is not current.async_validator:
+                    current.async_validator.retire(current.settings.http_timeout)
+        return changed
 
     def authenticate(self, token: str | None) -> TokenClaims:
         """Validate *token* and return claims.
 
         Raises :class:`TokenMissing` when *token* is ``None`` or empty.
         """
+        if not self._metrics.enabled:
+            return self._validate(token)
+        with self._metrics.track("validation"):
+            return self._validate(token)
+
+    def _validate(self, token: str | None) -> TokenClaims:
+        if not token:
+            raise TokenMissing()
+        return self._pipeline.validator.validate(token)
+
+    def authenticate_many(self, tokens: Iterable[str | None]) -> BatchResult:
+        """Validate many tokens at once; see :meth:`TokenValidator.validate_many`.
+
+        Returns one entry per input token, in order: the claims, or the
+        :class:`AuthError` that token failed with.
+        """
+        tokens = list(tokens)
+        results: BatchResult = [
+            None if token else TokenMissing() for token in tokens  # type: ignore[misc]
+        ]
+        present = [i for i, token in enumerate(tokens) if token]
+        validated = self._pipeline.validator.validate_many(tokens[i] for i in present)
+        for i, result in zip(present, validated):
+            results[i] = result
+        if self._metrics.enabled:
+            for result in results:
+                error = result if isinstance(result, AuthError) else None
+                self._metrics.increment("validation_total", outcome=outcome_of(error))
+        return results
+
+    async def authenticate_many_async(
+        self, tokens: Iterable[str | None]
+    ) -> BatchResult:
+        """Run :meth:`authenticate_many` in a worker thread."""
+        return await asyncio.to_thread(self.authenticate_many, list(tokens))
+
+    async def authenticate_async(self, token: str | None) -> TokenClaims:
+        """Async variant of :meth:`authenticate` that never blocks the loop."""
+        if not self._metrics.enabled:
+            return await self._validate_async(token)
+        with self._metrics.track("validation"):
+            return await self._validate_async(token)
+
+    async def _validate_async(self, token: str | None) -> TokenClaims:
         if not token:
             raise TokenMissing()
-        return self._validator.validate(token)
+        return await self._pipeline.async_validator.validate(token)
+
+    @property
+    def supports_introspection(self) -> bool:
+        """Whether :meth:`confirm` can check tokens online."""
+        return isinstance(
+            self._pipeline.validator, (TieredTokenValidator, IntrospectionTokenValidator)
+        )
+
+    def confirm(
+        self, token: str, claims: TokenClaims, policy: IntrospectionPolicy
+    ) -> bool:
+        """Introspect *token* if *policy* applies to its *claims*.
+
+        Used for routes that need fresher answers than the offline check
+        gives (see :class:`TieredTokenValidator`). Returns whether Keycloak
+        was asked; raises :class:`TokenInvalid` for an inactive token.
+        With a plain introspection validator the token was already checked
+        online, so this is a no-op.
+        """
+        validator = self._pipeline.validator
+        if isinstance(validator, IntrospectionTokenValidator):
+            return False
+        if not isinstance(validator, TieredTokenValidator):
+            raise ValueError("this authenticator has no introspection tier")
+        if not policy.applies(claims):
+            return False
+        validator.confirm(token)
+        return True
+
+    async def confirm_async(
+        self, token: str, claims: TokenClaims, policy: IntrospectionPolicy
+    ) -> bool:
+        """Async variant of :meth:`confirm`."""
+        validator = self._pipeline.async_validator
+        if isinstance(validator, AsyncIntrospectionTokenValidator):
+            return False
+        if not isinstance(validator, AsyncTieredTokenValidator):
+            raise ValueError("this authenticator has no introspection tier")
+        if not policy.applies(claims):
+            return False
+        await validator.confirm(token)
+        return True
+
+    def verify_logout_token(self, token: str) -> dict[str, Any]:
+        """Verify a back-channel logout token with this realm's signing keys.
+
+        Returns its claims for :meth:`RevocationList.revoke_logout`. May
+        fetch the JWKS, so call it off the event loop.
+        """
+        pipeline = self._pipeline
+        validator = pipeline.validator
+        if isinstance(validator, JWKSTokenValidator):
+            key_manager = validator.key_manager
+        else:
+            key_manager = pipeline.logout_keys
+            if key_manager is None:
+                key_manager = JWKSKeyManager(pipeline.settings, metrics=self._metrics)
+                pipeline.logout_keys = key_manager
+        return verify_logout_token(token, key_manager, pipeline.settings)
 
     def require_roles(
         self,
@@ -39,16 +300,8 @@ class Authenticator:
         client_id: str | None = None,
     ) -> None:
         """Raise :class:`InsufficientPermissions` if *claims* lack any role."""
-        if client_id:
-            user_roles = claims.client_roles(client_id)
-        else:
-            user_roles = claims.realm_roles
-
-        if not roles.issubset(user_roles):
-            missing = roles - user_roles
-            raise InsufficientPermissions(
-                f"Missing required roles: {', '.join(sorted(missing))}"
-            )
+        if roles:
+            role_policy(frozenset(roles), client_id).enforce(claims)
 
     def require_scopes(
         self,
@@ -56,8 +309,5 @@ class Authenticator:
         scopes: set[str],
     ) -> None:
         """Raise :class:`InsufficientPermissions` if *claims* lack any scope."""
-        if not scopes.issubset(claims.scopes):
-            missing = scopes - claims.scopes
-            raise InsufficientPermissions(
-                f"Missing required scopes: {', '.join(sorted(missing))}"
-            )
+        if scopes:
+            scope_policy(frozenset(scopes)).enforce(claims)
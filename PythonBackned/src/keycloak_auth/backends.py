@@ -0,0 +1,260 @@
+"""Pluggable byte-level cache backends shared between workers.
+
+By default every process keeps its verified claims and JWKS to itself.
+With a :class:`CacheBackend`, :class:`TokenCache` and
+:class:`JWKSKeyManager` also publish what they verify or fetch, so the
+other workers of a host (or a fleet, with an external store) reuse one
+signature check and one JWKS download; :class:`RevocationList` publishes
+logouts the same way:
+
+  - :class:`MemoryBackend` – in-process reference implementation.
+  - :class:`SharedMemoryBackend` – a memory-mapped file (``/dev/shm`` by
+    default) used by every worker process on the host.
+
+A backend stores opaque ``bytes`` under ``bytes`` keys with a TTL, which
+maps directly onto external key/value stores::
+
+    class RedisBackend(CacheBackend):
+        def __init__(self, client): self._redis = client
+        def get(self, key): return self._redis.get(key)
+        def set(self, key, value, ttl): self._redis.set(key, value, px=int(ttl * 1000))
+        def delete(self, key): self._redis.delete(key)
+
+Anything that can write to the backend can make tokens look verified, so
+keep it private to the service. The shared-memory file is created with
+mode ``0600``, and an existing file is refused unless it is a regular
+file (not a symlink) owned by the current user and closed to others.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import KeycloakSettings
+
+
+class CacheBackend(ABC):
+    """Key/value store with per-entry expiry; must be thread-safe."""
+
+    @abstractmethod
+    def get(self, key: bytes) -> bytes | None:
+        """Return the value stored under *key*, or ``None`` if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: bytes, value: bytes, ttl: float) -> None:
+        """Store *value* under *key* for *ttl* seconds (best effort)."""
+
+    @abstractmethod
+    def delete(self, key: bytes) -> None:
+        """Remove *key* if present."""
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU backend; useful for tests and single-process apps."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(self, key: bytes, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: bytes) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_MAGIC = b"KCAB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIII")  # magic, version, slots, slot_size
+# Per slot: crc32 (over everything after it), key digest, expires_at, length.
+_SLOT = struct.Struct("<I32sdI")
+_PROBES = 4
+
+
+class SharedMemoryBackend(CacheBackend):
+    """Fixed-size hash table in a memory-mapped file shared by processes.
+
+    The file holds *slots* entries of *slot_size* bytes each; values that
+    do not fit are not cached. A key may live in one of a few neighbouring
+    slots; when all are taken the entry closest to expiry is replaced.
+
+    Writers serialise with ``flock`` (and a thread lock within the
+    process). Readers take no lock: every slot carries a CRC32 of its
+    contents, and a slot caught mid-write simply reads as a miss.
+    POSIX only.
+    """
+
+    def __init__(self, path: str, slots: int = 8192, slot_size: int = 2048):
+        import fcntl
+        import mmap
+
+        if slots <= 0 or slot_size <= _SLOT.size:
+            raise ValueError(f"need slots > 0 and slot_size > {_SLOT.size}")
+        self._fcntl = fcntl
+        self.path = path
+        self._slots = slots
+        self._slot_size = slot_size
+        self._max_value = slot_size - _SLOT.size
+        size = _HEADER.size + slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            _check_private(self._fd, path)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                header = os.pread(self._fd, _HEADER.size, 0)
+                if len(header) < _HEADER.size or not any(header):
+                    os.ftruncate(self._fd, size)
+                    os.pwrite(
+                        self._fd, _HEADER.pack(_MAGIC, _VERSION, slots, slot_size), 0
+                    )
+                elif _HEADER.unpack(header) != (_MAGIC, _VERSION, slots, slot_size):
+                    raise ValueError(
+                        f"{path} was created with a different layout; remove it "
+                        "or choose another shared_cache_path"
+                    )
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._mm = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._lock = threading.Lock()
+
+    def _candidates(self, digest: bytes) -> list[int]:
+        first = int.from_bytes(digest[:8], "little") % self._slots
+        return [
+            _HEADER.size + ((first + i) % self._slots) * self._slot_size
+            for i in range(_PROBES)
+        ]
+
+    def _read(self, offset: int, digest: bytes, now: float) -> bytes | None:
+        crc, key, expires_at, length = _SLOT.unpack_from(self._mm, offset)
+        if key != digest or expires_at <= now or length > self._max_value:
+            return None
+        end = offset + _SLOT.size + length
+        if zlib.crc32(self._mm[offset + 4:end]) != crc:
+            return None  # torn by a concurrent write
+        return self._mm[offset + _SLOT.size:end]
+
+    def get(self, key: bytes) -> bytes | None:
+        digest = hashlib.sha256(key).digest()
+        now = time.time()
+        for offset in self._candidates(digest):
+            value = self._read(offset, digest, now)
+            if value is not None:
+                return value
+        return None
+
+    def set(self, key: bytes, value: bytes, ttl: float) -> None:
+        if len(value) > self._max_value or ttl <= 0:
+            return
+        digest = hashlib.sha256(key).digest()
+        now = time.time()
+        body = _SLOT.pack(0, digest, now + ttl, len(value))[4:] + value
+        record = struct.pack("<I", zlib.crc32(body)) + body
+        with self._locked():
+            offset = self._victim(digest, now)
+            self._mm[offset:offset + len(record)] = record
+
+    def _victim(self, digest: bytes, now: float) -> int:
+        best, best_expiry = 0, float("inf")
+        for offset in self._candidates(digest):
+            _, key, expires_at, _ = _SLOT.unpack_from(self._mm, offset)
+            if key == digest or expires_at <= now:
+                return offset
+            if expires_at < best_expiry:
+                best, best_expiry = offset, expires_at
+        return best
+
+    def delete(self, key: bytes) -> None:
+        digest = hashlib.sha256(key).digest()
+        with self._locked():
+            for offset in self._candidates(digest):
+                if _SLOT.unpack_from(self._mm, offset)[1] == digest:
+                    self._mm[offset:offset + _SLOT.size] = bytes(_SLOT.size)
+
+    def clear(self) -> None:
+        """Drop every entry (for all processes)."""
+        with self._locked():
+            self._mm[_HEADER.size:] = bytes(self._slots * self._slot_size)
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock excludes other processes, the thread lock other threads.
+        with self._lock:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+def default_shared_path() -> str:
+    """``/dev/shm`` when available (RAM-backed), else the temp directory."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    uid = getattr(os, "getuid", lambda: 0)()
+    return os.path.join(directory, f"keycloak-auth-{uid}.cache")
+
+
+@functools.lru_cache(maxsize=None)
+def shared_backend(path: str, slots: int, slot_size: int) -> SharedMemoryBackend:
+    """Return the process-wide :class:`SharedMemoryBackend` for *path*."""
+    return SharedMemoryBackend(path, slots, slot_size)
+
+
+def _check_private(fd: int, path: str) -> None:
+    """Refuse a file that another local user could have planted or can write."""
+    import stat
+
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode):
+        raise PermissionError(f"{path} is not a regular file")
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(
+            f"{path} must be owned by uid {os.getuid()} with mode 0600; "
+            "remove it or choose another shared_cache_path"
+        )
+
+
+def backend_from_settings(settings: KeycloakSettings) -> CacheBackend | None:
+    """The backend selected by ``cache_backend``, or ``None`` for ``"local"``."""
+    if settings.cache_backend == "local":
+        return None
+    return shared_backend(
+        settings.shared_cache_path or default_shared_path(),
+        settings.shared_cache_slots,
+        settings.shared_cache_slot_size,
+    )
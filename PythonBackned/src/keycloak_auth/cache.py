@@ -0,0 +1,206 @@
+"""In-process cache for already-verified tokens.
+
+``TokenCache`` maps a SHA-256 digest of the raw token to the
+:class:`TokenClaims` produced by a successful validation, so a token that
+is presented repeatedly only pays for signature verification once.
+
+Entries never outlive the token's ``exp`` claim, are additionally bounded
+by a configurable TTL, and are evicted least-recently-used first once the
+cache reaches ``max_size``.
+
+With a :class:`CacheBackend` (``cache_backend: shared``), verified claims
+are also written to the backend and a local miss is looked up there, so a
+token verified by one worker is a cache hit in all others. Backend keys
+are prefixed with a namespace derived from the validation settings, so
+caches with different issuers or audiences never see each other's claims.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .backends import CacheBackend, backend_from_settings
+from .config import KeycloakSettings
+from .models import TokenClaims, TrustedTokenClaims
+
+
+def token_digest(token: str) -> bytes:
+    """Stable key for *token* that avoids holding the raw JWT in memory."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def claims_namespace(settings: KeycloakSettings, kind: str) -> bytes:
+    """Backend key prefix for *kind* claims validated under *settings*."""
+    parts = [kind, settings.issuer, settings.audience, settings.client_id]
+    parts.extend(sorted(settings.algorithms))
+    return hashlib.sha256("\0".join(parts).encode()).digest()[:8]
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time counters for a :class:`TokenCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    shared_hits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TokenCache:
+    """Thread-safe LRU cache of validated claims keyed by token hash.
+
+    *backend* adds a second, shared level below the in-process LRU; its
+    keys start with *namespace* (see :func:`claims_namespace`).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        backend: CacheBackend | None = None,
+        namespace: bytes = b"",
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._backend = backend
+        self._namespace = namespace
+        self._entries: OrderedDict[bytes, tuple[TokenClaims, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._shared_hits = 0
+
+    @classmethod
+    def from_settings(cls, settings: KeycloakSettings) -> TokenCache | None:
+        """Build a cache from *settings*, or ``None`` when caching is disabled."""
+        if settings.token_cache_size <= 0:
+            return None
+        return cls(
+            max_size=settings.token_cache_size,
+            ttl=settings.token_cache_ttl,
+            backend=backend_from_settings(settings),
+            namespace=claims_namespace(settings, "token"),
+        )
+
+    @classmethod
+    def for_introspection(cls, settings: KeycloakSettings) -> TokenCache | None:
+        """Build the introspection-result cache, or ``None`` when disabled."""
+        if settings.introspection_cache_ttl <= 0:
+            return None
+        return cls(
+            max_size=settings.introspection_cache_size,
+            ttl=settings.introspection_cache_ttl,
+            backend=backend_from_settings(settings),
+            namespace=claims_namespace(settings, "introspection"),
+        )
+
+    @property
+    def backend(self) -> CacheBackend | None:
+        return self._backend
+
+    def fresh(self, namespace: bytes | None = None) -> TokenCache:
+        """Return a new, empty cache with the same size, TTL and backend.
+
+        Pass a new *namespace* when the claims are validated differently
+        from now on, so that entries already in the backend are not reused.
+        """
+        return type(self)(
+            max_size=self._max_size,
+            ttl=self._ttl,
+            backend=self._backend,
+            namespace=self._namespace if namespace is None else namespace,
+        )
+
+    def get(self, token: str) -> TokenClaims | None:
+        """Return cached claims for *token*, or ``None`` on a miss."""
+        key = token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return claims
+                del self._entries[key]
+            if self._backend is None:
+                self._misses += 1
+                return None
+
+        claims = self._shared_get(key)
+        with self._lock:
+            if claims is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._shared_hits += 1
+            self._store(key, claims, min(float(claims.exp), now + self._ttl))
+        return claims
+
+    def put(self, token: str, claims: TokenClaims) -> None:
+        """Store *claims* for *token* until ``min(exp, now + ttl)``."""
+        now = time.time()
+        expires_at = min(float(claims.exp), now + self._ttl)
+        if expires_at <= now:
+            return
+        key = token_digest(token)
+        with self._lock:
+            self._store(key, claims, expires_at)
+        if self._backend is not None:
+            payload = claims.raw or claims.model_dump()
+            self._backend.set(
+                self._namespace + key,
+                json.dumps(payload, separators=(",", ":")).encode(),
+                expires_at - now,
+            )
+
+    def _store(self, key: bytes, claims: TokenClaims, expires_at: float) -> None:
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _shared_get(self, key: bytes) -> TokenClaims | None:
+        data = self._backend.get(self._namespace + key)  # type: ignore[union-attr]
+        if data is None:
+            return None
+        try:
+            return TrustedTokenClaims(json.loads(data))
+        except ValueError:  # undecodable or missing claims (TokenInvalid)
+            return None
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_size=self._max_size,
+                shared_hits=self._shared_hits,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -3,28 +3,93 @@
 Settings are loaded in this priority order (highest wins):
   1. Explicit constructor kwargs
   2. Environment variables (prefixed ``KEYCLOAK_``)
-  3. ``config.yaml`` in the working directory
+  3. ``config.yaml`` in the working directory (or the file passed to
+     :meth:`KeycloakSettings.from_file`)
+
+The parsed YAML is cached per file modification time, so building many
+settings objects (one per realm, or on every reload check) reads the
+file only when it has changed.
 """
 
 from __future__ import annotations
 
+import os
+from contextvars import ContextVar
 from functools import cached_property
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
-import yaml
-from pydantic import model_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+#: Signature algorithms accepted by default (asymmetric only).
+ASYMMETRIC_ALGORITHMS = (
+    "RS256", "RS384", "RS512",
+    "PS256", "PS384", "PS512",
+    "ES256", "ES384", "ES512",
+    "EdDSA",
+)
+
+
+#: Fields that select the cross-worker cache backend.
+BACKEND_FIELDS = frozenset({
+    "cache_backend", "shared_cache_path", "shared_cache_slots",
+    "shared_cache_slot_size",
+})
+#: Fields that shape outbound Keycloak calls (timeouts, bulkhead, breaker).
+HTTP_FIELDS = frozenset({
+    "http_timeout", "http_connect_timeout", "max_concurrent_requests",
+    "request_queue_timeout", "breaker_failure_threshold", "breaker_reset_timeout",
+})
+#: Fields whose change requires a new JWKS key manager (and a key refetch).
+KEY_FIELDS = frozenset({
+    "server_url", "realm", "verify_ssl", "algorithms",
+    "jwks_snapshot_dir", "jwks_max_staleness", "jwks_unknown_kid_interval",
+    "jwks_negative_ttl",
+}) | BACKEND_FIELDS | HTTP_FIELDS
+#: Fields whose change invalidates already-verified token claims.
+CLAIM_FIELDS = frozenset({"server_url", "realm", "audience", "algorithms"})
+#: Fields whose change invalidates introspection clients and results.
+INTROSPECTION_FIELDS = frozenset({
+    "server_url", "realm", "client_id", "client_secret", "verify_ssl",
+    "introspection_cache_ttl", "introspection_cache_size",
+}) | BACKEND_FIELDS
+
+CONFIG_PATH = Path("config.yaml")
+
+# Set by KeycloakSettings.from_file() while it builds settings.
+_config_path: ContextVar[Path | None] = ContextVar("keycloak_config_path", default=None)
+
+_yaml_cache: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+
+def config_signature(path: Path = CONFIG_PATH) -> tuple[int, int] | None:
+    """``(mtime_ns, size)`` of *path*, or ``None`` when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def _yaml_settings(settings: BaseSettings) -> dict[str, Any]:
-    """Load values from a ``config.yaml`` next to the working directory."""
-    config_path = Path("config.yaml")
-    if not config_path.exists():
+    """Load values from ``config.yaml`` (or the ``from_file`` path)."""
+    path = _config_path.get() or CONFIG_PATH
+    signature = config_signature(path)
+    if signature is None:
         return {}
-    with config_path.open() as fh:
-        data = yaml.safe_load(fh) or {}
-    return data.get("keycloak", {})
+    key = path.resolve()
+    cached = _yaml_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1])
+
+    import yaml  # deferred: only needed when a config file is present
+
+    with path.open() as fh:
+        data = (yaml.safe_load(fh) or {}).get("keycloak", {})
+    _yaml_cache[key] = (signature, data)
+    return dict(data)
 
 
 class KeycloakSettings(BaseSettings):
@@ -42,6 +107,94 @@ class KeycloakSettings(BaseSettings):
     audience: str = ""
     verify_ssl: bool = True
 
+    # JWS algorithms a JWKS key may use; each key is verified only with
+    # the algorithm it is published with.
+    algorithms: list[str] = list(ASYMMETRIC_ALGORITHMS)
+    # Clock skew (seconds) tolerated when checking ``exp``, ``nbf`` and ``iat``.
+    leeway: float = Field(default=0.0, ge=0.0)
+
+    # Verified-token cache (0 disables it).
+    token_cache_size: int = 0
+    token_cache_ttl: int = 300
+
+    # Where verified claims, the JWKS and logout revocations are shared
+    # between the worker processes of a host: "local" keeps them per
+    # process, "shared" also publishes them in a memory-mapped file (see
+    # keycloak_auth.backends).
+    # An empty path means /dev/shm/keycloak-auth-<uid>.cache.
+    cache_backend: Literal["local", "shared"] = "local"
+    shared_cache_path: str = ""
+    shared_cache_slots: int = 8192
+    shared_cache_slot_size: int = 2048
+
+    # Short-lived cache of active introspection results (0 disables it).
+    introspection_cache_ttl: int = 0
+    introspection_cache_size: int = 10000
+
+    # TieredTokenValidator: after the offline JWKS check, also introspect
+    # tokens issued more than ``introspect_after`` seconds ago (0: never)
+    # and a random ``introspect_sample_rate`` fraction of requests.
+    introspect_after: float = 0
+    introspect_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    # When those introspections fail because Keycloak is unreachable,
+    # accept the offline verdict instead of answering 503.
+    introspection_fail_open: bool = False
+
+    # Outbound Keycloak calls (JWKS, introspection, service tokens): timeouts
+    # in seconds; at most ``max_concurrent_requests`` in flight per client
+    # (0: unlimited), others wait ``request_queue_timeout`` for a slot; after
+    # ``breaker_failure_threshold`` consecutive failures (0: never) calls fail
+    # fast for ``breaker_reset_timeout`` seconds (see keycloak_auth.resilience).
+    http_timeout: float = Field(default=10.0, gt=0)
+    http_connect_timeout: float = Field(default=3.0, gt=0)
+    max_concurrent_requests: int = Field(default=20, ge=0)
+    request_queue_timeout: float = Field(default=0.5, ge=0)
+    breaker_failure_threshold: int = Field(default=5, ge=0)
+    breaker_reset_timeout: float = Field(default=30.0, gt=0)
+
+    # Multi-realm (multi-tenant) mode: the realm is taken per request from
+    # ``realm_header``; ``realm`` above is the fallback when it is absent.
+    multi_realm: bool = False
+    realm_header: str = "X-Relm"
+    max_realms: int = 256
+    allowed_realms: list[str] = []
+
+    # Persist fetched JWKS documents here ("" disables) so new workers
+    # start with keys; keys older than ``jwks_max_staleness`` seconds are
+    # not trusted, even when Keycloak cannot be reached.
+    jwks_snapshot_dir: str = ""
+    jwks_max_staleness: int = 86400
+
+    # A token with a kid missing from the cached JWKS triggers a refetch
+    # when none has missed since the last successful fetch, otherwise at
+    # most once per ``jwks_unknown_kid_interval`` seconds; a kid still
+    # missing is rejected without a refetch for ``jwks_negative_ttl``
+    # seconds. Lower values pick up rotated keys sooner but let forged
+    # kids cause more JWKS requests.
+    jwks_unknown_kid_interval: float = 10
+    jwks_negative_ttl: float = 60
+
+    # Where signature verification runs on the async path:
+    # "inline", "thread" or "process"; 0 workers picks a size from the CPU count.
+    verify_executor: Literal["inline", "thread", "process"] = "thread"
+    verify_workers: int = 0
+
+    # Collect validation/JWKS/introspection metrics and expose them in the
+    # Prometheus text format at ``metrics_path`` (see keycloak_auth.metrics).
+    metrics_enabled: bool = False
+    metrics_path: str = "/metrics"
+
+    # Receive Keycloak back-channel logouts at ``backchannel_logout_path``
+    # and reject the logged-out sessions' tokens for ``revocation_ttl``
+    # seconds, which should cover the access-token lifespan.
+    backchannel_logout_enabled: bool = False
+    backchannel_logout_path: str = "/backchannel-logout"
+    revocation_ttl: float = 3600
+
+    # Poll config.yaml and KEYCLOAK_* variables every N seconds and apply
+    # changes without a restart (0 disables; see keycloak_auth.reload).
+    reload_interval: float = 0
+
     @model_validator(mode="before")
     @classmethod
     def _load_yaml(cls, values: dict[str, Any]) -> dict[str, Any]:
@@ -50,6 +203,42 @@ class KeycloakSettings(BaseSettings):
         merged = {**yaml_vals, **{k: v for k, v in values.items() if v is not None}}
         return merged
 
+    @field_validator("algorithms")
+    @classmethod
+    def _check_algorithms(cls, value: list[str]) -> list[str]:
+        unsupported = [alg for alg in value if alg not in ASYMMETRIC_ALGORITHMS]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported algorithms {unsupported}; "
+                f"choose from {', '.join(ASYMMETRIC_ALGORITHMS)}"
+            )
+        if not value:
+            raise ValueError("algorithms must not be empty")
+        return value
+
+    @classmethod
+    def from_file(
+        cls, path: str | os.PathLike[str], **values: Any
+    ) -> KeycloakSettings:
+        """Build settings with *path* in place of ``config.yaml``."""
+        token = _config_path.set(Path(path))
+        try:
+            return cls(**values)
+        finally:
+            _config_path.reset(token)
+
+    def for_realm(self, realm: str) -> KeycloakSettings:
+        """Return a copy of these settings pointing at *realm*."""
+        clone = self.model_copy(update={"realm": realm})
+        for name in ("issuer", "jwks_uri", "introspection_uri", "token_uri"):
+            clone.__dict__.pop(name, None)
+        return clone
+
+    def changed_fields(self, other: KeycloakSettings) -> frozenset[str]:
+        """Names of the fields whose values differ between *self* and *other*."""
+        mine, theirs = self.model_dump(), other.model_dump()
+        return frozenset(name for name in mine if mine[name] != theirs.get(name))
+
     # --- Computed URIs ---------------------------------------------------
 
     @cached_property
@@ -63,3 +252,7 @@ class KeycloakSettings(BaseSettings):
     @cached_property
     def introspection_uri(self) -> str:
         return f"{self.issuer}/protocol/openid-connect/token/introspect"
+
+    @cached_property
+    def token_uri(self) -> str:
+        return f"{self.issuer}/protocol/openid-connect/token"
@@ -0,0 +1,190 @@
+"""Single-pass JWT decoding for the JWKS validator.
+
+``jwt.decode`` after a header lookup splits and base64-decodes a token
+twice and rebuilds its options on every call. Here the token is split
+once into a :class:`ParsedToken`, whose header serves the key lookup,
+and then checked against a :class:`DecodePlan`, which holds everything
+derived from :class:`KeycloakSettings` up front:
+
+  - the header must name an allowed ``alg`` that matches the JWK's;
+  - the signature is verified before the payload is even decoded;
+  - ``exp`` is required; ``exp``, ``nbf`` and ``iat`` are checked with
+    ``leeway`` seconds of clock skew; ``iss`` must match exactly, and
+    ``aud`` must contain the audience when one is configured.
+
+The checks and error messages follow :func:`jwt.decode`. A plan is a
+frozen dataclass, so it can be sent to process-pool workers as is.
+"""
+
+from __future__ import annotations
+
+import binascii
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import TokenExpired, TokenInvalid
+
+if TYPE_CHECKING:
+    from jwt import PyJWK
+
+    from .config import KeycloakSettings
+
+_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+
+def _b64decode(segment: bytes, name: str) -> bytes:
+    if len(segment) % 4 == 1:
+        raise TokenInvalid(f"Invalid {name} padding")
+    padded = segment.translate(_URLSAFE) + b"=" * (-len(segment) % 4)
+    try:
+        return binascii.a2b_base64(padded, strict_mode=True)
+    except binascii.Error as exc:
+        raise TokenInvalid(f"Invalid {name} padding") from exc
+
+
+def _json_object(data: bytes, name: str) -> dict[str, Any]:
+    try:
+        value = json.loads(data)
+    except (ValueError, RecursionError) as exc:
+        raise TokenInvalid(f"Invalid {name} string: {exc}") from exc
+    if not isinstance(value, dict):
+        raise TokenInvalid(f"Invalid {name} string: must be a json object")
+    return value
+
+
+class ParsedToken:
+    """A compact JWS split into its parts, with the header decoded.
+
+    The payload and signature stay encoded until :meth:`DecodePlan.verify`
+    needs them.
+    """
+
+    __slots__ = ("header", "signing_input", "_payload", "_signature")
+
+    def __init__(
+        self,
+        header: dict[str, Any],
+        signing_input: bytes,
+        payload: bytes,
+        signature: bytes,
+    ):
+        self.header = header
+        self.signing_input = signing_input
+        self._payload = payload
+        self._signature = signature
+
+    @classmethod
+    def parse(cls, token: str) -> ParsedToken:
+        """Split *token* and decode its header; raise :class:`TokenInvalid`."""
+        try:
+            data = token.encode("ascii")
+        except (UnicodeEncodeError, AttributeError) as exc:
+            raise TokenInvalid("Invalid token type") from exc
+        signing_input, _, signature = data.rpartition(b".")
+        header_segment, dot, payload = signing_input.partition(b".")
+        if not dot:
+            raise TokenInvalid("Not enough segments")
+        header = _json_object(_b64decode(header_segment, "header"), "header")
+        if "crit" in header or header.get("b64", True) is not True:
+            raise TokenInvalid("Unsupported critical header parameters")
+        kid = header.get("kid")
+        if kid is not None and not isinstance(kid, str):
+            raise TokenInvalid("Key ID header parameter must be a string")
+        return cls(header, signing_input, payload, signature)
+
+    @property
+    def kid(self) -> str | None:
+        return self.header.get("kid")
+
+    def unverified_payload(self) -> dict[str, Any]:
+        """The payload, without any check (e.g. to route by ``iss``)."""
+        return _json_object(_b64decode(self._payload, "payload"), "payload")
+
+    def signature(self) -> bytes:
+        return _b64decode(self._signature, "crypto")
+
+
+@dataclass(frozen=True)
+class DecodePlan:
+    """What a token must satisfy, precomputed from the settings."""
+
+    algorithms: frozenset[str]
+    issuer: str
+    audience: str | None = None
+    leeway: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: KeycloakSettings) -> DecodePlan:
+        return cls(
+            algorithms=frozenset(settings.algorithms),
+            issuer=settings.issuer,
+            audience=settings.audience or None,
+            leeway=settings.leeway,
+        )
+
+    def verify(self, token: ParsedToken, jwk: PyJWK) -> dict[str, Any]:
+        """Check *token*'s signature with *jwk*, then its claims.
+
+        Returns the payload; raises :class:`TokenExpired` or
+        :class:`TokenInvalid`.
+        """
+        alg = token.header.get("alg")
+        if alg not in self.algorithms:
+            raise TokenInvalid("The specified alg value is not allowed")
+        if alg != jwk.algorithm_name:
+            raise TokenInvalid(
+                f"Token algorithm {alg!r} does not match the key's "
+                f"algorithm {jwk.algorithm_name!r}"
+            )
+        if not jwk.Algorithm.verify(token.signing_input, jwk.key, token.signature()):
+            raise TokenInvalid("Signature verification failed")
+        payload = token.unverified_payload()
+        self.check_claims(payload)
+        return payload
+
+    def check_claims(self, payload: dict[str, Any], now: float | None = None) -> None:
+        """Validate the registered claims of an already verified *payload*."""
+        now = time.time() if now is None else now
+        leeway = self.leeway
+
+        if payload.get("exp") is None:
+            raise TokenInvalid('Token is missing the "exp" claim')
+        if "iat" in payload:
+            if _integer(payload["iat"], "Issued At claim (iat)") > now + leeway:
+                raise TokenInvalid("The token is not yet valid (iat)")
+        if "nbf" in payload:
+            if _integer(payload["nbf"], "Not Before claim (nbf)") > now + leeway:
+                raise TokenInvalid("The token is not yet valid (nbf)")
+        if _integer(payload["exp"], "Expiration Time claim (exp)") <= now - leeway:
+            raise TokenExpired()
+
+        iss = payload.get("iss")
+        if iss is None:
+            raise TokenInvalid('Token is missing the "iss" claim')
+        if iss != self.issuer:
+            raise TokenInvalid("Invalid issuer")
+
+        if self.audience is not None:
+            aud = payload.get("aud")
+            if not aud:
+                raise TokenInvalid('Token is missing the "aud" claim')
+            if isinstance(aud, str):
+                aud = [aud]
+            if not isinstance(aud, list) or not all(isinstance(a, str) for a in aud):
+                raise TokenInvalid("Invalid claim format in token")
+            if self.audience not in aud:
+                raise TokenInvalid("Audience doesn't match")
+
+        if "sub" in payload and not isinstance(payload["sub"], str):
+            raise TokenInvalid("Subject must be a string")
+        if "jti" in payload and not isinstance(payload["jti"], str):
+            raise TokenInvalid("JWT ID must be a string")
+
+
+def _integer(value: Any, name: str) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError, OverflowError):
+        raise TokenInvalid(f"{name} must be an integer.") from None
@@ -42,6 +42,20 @@ class TokenInvalid(AuthError):
     detail = "Token is invalid"
 
 
+class SigningKeyNotFound(TokenInvalid):
+    """No JWKS key matches the token's ``kid`` (forged, foreign or retired)."""
+
+    status_code = 401
+    detail = "Token signing key not found"
+
+
+class TokenRevoked(TokenInvalid):
+    """The token's session, subject or id was revoked (e.g. by logout)."""
+
+    status_code = 401
+    detail = "Token has been revoked"
+
+
 class InsufficientPermissions(AuthError):
     """The token is valid but lacks required roles/scopes."""
 
@@ -54,3 +68,10 @@ class KeycloakUnavailable(AuthError):
 
     status_code = 503
     detail = "Authentication service unavailable"
+
+
+class CircuitOpen(KeycloakUnavailable):
+    """Keycloak calls are suspended after repeated failures (circuit breaker)."""
+
+    status_code = 503
+    detail = "Authentication service unavailable"
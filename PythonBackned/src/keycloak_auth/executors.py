@@ -0,0 +1,152 @@
+"""Execution strategies for CPU-bound signature verification.
+
+RSA/ECDSA signature verification is the dominant per-request
+CPU cost. :class:`Authenticator` lets you choose where it runs:
+
+  - ``inline``  – on the event loop thread (lowest latency, no parallelism).
+  - ``thread``  – on a shared thread pool (default). Keeps the loop
+    responsive; on free-threaded CPython builds, or where the crypto
+    backend releases the GIL, verification scales across cores.
+  - ``process`` – on a shared process pool. Scales across cores on any
+    build at the price of pickling the token and key per call.
+
+Executors are shared process-wide per ``(kind, workers)`` so many
+authenticators (e.g. one per realm) do not each spawn their own pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import sys
+import sysconfig
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from jwt import PyJWK
+
+from .config import KeycloakSettings
+from .decoding import DecodePlan, ParsedToken
+
+T = TypeVar("T")
+
+FREE_THREADED = bool(sysconfig.get_config_var("Py_GIL_DISABLED")) and not getattr(
+    sys, "_is_gil_enabled", lambda: True
+)()
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+
+def default_workers(kind: str) -> int:
+    """Pool size used when ``verify_workers`` is 0."""
+    cpus = os.cpu_count() or 1
+    if kind == "process" or FREE_THREADED:
+        return cpus
+    return min(32, cpus + 4)
+
+
+class VerificationExecutor(ABC):
+    """Where :class:`AsyncTokenValidator` implementations run blocking work."""
+
+    #: Whether *fn* runs in this interpreter (False for process pools,
+    #: which need picklable callables and arguments).
+    in_process: bool = True
+    #: Whether *fn* runs on the event loop thread itself, so it must not
+    #: be handed anything that may block on the network.
+    on_loop: bool = False
+
+    @abstractmethod
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` according to the strategy and return its result."""
+
+    def shutdown(self) -> None:
+        """Release pool resources (no-op for inline execution)."""
+
+
+class InlineExecutor(VerificationExecutor):
+    """Runs work directly on the calling (event loop) thread."""
+
+    on_loop = True
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return fn(*args)
+
+
+class _PoolExecutor(VerificationExecutor):
+
+    def __init__(self, pool: Executor):
+        self._pool = pool
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, fn, *args)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ThreadPoolVerificationExecutor(_PoolExecutor):
+    """Runs work on a dedicated :class:`ThreadPoolExecutor`."""
+
+    def __init__(self, max_workers: int | None = None):
+        super().__init__(
+            ThreadPoolExecutor(
+                max_workers=max_workers or default_workers("thread"),
+                thread_name_prefix="keycloak-verify",
+            )
+        )
+
+
+class ProcessPoolVerificationExecutor(_PoolExecutor):
+    """Runs work on a :class:`ProcessPoolExecutor` (callables must pickle)."""
+
+    in_process = False
+
+    def __init__(self, max_workers: int | None = None):
+        # Deferred: pulls in multiprocessing, which thread/inline users skip.
+        from concurrent.futures import ProcessPoolExecutor
+
+        super().__init__(
+            ProcessPoolExecutor(max_workers=max_workers or default_workers("process"))
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def shared_executor(kind: str = "thread", workers: int = 0) -> VerificationExecutor:
+    """Return the process-wide executor for *kind* with *workers* (0 = auto)."""
+    if kind == "inline":
+        return InlineExecutor()
+    if kind == "thread":
+        return ThreadPoolVerificationExecutor(workers or None)
+    if kind == "process":
+        return ProcessPoolVerificationExecutor(workers or None)
+    raise ValueError(f"Unknown executor kind {kind!r}; expected one of {EXECUTOR_KINDS}")
+
+
+def executor_from_settings(settings: KeycloakSettings) -> VerificationExecutor:
+    return shared_executor(settings.verify_executor, settings.verify_workers)
+
+
+# --- Process-pool entry point ----------------------------------------------
+
+_worker_keys: dict[str | None, tuple[dict[str, Any], PyJWK]] = {}
+
+
+def verify_with_jwk(
+    token: str,
+    jwk_data: dict[str, Any],
+    plan: DecodePlan,
+) -> dict[str, Any]:
+    """Verify *token* with the JWK *jwk_data* and return its payload.
+
+    Module-level so it can be pickled into a process pool; the parsed key
+    is cached per worker process and rebuilt only when the JWK changes.
+    """
+    kid = jwk_data.get("kid")
+    cached = _worker_keys.get(kid)
+    if cached is None or cached[0] != jwk_data:
+        cached = _worker_keys[kid] = (jwk_data, PyJWK(jwk_data))
+    return plan.verify(ParsedToken.parse(token), cached[1])
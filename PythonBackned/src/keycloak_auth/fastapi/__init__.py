@@ -1,10 +1,27 @@
 """FastAPI integration helpers for keycloak-auth."""
 
-from .dependencies import create_auth_dependency, require_roles
-from .middleware import register_auth_error_handlers
+from .dependencies import (
+    create_auth_dependency,
+    require_policy,
+    require_roles,
+    require_scopes,
+)
+from .logout import register_backchannel_logout
+from .metrics import register_metrics_endpoint
+from .middleware import (
+    DEFAULT_PUBLIC_PATHS,
+    KeycloakAuthMiddleware,
+    register_auth_error_handlers,
+)
 
 __all__ = [
+    "DEFAULT_PUBLIC_PATHS",
+    "KeycloakAuthMiddleware",
     "create_auth_dependency",
     "register_auth_error_handlers",
+    "register_backchannel_logout",
+    "register_metrics_endpoint",
+    "require_policy",
     "require_roles",
+    "require_scopes",
 ]
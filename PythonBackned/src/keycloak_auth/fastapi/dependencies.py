@@ -17,6 +17,28 @@ Usage::
     @app.get("/admin", dependencies=[Depends(require_roles(authenticator, {"admin"}))])
     async def admin():
         return {"msg": "welcome admin"}
+
+Validated claims are memoised on ``request.state`` per authenticator, so
+stacking any number of these dependencies on one route costs a single
+token validation. Behind :class:`KeycloakAuthMiddleware` the memo is
+already filled when routing starts, and the dependencies only look it up.
+
+Every factory also accepts a :class:`RealmRegistry` in place of the
+authenticator; the realm is then read from the registry's header (``X-Relm``
+by default) on each request.
+
+Role and scope requirements are compiled once when the dependency is
+created (see :mod:`keycloak_auth.policies`); :func:`require_policy` takes
+arbitrary ``AllOf``/``AnyOf`` combinations.
+
+With a :class:`TieredTokenValidator`, every factory accepts *introspect*:
+``True`` (or an :class:`IntrospectionPolicy`) makes that route confirm
+the token with Keycloak after the offline check, at most once per
+request::
+
+    @app.post("/transfer", dependencies=[
+        Depends(require_roles(authenticator, {"payer"}, introspect=True)),
+    ])
 """
 
 from __future__ import annotations
@@ -28,36 +50,172 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from ..authenticator import Authenticator
 from ..models import TokenClaims
+from ..policies import AllOf, CompiledPolicy, Requirement, compile_policy
+from ..realms import RealmRegistry
+from ..validators import INTROSPECT_ALWAYS, IntrospectionPolicy
 
 _bearer_scheme = HTTPBearer(auto_error=False)
 
+_CLAIMS_STATE_ATTR = "keycloak_auth_claims"
+_CONFIRMED_STATE_ATTR = "keycloak_auth_confirmed"
+
+AuthSource = Authenticator | RealmRegistry
+Introspect = bool | IntrospectionPolicy
+
+
+def _introspection_policy(
+    authenticator: AuthSource, introspect: Introspect
+) -> IntrospectionPolicy | None:
+    if introspect is False:
+        return None
+    if (
+        isinstance(authenticator, Authenticator)
+        and not authenticator.supports_introspection
+    ):
+        raise ValueError(
+            "introspect requires a TieredTokenValidator or IntrospectionTokenValidator"
+        )
+    return INTROSPECT_ALWAYS if introspect is True else introspect
+
+
+async def _authenticate_once(
+    request: Request,
+    authenticator: AuthSource,
+    token: str | None,
+) -> TokenClaims:
+    """Validate *token* at most once per request for *authenticator*."""
+    memo: dict[AuthSource, TokenClaims] | None = getattr(
+        request.state, _CLAIMS_STATE_ATTR, None
+    )
+    if memo is None:
+        memo = {}
+        setattr(request.state, _CLAIMS_STATE_ATTR, memo)
+
+    claims = memo.get(authenticator)
+    if claims is None:
+        if isinstance(authenticator, RealmRegistry):
+            realm = request.headers.get(authenticator.header_name)
+            claims = await authenticator.authenticate_async(token, realm)
+        else:
+            claims = await authenticator.authenticate_async(token)
+        memo[authenticator] = claims
+    return claims
+
+
+async def _confirm_once(
+    request: Request,
+    authenticator: AuthSource,
+    token: str,
+    claims: TokenClaims,
+    policy: IntrospectionPolicy,
+) -> None:
+    """Introspect *token* if *policy* applies, at most once per request."""
+    confirmed: set[AuthSource] | None = getattr(
+        request.state, _CONFIRMED_STATE_ATTR, None
+    )
+    if confirmed is None:
+        confirmed = set()
+        setattr(request.state, _CONFIRMED_STATE_ATTR, confirmed)
+    if authenticator in confirmed:
+        return
+    if isinstance(authenticator, RealmRegistry):
+        realm = request.headers.get(authenticator.header_name)
+        asked = await authenticator.confirm_async(token, claims, policy, realm)
+    else:
+        asked = await authenticator.confirm_async(token, claims, policy)
+    if asked:
+        confirmed.add(authenticator)
+
 
 def create_auth_dependency(
-    authenticator: Authenticator,
+    authenticator: AuthSource,
+    introspect: Introspect = False,
 ) -> Callable[..., TokenClaims]:
-    """Return a FastAPI dependency that extracts and validates the Bearer token."""
+    """Return a FastAPI dependency that extracts and validates the Bearer token.
+
+    *introspect* additionally confirms the token online (see module docs).
+    """
+    policy = _introspection_policy(authenticator, introspect)
 
     async def _get_current_user(
+        request: Request,
         credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
     ) -> TokenClaims:
         token = credentials.credentials if credentials else None
-        return authenticator.authenticate(token)
+        claims = await _authenticate_once(request, authenticator, token)
+        if policy is not None:
+            await _confirm_once(request, authenticator, token, claims, policy)
+        return claims
 
     return _get_current_user
 
 
+def _require_authenticated(
+    authenticator: AuthSource,
+    introspect: Introspect,
+) -> Callable[..., None]:
+    get_user = create_auth_dependency(authenticator, introspect)
+
+    async def _check_authenticated(
+        claims: TokenClaims = Depends(get_user),
+    ) -> None:
+        return None
+
+    return _check_authenticated
+
+
+def require_policy(
+    authenticator: AuthSource,
+    requirement: Requirement | CompiledPolicy,
+    introspect: Introspect = False,
+) -> Callable[..., None]:
+    """Return a FastAPI dependency enforcing a precompiled authorization policy."""
+
+    policy = (
+        requirement
+        if isinstance(requirement, CompiledPolicy)
+        else compile_policy(requirement)
+    )
+    get_user = create_auth_dependency(authenticator, introspect)
+
+    async def _check_policy(
+        claims: TokenClaims = Depends(get_user),
+    ) -> None:
+        policy.enforce(claims)
+
+    return _check_policy
+
+
 def require_roles(
-    authenticator: Authenticator,
+    authenticator: AuthSource,
     roles: set[str],
     client_id: str | None = None,
+    introspect: Introspect = False,
 ) -> Callable[..., None]:
-    """Return a FastAPI dependency that enforces realm (or client) roles."""
+    """Return a FastAPI dependency that enforces realm (or client) roles.
 
-    get_user = create_auth_dependency(authenticator)
+    An empty *roles* set only requires a valid token.
+    """
 
-    async def _check_roles(
-        claims: TokenClaims = Depends(get_user),
-    ) -> None:
-        authenticator.require_roles(claims, roles, client_id=client_id)
+    if not roles:
+        return _require_authenticated(authenticator, introspect)
+    if client_id:
+        requirement = AllOf(client_roles={client_id: roles})
+    else:
+        requirement = AllOf(realm_roles=roles)
+    return require_policy(authenticator, requirement, introspect)
+
+
+def require_scopes(
+    authenticator: AuthSource,
+    scopes: set[str],
+    introspect: Introspect = False,
+) -> Callable[..., None]:
+    """Return a FastAPI dependency that enforces OAuth2 scopes.
+
+    An empty *scopes* set only requires a valid token.
+    """
 
-    return _check_roles
+    if not scopes:
+        return _require_authenticated(authenticator, introspect)
+    return require_policy(authenticator, AllOf(scopes=scopes), introspect)
@@ -0,0 +1,71 @@
+"""Receiver for Keycloak back-channel logout.
+
+Usage::
+
+    from keycloak_auth import Authenticator, RevocationList
+    from keycloak_auth.fastapi import register_backchannel_logout
+
+    revocations = RevocationList.from_settings(settings)
+    authenticator = Authenticator(settings, revocations=revocations)
+    register_backchannel_logout(app, authenticator, revocations)
+
+Then set the client's "Backchannel logout URL" in Keycloak to this
+endpoint. It must be reachable by Keycloak without a Bearer token (add it
+to the middleware's public paths).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from ..exceptions import AuthError, KeycloakUnavailable
+from ..revocation import RevocationList
+from .dependencies import AuthSource
+
+_NO_STORE = {"Cache-Control": "no-store"}
+
+
+def register_backchannel_logout(
+    app: FastAPI,
+    authenticator: AuthSource,
+    revocations: RevocationList,
+    path: str = "/backchannel-logout",
+) -> None:
+    """Accept logout tokens at *path* and record them in *revocations*.
+
+    Answers 200 once the session is revoked and 400 for a missing or
+    invalid ``logout_token``, as OpenID Connect Back-Channel Logout 1.0
+    requires. Answers 503 when the signing keys cannot be fetched, so that
+    Keycloak reports the failure.
+    """
+
+    @app.post(path, include_in_schema=False)
+    async def _backchannel_logout(request: Request) -> Response:
+        form = parse_qs((await request.body()).decode("latin-1"))
+        tokens = form.get("logout_token")
+        if not tokens:
+            return _error("logout_token is required")
+        try:
+            claims = await asyncio.to_thread(
+                authenticator.verify_logout_token, tokens[0]
+            )
+        except KeycloakUnavailable as exc:
+            return JSONResponse(
+                {"detail": exc.detail}, status_code=exc.status_code, headers=_NO_STORE
+            )
+        except AuthError as exc:
+            return _error(exc.detail)
+        revocations.revoke_logout(claims)
+        return Response(status_code=200, headers=_NO_STORE)
+
+
+def _error(description: str) -> JSONResponse:
+    return JSONResponse(
+        {"error": "invalid_request", "error_description": description},
+        status_code=400,
+        headers=_NO_STORE,
+    )
@@ -0,0 +1,32 @@
+"""Prometheus ``/metrics`` endpoint for :class:`InMemoryMetrics`.
+
+Usage::
+
+    from keycloak_auth.metrics import InMemoryMetrics
+    from keycloak_auth.fastapi import register_metrics_endpoint
+
+    metrics = InMemoryMetrics()
+    authenticator = Authenticator(settings, metrics=metrics)
+    register_metrics_endpoint(app, metrics)
+"""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from ..metrics import InMemoryMetrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def register_metrics_endpoint(
+    app: FastAPI,
+    metrics: InMemoryMetrics,
+    path: str = "/metrics",
+) -> None:
+    """Serve *metrics* in the Prometheus text format at *path* (unauthenticated)."""
+
+    @app.get(path, include_in_schema=False)
+    async def _metrics() -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
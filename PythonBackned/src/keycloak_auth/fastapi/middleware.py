@@ -1,15 +1,41 @@
-"""FastAPI error handlers for authentication exceptions.
+"""ASGI middleware and error handlers for authentication.
 
 Call :func:`register_auth_error_handlers` once during app startup to
 convert :class:`AuthError` exceptions into consistent JSON responses.
+
+:class:`KeycloakAuthMiddleware` authenticates every HTTP request and
+WebSocket handshake except public paths before routing, so no route is
+left open by a forgotten dependency::
+
+    app.add_middleware(KeycloakAuthMiddleware, authenticator=authenticator)
+
+The claims are stored in the request scope, where the dependencies from
+:mod:`keycloak_auth.fastapi.dependencies` pick them up without
+validating the token again.
 """
 
 from __future__ import annotations
 
-from fastapi import FastAPI, Request
+import re
+from collections.abc import Iterable
+
+from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.websockets import WebSocketClose
 
 from ..exceptions import AuthError
+from ..realms import RealmRegistry
+from .dependencies import _CLAIMS_STATE_ATTR, AuthSource
+
+#: Paths served without a token by default: health check and API docs.
+DEFAULT_PUBLIC_PATHS = (
+    "/health",
+    "/docs",
+    "/docs/*",
+    "/redoc",
+    "/openapi.json",
+)
 
 
 def register_auth_error_handlers(app: FastAPI) -> None:
@@ -17,7 +43,126 @@ def register_auth_error_handlers(app: FastAPI) -> None:
 
     @app.exception_handler(AuthError)
     async def _auth_error_handler(request: Request, exc: AuthError) -> JSONResponse:
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={"detail": exc.detail},
-        )
+        return _error_response(exc)
+
+
+def _error_response(exc: AuthError) -> JSONResponse:
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+
+class PathMatcher:
+    """Precompiled matcher for public paths.
+
+    A pattern is an exact path (``/health``) or a prefix ending in ``/*``
+    (``/docs/*`` matches ``/docs/`` and everything below it). Exact paths
+    are a set lookup; all prefixes are combined into one regular expression.
+    """
+
+    __slots__ = ("_exact", "_prefixes")
+
+    def __init__(self, patterns: Iterable[str]):
+        exact: set[str] = set()
+        prefixes: list[str] = []
+        for pattern in patterns:
+            if pattern.endswith("/*"):
+                prefixes.append(re.escape(pattern[:-1]))
+            else:
+                exact.add(pattern)
+        self._exact = frozenset(exact)
+        self._prefixes = re.compile("|".join(prefixes)) if prefixes else None
+
+    def __call__(self, path: str) -> bool:
+        if path in self._exact:
+            return True
+        return self._prefixes is not None and self._prefixes.match(path) is not None
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _bearer_token(scope: Scope) -> str | None:
+    """Return the Bearer credentials of an ASGI request, like ``HTTPBearer``."""
+    authorization = _header(scope, b"authorization")
+    if not authorization:
+        return None
+    scheme, _, credentials = authorization.partition(" ")
+    if not credentials or scheme.lower() != "bearer":
+        return None
+    return credentials
+
+
+def _subprotocol_token(scope: Scope) -> str | None:
+    """Return the token a browser offered as the subprotocols ``bearer, <token>``.
+
+    Browsers cannot set headers on a WebSocket handshake, so the token
+    travels in ``Sec-WebSocket-Protocol`` instead.
+    """
+    protocols = scope.get("subprotocols") or []
+    for i, protocol in enumerate(protocols[:-1]):
+        if protocol.lower() == "bearer":
+            return protocols[i + 1]
+    return None
+
+
+class KeycloakAuthMiddleware:
+    """Pure ASGI middleware that validates the Bearer token once per request.
+
+    Requests to *public_paths*, and with methods in *public_methods* (CORS
+    preflight by default), pass through untouched. All other HTTP requests
+    without a valid token get the same JSON error response as
+    :func:`register_auth_error_handlers` and never reach the app.
+
+    WebSocket handshakes are authenticated too, from the ``Authorization``
+    header or the ``bearer, <token>`` subprotocols; unauthorized ones are
+    closed with code 1008 (policy violation) before they are accepted.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        authenticator: AuthSource,
+        public_paths: Iterable[str] = DEFAULT_PUBLIC_PATHS,
+        public_methods: Iterable[str] = ("OPTIONS",),
+    ):
+        self._app = app
+        self._authenticator = authenticator
+        self._is_public = PathMatcher(public_paths)
+        self._public_methods = frozenset(m.upper() for m in public_methods)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        kind = scope["type"]
+        if (
+            kind not in ("http", "websocket")
+            or (kind == "http" and scope["method"] in self._public_methods)
+            or self._is_public(scope["path"])
+        ):
+            await self._app(scope, receive, send)
+            return
+
+        authenticator = self._authenticator
+        token = _bearer_token(scope)
+        if token is None and kind == "websocket":
+            token = _subprotocol_token(scope)
+        try:
+            if isinstance(authenticator, RealmRegistry):
+                header = authenticator.header_name.lower().encode("latin-1")
+                claims = await authenticator.authenticate_async(
+                    token, _header(scope, header)
+                )
+            else:
+                claims = await authenticator.authenticate_async(token)
+        except AuthError as exc:
+            if kind == "websocket":
+                close = WebSocketClose(status.WS_1008_POLICY_VIOLATION, exc.detail)
+                await close(scope, receive, send)
+            else:
+                await _error_response(exc)(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state.setdefault(_CLAIMS_STATE_ATTR, {})[authenticator] = claims
+        await self._app(scope, receive, send)
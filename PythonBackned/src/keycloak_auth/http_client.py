@@ -0,0 +1,46 @@
+"""Pooled HTTP clients for talking to Keycloak.
+
+Every outbound call (introspection, service-token requests) should go
+through a long-lived client so TCP/TLS connections are kept alive and
+reused instead of being re-established per request. HTTP/2 is enabled
+when the optional ``h2`` package is installed. Timeouts come from
+``http_timeout`` and ``http_connect_timeout``.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import Any
+
+import httpx
+
+from .config import KeycloakSettings
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+def _client_kwargs(settings: KeycloakSettings) -> dict[str, Any]:
+    return {
+        "verify": settings.verify_ssl,
+        "timeout": httpx.Timeout(
+            settings.http_timeout, connect=settings.http_connect_timeout
+        ),
+        "limits": _LIMITS,
+        "http2": HTTP2_AVAILABLE,
+    }
+
+
+def create_client(settings: KeycloakSettings) -> httpx.Client:
+    """Return a keep-alive :class:`httpx.Client` configured from *settings*."""
+    return httpx.Client(**_client_kwargs(settings))
+
+
+def create_async_client(settings: KeycloakSettings) -> httpx.AsyncClient:
+    """Return a keep-alive :class:`httpx.AsyncClient` configured from *settings*."""
+    return httpx.AsyncClient(**_client_kwargs(settings))
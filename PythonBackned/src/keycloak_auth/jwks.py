@@ -1,42 +1,386 @@
-"""JWKS key management using PyJWT's built-in PyJWKClient.
+"""JWKS key management with background refresh.
 
-``PyJWKClient`` handles:
-  - Fetching the JWKS endpoint
-  - Matching the ``kid`` header to the correct key
-  - TTL-based caching (``lifespan`` parameter)
+``PyJWKClient`` is used only as the HTTP transport for the JWKS endpoint;
+caching is handled here so that the request path almost never waits on
+Keycloak:
+
+  - Keys are considered fresh for ``cache_ttl`` seconds.
+  - Once a key set is within ``refresh_ahead`` seconds of expiring (or
+    already past it), the next lookup starts a refresh in a background
+    thread and keeps serving the current keys meanwhile.
+  - Only a ``kid`` that is not in the cached set forces a synchronous
+    fetch, and concurrent fetches are collapsed into one network call.
+  - The first unknown ``kid`` after a successful fetch always refetches,
+    so a rotated key is picked up at once. Once such a fetch has come
+    back without the ``kid``, further unknown-``kid`` fetches happen at
+    most once per ``jwks_unknown_kid_interval`` seconds, and the missing
+    ``kid`` is remembered for ``jwks_negative_ttl`` seconds. Tokens with
+    made-up ``kid`` values are therefore rejected with
+    :class:`SigningKeyNotFound` (401) without reaching Keycloak, while
+    :class:`KeycloakUnavailable` (503) is kept for real fetch failures.
+  - With ``jwks_snapshot_dir`` set, every fetched key set is saved to
+    disk and loaded again by the next process, so a fresh worker can
+    validate tokens while Keycloak is slow or down. Keys older than
+    ``jwks_max_staleness`` (whether from a snapshot or a long outage)
+    are no longer trusted.
+  - With a shared :class:`CacheBackend` (``cache_backend: shared``), a
+    fetched key set is published for the other workers, and a worker
+    about to fetch first adopts a newer published set that is still
+    fresh (and, for an unknown ``kid``, contains it). One download then
+    serves every worker on the host.
+  - Downloads go through a :class:`KeycloakGuard` (timeout, bulkhead and
+    circuit breaker). While the breaker is open, fetches fail at once
+    and the cached keys are served as after any other failed refresh.
+    With no keys cached at all, lookups fail with
+    :class:`KeycloakUnavailable` for ``retry_interval`` seconds after a
+    failed fetch instead of each trying Keycloak again.
+
+Every key is kept as a :class:`PyJWK` bound to its algorithm (the JWK's
+``alg``, or the one implied by its key type and curve). Keys whose
+algorithm is not in ``KeycloakSettings.algorithms`` are ignored.
 """
 
 from __future__ import annotations
 
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Collection
+from typing import Any
+
 import jwt
-from jwt import PyJWKClient
+from jwt import PyJWK, PyJWKClient
 
+from .backends import CacheBackend, backend_from_settings
 from .config import KeycloakSettings
-from .exceptions import KeycloakUnavailable
+from .decoding import ParsedToken
+from .exceptions import KeycloakUnavailable, SigningKeyNotFound
+from .metrics import NULL_METRICS, Metrics
+from .resilience import KeycloakGuard
+from .singleflight import SingleFlight
+from .snapshot import JWKSSnapshot
+
+_FETCH_KEY = "jwks"
+_MAX_NEGATIVE_KIDS = 1024
+_MAX_KID_LENGTH = 256
+# Certificate chains are not needed to verify signatures and would make
+# the published key set too large for a shared-memory slot.
+_UNSHARED_JWK_FIELDS = ("x5c", "x5t", "x5t#S256")
+
+_Keys = dict[str | None, PyJWK]
+_RawKeys = dict[str | None, dict[str, Any]]
 
 
 class JWKSKeyManager:
-    """Thin wrapper around :class:`jwt.PyJWKClient` with sensible defaults."""
+    """Caches the realm's signing keys and refreshes them ahead of expiry."""
 
-    def __init__(self, settings: KeycloakSettings, cache_ttl: int = 300):
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        cache_ttl: int = 300,
+        refresh_ahead: float = 30.0,
+        retry_interval: float = 5.0,
+        metrics: Metrics | None = None,
+        unknown_kid_interval: float | None = None,
+        negative_ttl: float | None = None,
+        snapshot: JWKSSnapshot | None = None,
+        backend: CacheBackend | None = None,
+        guard: KeycloakGuard | None = None,
+    ):
         self._settings = settings
+        self._cache_ttl = cache_ttl
+        self._metrics = metrics or NULL_METRICS
+        self._refresh_after = cache_ttl - min(refresh_ahead, cache_ttl)
+        self._max_staleness = max(settings.jwks_max_staleness, cache_ttl)
+        self._retry_interval = retry_interval
+        if unknown_kid_interval is None:
+            unknown_kid_interval = settings.jwks_unknown_kid_interval
+        if negative_ttl is None:
+            negative_ttl = settings.jwks_negative_ttl
+        self._unknown_kid_interval = unknown_kid_interval
+        self._negative_ttl = negative_ttl
         try:
             self._client = PyJWKClient(
                 uri=settings.jwks_uri,
-                cache_jwk_set=True,
-                lifespan=cache_ttl,
+                cache_jwk_set=False,
+                timeout=settings.http_timeout,
             )
         except Exception as exc:
             raise KeycloakUnavailable(
                 f"Failed to initialise JWKS client: {exc}"
             ) from exc
 
-    def get_signing_key(self, token: str) -> jwt.algorithms.RSAPublicKey:
-        """Return the RSA public key that matches the token's ``kid``."""
-        try:
-            signing_key = self._client.get_signing_key_from_jwt(token)
-        except (jwt.PyJWKClientError, jwt.DecodeError) as exc:
+        self._keys: dict[str | None, PyJWK] = {}
+        self._jwk_data: dict[str | None, dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._fetched_wall = 0.0
+        self._failed_at = 0.0
+        self._missed_at = float("-inf")
+        self._started_at = float("-inf")
+        self._unknown_kids: OrderedDict[str | None, float] = OrderedDict()
+        self._unknown_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._guard = guard or KeycloakGuard.from_settings(settings, "jwks", metrics)
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+        if snapshot is None and settings.jwks_snapshot_dir:
+            snapshot = JWKSSnapshot.in_directory(
+                settings.jwks_snapshot_dir, settings.realm, settings.jwks_uri
+            )
+        self._snapshot = snapshot
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+
+        self._backend = backend or backend_from_settings(settings)
+        self._shared_key = "\0".join(
+            ("jwks", settings.jwks_uri, *sorted(settings.algorithms))
+        ).encode()
+
+    # --- Public API ------------------------------------------------------
+
+    def get_signing_key(self, token: str) -> Any:
+        """Return the public key that matches the token's ``kid``."""
+        return self.get_jwk(token).key
+
+    def get_jwk(self, token: str) -> PyJWK:
+        """Return the algorithm-bound :class:`PyJWK` for the token's ``kid``."""
+        return self.get_signing_key_for_kid(ParsedToken.parse(token).kid)
+
+    def get_signing_key_for_kid(self, kid: str | None) -> PyJWK:
+        """Return the :class:`PyJWK` for *kid*, fetching only if it is unknown.
+
+        Raises :class:`SigningKeyNotFound` when the key set (refetched as
+        described in the module docstring) has no such key, and
+        :class:`KeycloakUnavailable` when the key set cannot be fetched.
+        """
+        jwk = self._keys.get(kid)
+        if jwk is not None:
+            if self._metrics.enabled:
+                self._metrics.increment("jwks_key_lookup_total", result="hit")
+            if time.monotonic() - self._fetched_at >= self._refresh_after:
+                return self._revalidate(kid, jwk)
+            return jwk
+
+        if not self._keys and time.monotonic() - self._failed_at < self._retry_interval:
+            # Nothing to serve and Keycloak just failed: fail fast rather
+            # than send every request to it again.
+            raise KeycloakUnavailable("Signing keys are unavailable")
+
+        if not self._may_fetch_for(kid):
+            if self._metrics.enabled:
+                self._metrics.increment("jwks_key_lookup_total", result="rejected")
+            raise SigningKeyNotFound()
+
+        if self._metrics.enabled:
+            self._metrics.increment("jwks_key_lookup_total", result="miss")
+        requested_at = time.monotonic()
+        self._flight.do(_FETCH_KEY, lambda: self._fetch(wanted=(kid,)))
+        jwk = self._keys.get(kid)
+        if jwk is None and self._started_at < requested_at:
+            # We joined a fetch that began before this kid was asked for,
+            # possibly before the key was published: fetch once more.
+            self._flight.do(_FETCH_KEY, lambda: self._fetch(wanted=(kid,)))
+            jwk = self._keys.get(kid)
+        if jwk is None:
+            self._missed_at = time.monotonic()
+            self._remember_unknown(kid)
+            raise SigningKeyNotFound()
+        return jwk
+
+    def has_key(self, kid: str | None) -> bool:
+        """Whether *kid* is in the cached key set (never fetches)."""
+        return kid in self._keys
+
+    def get_jwk_data(self, kid: str | None) -> dict[str, Any]:
+        """Return the raw JWK dict for *kid* (picklable, for process pools)."""
+        self.get_signing_key_for_kid(kid)
+        return self._jwk_data[kid]
+
+    def refresh(self) -> None:
+        """Synchronously (re)load the key set, e.g. to warm up at startup."""
+        self._flight.do(_FETCH_KEY, self._fetch)
+
+    @property
+    def guard(self) -> KeycloakGuard:
+        return self._guard
+
+    @property
+    def age(self) -> float:
+        """Seconds since the key set was last fetched successfully."""
+        if not self._fetched_at:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    # --- Internals -------------------------------------------------------
+
+    def _may_fetch_for(self, kid: str | None) -> bool:
+        """Whether an unknown *kid* justifies a synchronous JWKS fetch."""
+        if not self._keys:
+            return True  # nothing cached yet; a failure surfaces as 503
+        now = time.monotonic()
+        expires_at = self._unknown_kids.get(kid)
+        if expires_at is not None and expires_at > now:
+            return False
+        if now - self._failed_at < self._unknown_kid_interval:
+            return False
+        # Keys rotate: the key set fetched last may simply predate this
+        # kid. Only a fetch that already missed since then rate-limits.
+        if self._missed_at < self._fetched_at:
+            return True
+        return now - self._missed_at >= self._unknown_kid_interval
+
+    def _remember_unknown(self, kid: str | None) -> None:
+        if kid is not None and len(kid) > _MAX_KID_LENGTH:
+            return
+        with self._unknown_lock:
+            self._unknown_kids[kid] = time.monotonic() + self._negative_ttl
+            self._unknown_kids.move_to_end(kid)
+            while len(self._unknown_kids) > _MAX_NEGATIVE_KIDS:
+                self._unknown_kids.popitem(last=False)
+
+    def _revalidate(self, kid: str | None, jwk: PyJWK) -> PyJWK:
+        """Refresh an ageing key set: in the background while it is still
+        trusted, synchronously once it is older than ``max_staleness``."""
+        now = time.monotonic()
+        retry_due = now - self._failed_at >= self._retry_interval
+        if now - self._fetched_at <= self._max_staleness:
+            if retry_due:
+                self._schedule_refresh()
+            return jwk
+
+        if not retry_due:
             raise KeycloakUnavailable(
-                f"Unable to fetch signing key: {exc}"
-            ) from exc
-        return signing_key.key
+                "Signing keys are stale and Keycloak is unreachable"
+            )
+        self._flight.do(_FETCH_KEY, self._fetch)
+        jwk = self._keys.get(kid)
+        if jwk is None:
+            raise SigningKeyNotFound()
+        return jwk
+
+    def _load_snapshot(self, snapshot: JWKSSnapshot) -> None:
+        loaded = snapshot.load(self._max_staleness)
+        if loaded is None:
+            return
+        data, age = loaded
+        try:
+            keys, raw = _parse_jwk_set(data, self._settings.algorithms)
+        except jwt.PyJWKSetError:
+            return
+        self._keys, self._jwk_data = keys, raw
+        self._fetched_at = time.monotonic() - age
+        self._fetched_wall = time.time() - age
+
+    def _schedule_refresh(self) -> None:
+        with self._refresh_lock:
+            if self._refreshing or self._flight.in_flight(_FETCH_KEY):
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._background_refresh,
+            name="jwks-refresh",
+            daemon=True,
+        ).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._flight.do(_FETCH_KEY, self._fetch)
+        except KeycloakUnavailable:
+            # Keep serving the current keys; the next lookup past
+            # ``retry_interval`` will try again.
+            pass
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def _fetch(self, wanted: Collection[str | None] = ()) -> None:
+        self._started_at = time.monotonic()
+        if self._backend is not None and self._adopt_shared(wanted):
+            return
+        with self._metrics.track("jwks_fetch"):
+            try:
+                data, keys, raw = self._guard.call(self._download)
+            except KeycloakUnavailable:
+                self._failed_at = time.monotonic()
+                raise
+
+        self._keys, self._jwk_data = keys, raw
+        self._fetched_at = time.monotonic()
+        self._fetched_wall = time.time()
+        if self._snapshot is not None:
+            self._snapshot.save(data)
+        if self._backend is not None:
+            self._publish(raw)
+
+    def _download(self) -> tuple[dict[str, Any], _Keys, _RawKeys]:
+        try:
+            data = self._client.fetch_data()
+            return data, *_parse_jwk_set(data, self._settings.algorithms)
+        except (jwt.PyJWKClientError, jwt.PyJWKSetError) as exc:
+            raise KeycloakUnavailable(f"Unable to fetch signing key: {exc}") from exc
+
+    def _adopt_shared(self, wanted: Collection[str | None]) -> bool:
+        """Use the key set another worker published, if it is newer than
+        ours, not yet due for a refresh and has every *wanted* ``kid``."""
+        value = self._backend.get(self._shared_key)  # type: ignore[union-attr]
+        if value is None:
+            return False
+        try:
+            shared = json.loads(value)
+            fetched_at = float(shared["fetched_at"])
+            keys, raw = _parse_jwk_set(shared["jwks"], self._settings.algorithms)
+        except (ValueError, KeyError, TypeError, jwt.PyJWKSetError):
+            return False
+        age = time.time() - fetched_at
+        if (
+            fetched_at <= self._fetched_wall
+            or not 0 <= age < self._refresh_after
+            or any(kid not in keys for kid in wanted)
+        ):
+            return False
+        self._keys, self._jwk_data = keys, raw
+        self._fetched_at = time.monotonic() - age
+        self._fetched_wall = fetched_at
+        if self._metrics.enabled:
+            self._metrics.increment("jwks_fetch_total", outcome="shared")
+        return True
+
+    def _publish(self, raw: dict[str | None, dict[str, Any]]) -> None:
+        jwks = {
+            "keys": [
+                {k: v for k, v in jwk.items() if k not in _UNSHARED_JWK_FIELDS}
+                for jwk in raw.values()
+            ]
+        }
+        value = json.dumps({"fetched_at": self._fetched_wall, "jwks": jwks})
+        self._backend.set(  # type: ignore[union-attr]
+            self._shared_key, value.encode(), self._cache_ttl
+        )
+
+
+def _parse_jwk_set(
+    data: dict[str, Any],
+    algorithms: Collection[str],
+) -> tuple[_Keys, _RawKeys]:
+    """Parse signing keys for *algorithms*, keeping the raw JWK next to each."""
+    entries = data.get("keys") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise jwt.PyJWKSetError("The JWKS endpoint returned a malformed key set")
+    keys: dict[str | None, PyJWK] = {}
+    raw: dict[str | None, dict[str, Any]] = {}
+    for jwk_data in entries:
+        if not isinstance(jwk_data, dict) or jwk_data.get("use") not in (None, "sig"):
+            continue
+        try:
+            jwk = PyJWK(jwk_data)
+        except (jwt.PyJWKError, jwt.InvalidKeyError):
+            continue  # unsupported key type or algorithm
+        if jwk.algorithm_name not in algorithms:
+            continue
+        keys[jwk.key_id] = jwk
+        raw[jwk.key_id] = jwk_data
+    if not keys:
+        raise jwt.PyJWKSetError("The JWKS endpoint did not contain any signing keys")
+    return keys, raw
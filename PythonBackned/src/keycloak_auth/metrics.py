@@ -0,0 +1,241 @@
+"""Instrumentation hooks for validation, JWKS and introspection.
+
+Every component takes an optional :class:`Metrics`; the default
+:data:`NULL_METRICS` is disabled, and the hot paths check
+``metrics.enabled`` before reading a clock, so uninstrumented
+deployments pay one attribute lookup per call.
+
+:class:`InMemoryMetrics` keeps counters and latency histograms in
+process and renders them in the Prometheus text format; implement
+:class:`Metrics` to forward the same events to another backend
+(statsd, OpenTelemetry, ``prometheus_client``...).
+
+Recorded series (all prefixed ``keycloak_auth_``):
+
+  - ``validation_total`` / ``validation_seconds`` by ``outcome``
+  - ``jwks_fetch_total`` / ``jwks_fetch_seconds`` by ``outcome``
+    (``shared`` when another worker's key set was adopted instead)
+  - ``jwks_key_lookup_total`` by ``result`` (``hit``, ``miss`` or
+    ``rejected`` when an unknown ``kid`` is refused without a fetch)
+  - ``introspection_total`` / ``introspection_seconds`` by ``outcome``
+  - ``service_token_total`` / ``service_token_seconds`` by ``outcome``
+    (client-credentials requests of :class:`ServiceTokenProvider`)
+  - ``circuit_transitions_total`` by ``client`` and ``state``, and
+    ``calls_rejected_total`` by ``client`` and ``reason`` (``circuit_open``
+    or ``bulkhead``), from :mod:`keycloak_auth.resilience`
+  - ``cache_hits_total``, ``cache_misses_total``, ``cache_evictions_total``,
+    ``cache_shared_hits_total`` and ``cache_size`` by ``cache`` (read from
+    :class:`TokenCache` stats)
+
+``outcome`` is ``ok`` or the name of the :class:`AuthError` raised.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, ContextManager
+
+if TYPE_CHECKING:
+    from .cache import TokenCache
+
+PREFIX = "keycloak_auth_"
+
+#: Histogram bucket upper bounds in seconds (Prometheus ``le`` labels).
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def outcome_of(exc: BaseException | None) -> str:
+    """Label value for a finished operation: ``ok`` or the exception name."""
+    return "ok" if exc is None else type(exc).__name__
+
+
+class Metrics(ABC):
+    """Sink for instrumentation events."""
+
+    #: Callers skip timing entirely when this is False.
+    enabled: bool = True
+
+    @abstractmethod
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add *value* to the counter *name*."""
+
+    @abstractmethod
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record *value* (seconds) in the histogram *name*."""
+
+    def watch_cache(self, name: str, cache: TokenCache) -> None:
+        """Report *cache*'s hit/miss/eviction counters under ``cache=name``."""
+
+    def track(self, name: str) -> ContextManager[None]:
+        """Count and time a block as ``{name}_total`` / ``{name}_seconds``.
+
+        The outcome label is ``ok`` unless the block raises.
+        """
+        return self._track(name)
+
+    @contextmanager
+    def _track(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self.record(name, outcome_of(error), time.perf_counter() - start)
+
+    def record(self, name: str, outcome: str, seconds: float) -> None:
+        """Count one *name* with *outcome* and observe its duration."""
+        self.increment(f"{name}_total", outcome=outcome)
+        self.observe(f"{name}_seconds", seconds, outcome=outcome)
+
+
+class NullMetrics(Metrics):
+    """Discards everything; the default."""
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        pass
+
+    def track(self, name: str) -> ContextManager[None]:
+        return nullcontext()
+
+
+NULL_METRICS = NullMetrics()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class InMemoryMetrics(Metrics):
+    """Thread-safe counters and histograms with Prometheus text output."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = tuple(sorted(buckets))
+        self._counters: dict[str, dict[_Labels, float]] = {}
+        self._histograms: dict[str, dict[_Labels, _Histogram]] = {}
+        self._caches: dict[str, weakref.WeakSet[TokenCache]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self._buckets) + 1)
+            histogram.counts[index] += 1
+            histogram.total += value
+            histogram.count += 1
+
+    def watch_cache(self, name: str, cache: TokenCache) -> None:
+        with self._lock:
+            self._caches.setdefault(name, weakref.WeakSet()).add(cache)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Current value of a counter (0 if never incremented)."""
+        key = tuple(sorted(labels.items()))
+        return self._counters.get(name, {}).get(key, 0)
+
+    def histogram_count(self, name: str, **labels: str) -> int:
+        """Number of observations recorded in a histogram series."""
+        key = tuple(sorted(labels.items()))
+        histogram = self._histograms.get(name, {}).get(key)
+        return histogram.count if histogram is not None else 0
+
+    def render(self) -> str:
+        """Return every series in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{PREFIX}{name}{_format(labels)} {_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    lines.extend(self._render_histogram(name, labels, histogram))
+            caches = {name: list(refs) for name, refs in self._caches.items()}
+        lines.extend(_render_caches(caches))
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(
+        self, name: str, labels: _Labels, histogram: _Histogram
+    ) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip((*self._buckets, float("inf")), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{PREFIX}{name}_bucket{_format((*labels, ('le', le)))} {cumulative}"
+        yield f"{PREFIX}{name}_sum{_format(labels)} {histogram.total!r}"
+        yield f"{PREFIX}{name}_count{_format(labels)} {histogram.count}"
+
+
+def _render_caches(caches: dict[str, list[TokenCache]]) -> Iterator[str]:
+    if not caches:
+        return
+    totals = {}
+    for name, members in sorted(caches.items()):
+        stats = [cache.stats() for cache in members]
+        totals[name] = {
+            "hits": sum(s.hits for s in stats),
+            "misses": sum(s.misses for s in stats),
+            "evictions": sum(s.evictions for s in stats),
+            "shared_hits": sum(s.shared_hits for s in stats),
+            "size": sum(s.size for s in stats),
+        }
+    for field, kind, suffix in (
+        ("hits", "counter", "_total"),
+        ("misses", "counter", "_total"),
+        ("evictions", "counter", "_total"),
+        ("shared_hits", "counter", "_total"),
+        ("size", "gauge", ""),
+    ):
+        metric = f"{PREFIX}cache_{field}{suffix}"
+        yield f"# TYPE {metric} {kind}"
+        for name, values in totals.items():
+            yield f"{metric}{_format((('cache', name),))} {values[field]}"
+
+
+def _format(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
@@ -1,10 +1,20 @@
-"""Pydantic models for decoded JWT token claims."""
+"""Models for decoded JWT token claims.
+
+``TokenClaims`` is the pydantic model for claims built from untrusted
+input. ``TrustedTokenClaims`` is the subclass validators return after
+the signature (or introspection) has been verified: it is constructed
+from the payload without per-field validation (a ``model_copy`` of a
+``model_construct`` template), checks only ``sub`` and ``exp``, and
+derives role and scope sets lazily on first access.
+"""
 
 from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .exceptions import TokenInvalid
 
 
 class TokenClaims(BaseModel):
@@ -33,6 +43,17 @@ class TokenClaims(BaseModel):
 
     raw: dict[str, Any] = Field(default_factory=dict, exclude=True)
 
+    # Interned grant masks per GrantIndex (see ``keycloak_auth.policies``).
+    _grant_masks: dict[int, tuple[int, int]] = PrivateAttr(default_factory=dict)
+
+    def __copy__(self) -> TokenClaims:
+        # Private attributes are derived caches; a copy (e.g. model_copy
+        # with an update) must not share them.
+        clone = super().__copy__()
+        private = {name: {} for name in self.__pydantic_private__ or ()}
+        object.__setattr__(clone, "__pydantic_private__", private)
+        return clone
+
     # --- Convenience helpers ---
 
     @property
@@ -61,3 +82,104 @@ class TokenClaims(BaseModel):
         if client_id:
             return bool(roles & self.client_roles(client_id))
         return bool(roles & self.realm_roles)
+
+
+_EMPTY: dict[str, Any] = {}
+
+
+class TrustedTokenClaims(TokenClaims):
+    """Claims of an already verified token: a :class:`TokenClaims` built
+    without per-field validation.
+
+    ``TrustedTokenClaims(payload)`` checks only ``sub`` and ``exp`` and
+    keeps *payload* as ``raw`` without copying it. ``realm_roles``,
+    ``scopes`` and ``client_roles()`` are computed once and cached as
+    frozensets. Keyword arguments validate like :class:`TokenClaims`.
+    """
+
+    _derived: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def __new__(
+        cls, payload: dict[str, Any] | None = None, /, **data: Any
+    ) -> TrustedTokenClaims:
+        if payload is None:
+            return super().__new__(cls)
+        sub, exp = payload.get("sub"), payload.get("exp")
+        if not isinstance(sub, str) or not isinstance(exp, (int, float)):
+            raise TokenInvalid("Token is missing required claims")
+        values = {name: payload[name] for name in payload.keys() & _FIELDS}
+        values["exp"] = int(exp)
+        values["realm_access"] = payload.get("realm_access") or {}
+        values["resource_access"] = payload.get("resource_access") or {}
+        values["raw"] = payload
+        # model_copy() of an unvalidated model_construct() template: both
+        # public, and much cheaper per token than model_construct() itself.
+        template = _TEMPLATES.get(cls)
+        if template is None:
+            template = _TEMPLATES[cls] = cls.model_construct(set(), **_DEFAULTS)
+        return template.model_copy(update=values)
+
+    def __init__(self, payload: dict[str, Any] | None = None, /, **data: Any):
+        # With a payload, __new__ has already built the instance.
+        if payload is None:
+            super().__init__(**data)
+
+    # --- Convenience helpers (same semantics as TokenClaims, cached) ---
+
+    @property
+    def realm_roles(self) -> frozenset[str]:  # type: ignore[override]
+        """Roles granted at the realm level."""
+        derived = self.__pydantic_private__["_derived"]
+        roles = derived.get("realm")
+        if roles is None:
+            roles = derived["realm"] = frozenset(self.realm_access.get("roles", ()))
+        return roles
+
+    def client_roles(self, client_id: str) -> frozenset[str]:  # type: ignore[override]
+        """Roles granted for a specific client."""
+        derived = self.__pydantic_private__["_derived"]
+        key = ("client", client_id)
+        roles = derived.get(key)
+        if roles is None:
+            roles = derived[key] = frozenset(
+                self.resource_access.get(client_id, _EMPTY).get("roles", ())
+            )
+        return roles
+
+    @property
+    def scopes(self) -> frozenset[str]:  # type: ignore[override]
+        """OAuth2 scopes from the ``scope`` claim."""
+        derived = self.__pydantic_private__["_derived"]
+        scopes = derived.get("scopes")
+        if scopes is None:
+            scope = self.scope
+            scopes = derived["scopes"] = (
+                frozenset(scope.split()) if scope else frozenset()
+            )
+        return scopes
+
+    def has_any_role(self, roles: set[str], client_id: str | None = None) -> bool:
+        if client_id:
+            return not self.client_roles(client_id).isdisjoint(roles)
+        return not self.realm_roles.isdisjoint(roles)
+
+    # --- Interop ---
+
+    def to_model(self) -> TokenClaims:
+        """Fully validated pydantic :class:`TokenClaims` for this payload."""
+        return TokenClaims(**self.raw, raw=self.raw)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TrustedTokenClaims):
+            return self.raw == other.raw
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TrustedTokenClaims(sub={self.sub!r}, exp={self.exp!r})"
+
+
+_DEFAULTS: dict[str, Any] = dict.fromkeys(TokenClaims.model_fields)
+_TEMPLATES: dict[type[TrustedTokenClaims], TrustedTokenClaims] = {}
+_FIELDS = frozenset(_DEFAULTS) - {"raw"}
@@ -0,0 +1,300 @@
+"""Precompiled authorization policies.
+
+Requirements are declared once — typically at import time next to the
+route — and compiled into bit masks over a :class:`GrantIndex`. Each
+token's realm roles, client roles and scopes are then interned once into
+a single integer, so every subsequent check is a couple of integer
+operations instead of building and comparing Python sets.
+
+Usage::
+
+    from keycloak_auth.policies import AllOf, AnyOf, compile_policy
+
+    can_edit = compile_policy(
+        AllOf(realm_roles={"user"})
+        & (AnyOf(client_roles={"my-app": {"editor", "owner"}}) | AllOf(scopes={"write"}))
+    )
+
+    can_edit.allows(claims)    # -> bool
+    can_edit.enforce(claims)   # raises InsufficientPermissions
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Mapping
+from functools import lru_cache
+
+from .exceptions import InsufficientPermissions
+from .models import TokenClaims
+
+_Check = Callable[[int], bool]
+
+
+class GrantIndex:
+    """Assigns one bit to every grant referenced by a compiled policy.
+
+    Grants that no policy mentions never get a bit, so interning a token
+    only looks at the handful of roles and scopes that actually matter.
+    """
+
+    def __init__(self) -> None:
+        self._realm: dict[str, int] = {}
+        self._clients: dict[str, dict[str, int]] = {}
+        self._scopes: dict[str, int] = {}
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _bit(self, table: dict[str, int], name: str) -> int:
+        mask = table.get(name)
+        if mask is None:
+            with self._lock:
+                mask = table.get(name)
+                if mask is None:
+                    mask = table[name] = 1 << self._size
+                    self._size += 1
+                    self._version += 1
+        return mask
+
+    def realm_mask(self, roles: Iterable[str]) -> int:
+        mask = 0
+        for role in roles:
+            mask |= self._bit(self._realm, role)
+        return mask
+
+    def client_mask(self, client_id: str, roles: Iterable[str]) -> int:
+        table = self._clients.get(client_id)
+        if table is None:
+            with self._lock:
+                table = self._clients.setdefault(client_id, {})
+        mask = 0
+        for role in roles:
+            mask |= self._bit(table, role)
+        return mask
+
+    def scope_mask(self, scopes: Iterable[str]) -> int:
+        mask = 0
+        for scope in scopes:
+            mask |= self._bit(self._scopes, scope)
+        return mask
+
+    def grants(self, claims: TokenClaims) -> int:
+        """Return the interned grant mask of *claims* (computed once per token)."""
+        cached = claims._grant_masks.get(id(self))
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        version = self._version
+        mask = 0
+        realm = self._realm
+        if realm:
+            for role in claims.realm_access.get("roles", ()):
+                mask |= realm.get(role, 0)
+        if self._clients:
+            access = claims.resource_access
+            for client_id, table in self._clients.items():
+                client = access.get(client_id)
+                if client:
+                    for role in client.get("roles", ()):
+                        mask |= table.get(role, 0)
+        scopes = self._scopes
+        if scopes and claims.scope:
+            for scope in claims.scope.split():
+                mask |= scopes.get(scope, 0)
+
+        claims._grant_masks[id(self)] = (version, mask)
+        return mask
+
+
+DEFAULT_INDEX = GrantIndex()
+
+
+class Requirement(ABC):
+    """A declarative authorization requirement; combine with ``&`` and ``|``."""
+
+    def __and__(self, other: Requirement) -> Requirement:
+        return _Both(self, other)
+
+    def __or__(self, other: Requirement) -> Requirement:
+        return _Either(self, other)
+
+    @abstractmethod
+    def _compile(self, index: GrantIndex) -> _Check:
+        """Return a predicate over an interned grant mask."""
+
+    @abstractmethod
+    def _explain(self, claims: TokenClaims, index: GrantIndex) -> str:
+        """Describe why *claims* fail this requirement (slow path only)."""
+
+
+class _GrantSet(Requirement):
+    """Shared shape of :class:`AllOf` and :class:`AnyOf`."""
+
+    def __init__(
+        self,
+        *,
+        realm_roles: Iterable[str] = (),
+        client_roles: Mapping[str, Iterable[str]] | None = None,
+        scopes: Iterable[str] = (),
+    ):
+        self.realm_roles = frozenset(realm_roles)
+        self.client_roles = {
+            client_id: frozenset(roles)
+            for client_id, roles in (client_roles or {}).items()
+        }
+        self.scopes = frozenset(scopes)
+        if not (self.realm_roles or self.scopes or any(self.client_roles.values())):
+            raise ValueError(f"{type(self).__name__} needs at least one grant")
+
+    def _mask(self, index: GrantIndex) -> int:
+        mask = index.realm_mask(self.realm_roles) | index.scope_mask(self.scopes)
+        for client_id, roles in self.client_roles.items():
+            mask |= index.client_mask(client_id, roles)
+        return mask
+
+    def _indexed(self, index: GrantIndex) -> bool:
+        """Whether every grant already has a bit in *index*."""
+        clients = index._clients
+        return (
+            index._realm.keys() >= self.realm_roles
+            and index._scopes.keys() >= self.scopes
+            and all(
+                clients.get(client_id, {}).keys() >= roles
+                for client_id, roles in self.client_roles.items()
+            )
+        )
+
+    def _missing(self, claims: TokenClaims) -> tuple[set[str], set[str]]:
+        roles = self.realm_roles - claims.realm_roles
+        for client_id, required in self.client_roles.items():
+            roles |= required - claims.client_roles(client_id)
+        return roles, set(self.scopes - claims.scopes)
+
+
+class AllOf(_GrantSet):
+    """Every listed realm role, client role and scope is required."""
+
+    def _compile(self, index: GrantIndex) -> _Check:
+        mask = self._mask(index)
+        return lambda grants: grants & mask == mask
+
+    def _explain(self, claims: TokenClaims, index: GrantIndex) -> str:
+        roles, scopes = self._missing(claims)
+        if roles:
+            return f"Missing required roles: {', '.join(sorted(roles))}"
+        return f"Missing required scopes: {', '.join(sorted(scopes))}"
+
+
+class AnyOf(_GrantSet):
+    """At least one of the listed grants is required."""
+
+    def _compile(self, index: GrantIndex) -> _Check:
+        mask = self._mask(index)
+        return lambda grants: grants & mask != 0
+
+    def _explain(self, claims: TokenClaims, index: GrantIndex) -> str:
+        roles, scopes = self._missing(claims)
+        return f"Requires any of: {', '.join(sorted(roles | scopes))}"
+
+
+class _Both(Requirement):
+
+    def __init__(self, left: Requirement, right: Requirement):
+        self.left, self.right = left, right
+
+    def _compile(self, index: GrantIndex) -> _Check:
+        left, right = self.left._compile(index), self.right._compile(index)
+        return lambda grants: left(grants) and right(grants)
+
+    def _explain(self, claims: TokenClaims, index: GrantIndex) -> str:
+        if not self.left._compile(index)(index.grants(claims)):
+            return self.left._explain(claims, index)
+        return self.right._explain(claims, index)
+
+
+class _Either(Requirement):
+
+    def __init__(self, left: Requirement, right: Requirement):
+        self.left, self.right = left, right
+
+    def _compile(self, index: GrantIndex) -> _Check:
+        left, right = self.left._compile(index), self.right._compile(index)
+        return lambda grants: left(grants) or right(grants)
+
+    def _explain(self, claims: TokenClaims, index: GrantIndex) -> str:
+        left = self.left._explain(claims, index)
+        return f"{left}; or {self.right._explain(claims, index)}"
+
+
+class CompiledPolicy:
+    """A :class:`Requirement` bound to a :class:`GrantIndex`."""
+
+    __slots__ = ("requirement", "_index", "_check")
+
+    def __init__(self, requirement: Requirement, index: GrantIndex):
+        self.requirement = requirement
+        self._index = index
+        self._check = requirement._compile(index)
+
+    def allows(self, claims: TokenClaims) -> bool:
+        return self._check(self._index.grants(claims))
+
+    def enforce(self, claims: TokenClaims) -> None:
+        """Raise :class:`InsufficientPermissions` unless *claims* satisfy the policy."""
+        if not self._check(self._index.grants(claims)):
+            raise InsufficientPermissions(
+                self.requirement._explain(claims, self._index)
+            )
+
+
+def compile_policy(
+    requirement: Requirement,
+    index: GrantIndex | None = None,
+) -> CompiledPolicy:
+    """Compile *requirement* against *index* (the shared index by default)."""
+    return CompiledPolicy(requirement, DEFAULT_INDEX if index is None else index)
+
+
+class _UnindexedPolicy:
+    """An :class:`AllOf` checked with plain sets, outside any index."""
+
+    __slots__ = ("requirement",)
+
+    def __init__(self, requirement: AllOf):
+        self.requirement = requirement
+
+    def allows(self, claims: TokenClaims) -> bool:
+        roles, scopes = self.requirement._missing(claims)
+        return not (roles or scopes)
+
+    def enforce(self, claims: TokenClaims) -> None:
+        if not self.allows(claims):
+            raise InsufficientPermissions(
+                self.requirement._explain(claims, DEFAULT_INDEX)
+            )
+
+
+def _ad_hoc(requirement: AllOf) -> CompiledPolicy | _UnindexedPolicy:
+    # Bits are never freed, so arbitrary ad-hoc grants must not claim new
+    # ones in the shared index; they reuse bits that policies declared.
+    if requirement._indexed(DEFAULT_INDEX):
+        return compile_policy(requirement)
+    return _UnindexedPolicy(requirement)
+
+
+@lru_cache(maxsize=256)
+def role_policy(
+    roles: frozenset[str], client_id: str | None = None
+) -> CompiledPolicy | _UnindexedPolicy:
+    """All-of policy for *roles* (memoised for ad-hoc checks)."""
+    if client_id:
+        return _ad_hoc(AllOf(client_roles={client_id: roles}))
+    return _ad_hoc(AllOf(realm_roles=roles))
+
+
+@lru_cache(maxsize=256)
+def scope_policy(scopes: frozenset[str]) -> CompiledPolicy | _UnindexedPolicy:
+    """All-of policy for *scopes* (memoised for ad-hoc checks)."""
+    return _ad_hoc(AllOf(scopes=scopes))
@@ -0,0 +1,227 @@
+"""Multi-realm (multi-tenant) authenticator registry.
+
+One backend can serve many Keycloak realms: the SPA names its realm in a
+request header (``X-Relm`` by default) and :class:`RealmRegistry` hands
+back an :class:`Authenticator` bound to that realm. Authenticators — and
+with them their validator and JWKS key manager — are created on first
+use and the least recently used realms are evicted once ``max_realms``
+is reached, so memory stays bounded however many tenants exist.
+
+The header is client input, so a realm only enters the registry once a
+token from it has validated: requests naming made-up realms cannot
+evict the live ones. Until then its authenticator waits in a separate,
+equally bounded probation list, so repeated requests for an unproven
+realm reuse one key manager (with its rate limits, negative cache and
+circuit breaker) instead of fetching the JWKS every time, and
+concurrent first requests build it once. Distinct made-up realm names
+can still each cost one JWKS request; set ``allowed_realms`` to rule
+that out.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .authenticator import Authenticator
+from .config import KeycloakSettings
+from .decoding import ParsedToken
+from .exceptions import TokenInvalid, TokenMissing
+from .models import TokenClaims
+from .singleflight import SingleFlight
+from .validators import IntrospectionPolicy
+
+_REALM_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,254}$")
+
+
+class RealmRegistry:
+    """Lazily built, LRU-bounded map of realm name to :class:`Authenticator`."""
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        factory: Callable[[KeycloakSettings], Authenticator] | None = None,
+        max_realms: int | None = None,
+    ):
+        self._settings = settings
+        self._factory = factory or Authenticator
+        self._max_realms_override = max_realms
+        self._max_realms = max_realms or settings.max_realms
+        self._allowed = frozenset(settings.allowed_realms)
+        self._issuer_prefix = settings.for_realm("").issuer
+        self._authenticators: OrderedDict[str, Authenticator] = OrderedDict()
+        # Built for realms that have not served a valid token yet.
+        self._probation: OrderedDict[str, Authenticator] = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    @property
+    def header_name(self) -> str:
+        """Request header carrying the realm name."""
+        return self._settings.realm_header
+
+    @property
+    def default_realm(self) -> str:
+        return self._settings.realm
+
+    def get(self, realm: str | None = None) -> Authenticator:
+        """Return the authenticator for *realm* (default realm when ``None``)."""
+        realm = realm or self.default_realm
+        authenticator, cached = self._lookup(realm)
+        return authenticator if cached else self._admit(realm, authenticator)
+
+    def reconfigure(self, settings: KeycloakSettings) -> frozenset[str]:
+        """Apply *settings* to the registry and every live realm.
+
+        Returns the fields that changed in the base settings. Realms that
+        are no longer allowed are evicted.
+        """
+        with self._lock:
+            changed = self._settings.changed_fields(settings)
+            self._settings = settings
+            self._max_realms = self._max_realms_override or settings.max_realms
+            self._allowed = frozenset(settings.allowed_realms)
+            self._issuer_prefix = settings.for_realm("").issuer
+            self._probation.clear()
+            live = list(self._authenticators.items())
+        for realm, authenticator in live:
+            if self._allowed and realm not in self._allowed:
+                self.evict(realm)
+            else:
+                authenticator.reconfigure(settings.for_realm(realm))
+        return changed
+
+    def evict(self, realm: str) -> None:
+        """Forget *realm*'s authenticator (it is rebuilt on next use)."""
+        with self._lock:
+            self._authenticators.pop(realm, None)
+            self._probation.pop(realm, None)
+
+    def authenticate(self, token: str | None, realm: str | None = None) -> TokenClaims:
+        """Validate *token* against *realm*'s keys and issuer."""
+        realm, authenticator, cached = self._for_token(token, realm)
+        claims = authenticator.authenticate(token)
+        if not cached:
+            self._admit(realm, authenticator)
+        return claims
+
+    async def authenticate_async(
+        self, token: str | None, realm: str | None = None
+    ) -> TokenClaims:
+        """Async variant of :meth:`authenticate`."""
+        realm, authenticator, cached = self._for_token(token, realm)
+        claims = await authenticator.authenticate_async(token)
+        if not cached:
+            self._admit(realm, authenticator)
+        return claims
+
+    async def confirm_async(
+        self,
+        token: str,
+        claims: TokenClaims,
+        policy: IntrospectionPolicy,
+        realm: str | None = None,
+    ) -> bool:
+        """Same as :meth:`Authenticator.confirm_async` for *realm*."""
+        return await self.get(realm).confirm_async(token, claims, policy)
+
+    def verify_logout_token(self, token: str) -> dict[str, Any]:
+        """Verify a back-channel logout token against the realm in its ``iss``."""
+        issuer = ParsedToken.parse(token).unverified_payload().get("iss")
+        prefix = self._issuer_prefix
+        if not isinstance(issuer, str) or not issuer.startswith(prefix):
+            raise TokenInvalid("Logout token issuer is not a known realm")
+        realm = issuer[len(prefix):]
+        authenticator, cached = self._lookup(realm)
+        payload = authenticator.verify_logout_token(token)
+        if not cached:
+            self._admit(realm, authenticator)
+        return payload
+
+    def require_roles(
+        self,
+        claims: TokenClaims,
+        roles: set[str],
+        client_id: str | None = None,
+    ) -> None:
+        """Same as :meth:`Authenticator.require_roles`."""
+        self.get().require_roles(claims, roles, client_id=client_id)
+
+    def require_scopes(self, claims: TokenClaims, scopes: set[str]) -> None:
+        """Same as :meth:`Authenticator.require_scopes`."""
+        self.get().require_scopes(claims, scopes)
+
+    def __len__(self) -> int:
+        return len(self._authenticators)
+
+    def __contains__(self, realm: str) -> bool:
+        return realm in self._authenticators
+
+    # --- Internals -------------------------------------------------------
+
+    def _check_realm(self, realm: str) -> None:
+        if not _REALM_NAME.match(realm):
+            raise TokenInvalid("Invalid realm")
+        if self._allowed and realm not in self._allowed:
+            raise TokenInvalid("Unknown realm")
+
+    def _lookup(self, realm: str) -> tuple[Authenticator, bool]:
+        """Return *realm*'s authenticator and whether it is already cached.
+
+        An authenticator for an unseen realm is built once and kept on
+        probation; the caller passes it to :meth:`_admit` once it has
+        served a valid token.
+        """
+        with self._lock:
+            authenticator = self._authenticators.get(realm)
+            if authenticator is not None:
+                self._authenticators.move_to_end(realm)
+                return authenticator, True
+            authenticator = self._probation.get(realm)
+            if authenticator is not None:
+                self._probation.move_to_end(realm)
+                return authenticator, False
+        self._check_realm(realm)
+        return self._flight.do(realm, lambda: self._build(realm)), False
+
+    def _build(self, realm: str) -> Authenticator:
+        with self._lock:
+            # A caller that waited for the flight may find it built.
+            authenticator = self._authenticators.get(realm)
+            if authenticator is None:
+                authenticator = self._probation.get(realm)
+        if authenticator is not None:
+            return authenticator
+        authenticator = self._factory(self._settings.for_realm(realm))
+        with self._lock:
+            self._probation[realm] = authenticator
+            while len(self._probation) > self._max_realms:
+                self._probation.popitem(last=False)
+        return authenticator
+
+    def _admit(self, realm: str, authenticator: Authenticator) -> Authenticator:
+        with self._lock:
+            self._probation.pop(realm, None)
+            # Another thread may have raced us; keep the first one.
+            existing = self._authenticators.setdefault(realm, authenticator)
+            self._authenticators.move_to_end(realm)
+            while len(self._authenticators) > self._max_realms:
+                self._authenticators.popitem(last=False)
+        return existing
+
+    def _for_token(
+        self, token: str | None, realm: str | None
+    ) -> tuple[str, Authenticator, bool]:
+        if not token:
+            raise TokenMissing()
+        realm = realm or self.default_realm
+        # Reject tokens minted by another realm before touching the
+        # registry, so a mismatched header neither triggers a JWKS fetch
+        # nor evicts a live realm.
+        issuer = ParsedToken.parse(token).unverified_payload().get("iss")
+        if issuer != self._issuer_prefix + realm:
+            raise TokenInvalid("Token issuer does not match realm")
+        authenticator, cached = self._lookup(realm)
+        return realm, authenticator, cached
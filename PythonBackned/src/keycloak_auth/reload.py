@@ -0,0 +1,119 @@
+"""Hot reload of :class:`KeycloakSettings`.
+
+:class:`SettingsWatcher` polls ``config.yaml`` (by modification time) and
+the ``KEYCLOAK_*`` environment variables. When either changes it builds
+fresh settings and hands them to :meth:`Authenticator.reconfigure` (or
+:meth:`RealmRegistry.reconfigure`), which swaps validators atomically
+and keeps every cache the change does not affect.
+
+Usage::
+
+    watcher = SettingsWatcher(authenticator, interval=5.0)
+    watcher.start()
+    ...
+    watcher.stop()
+
+Settings are rebuilt with *factory*. By default that is
+``KeycloakSettings``, or ``KeycloakSettings.from_file(config_path)``
+when the watcher is given a *config_path*, so the file that is watched
+is also the one that is read. Values that were passed as constructor
+arguments are not preserved; keep reloadable values in the config file
+or the environment. Invalid configuration is logged and ignored until
+the next change.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Protocol
+
+from pydantic import ValidationError
+
+from . import config
+from .config import KeycloakSettings
+
+logger = logging.getLogger(__name__)
+
+_ENV_PREFIX = "KEYCLOAK_"
+
+
+class Reconfigurable(Protocol):
+    def reconfigure(self, settings: KeycloakSettings) -> frozenset[str]: ...
+
+
+class SettingsWatcher:
+    """Polls configuration sources and reconfigures *target* on change."""
+
+    def __init__(
+        self,
+        target: Reconfigurable,
+        interval: float = 5.0,
+        factory: Callable[[], KeycloakSettings] | None = None,
+        config_path: str | os.PathLike[str] | None = None,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self._target = target
+        self._interval = interval
+        if config_path:
+            self._config_path = Path(config_path)
+            default = partial(KeycloakSettings.from_file, self._config_path)
+        else:
+            self._config_path = config.CONFIG_PATH
+            default = KeycloakSettings
+        self._factory = factory or default
+        self._signature = self._sources()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sources(self) -> tuple[object, ...]:
+        env = sorted(
+            (key, value) for key, value in os.environ.items()
+            if key.startswith(_ENV_PREFIX)
+        )
+        return config.config_signature(self._config_path), tuple(env)
+
+    def check(self) -> frozenset[str]:
+        """Poll once; return the fields that were changed on the target."""
+        signature = self._sources()
+        if signature == self._signature:
+            return frozenset()
+        self._signature = signature
+        try:
+            settings = self._factory()
+        except (ValidationError, ValueError, OSError) as exc:
+            logger.warning("Ignoring invalid Keycloak configuration: %s", exc)
+            return frozenset()
+        changed = self._target.reconfigure(settings)
+        if changed:
+            logger.info("Reloaded Keycloak settings: %s", ", ".join(sorted(changed)))
+        return changed
+
+    def start(self) -> None:
+        """Start polling in a daemon thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="keycloak-settings-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.check()
+            except Exception:  # keep watching; the next change may fix it
+                logger.exception("Keycloak settings reload failed")
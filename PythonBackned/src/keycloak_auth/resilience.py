@@ -0,0 +1,285 @@
+"""Circuit breaker and bulkhead for outbound Keycloak calls.
+
+A slow or failing Keycloak should cost the API one short timeout, not
+a worker per request. Each component that talks to Keycloak
+(:class:`JWKSKeyManager`, the introspection validators,
+:class:`ServiceTokenProvider`) sends its requests through a
+:class:`KeycloakGuard`:
+
+  - The :class:`Bulkhead` lets at most ``max_concurrent_requests`` calls
+    run at once (separately for threads and for the event loop). Others
+    wait up to ``request_queue_timeout`` seconds for a slot and then
+    fail with :class:`KeycloakUnavailable`.
+  - The :class:`CircuitBreaker` opens after ``breaker_failure_threshold``
+    consecutive failures. While it is open, calls fail at once with
+    :class:`CircuitOpen`. After ``breaker_reset_timeout`` seconds it is
+    half-open: a single probe call goes through, and its result closes
+    the breaker or opens it again.
+
+Callers fall back on what they already hold. The key manager keeps
+serving cached keys (up to ``jwks_max_staleness``), cached introspection
+verdicts are still answered, the service-token provider keeps its
+current token, and :class:`TieredTokenValidator` can accept the offline
+verdict (``introspection_fail_open``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from .config import KeycloakSettings
+from .exceptions import CircuitOpen, KeycloakUnavailable
+from .metrics import NULL_METRICS, Metrics
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures; recovers through half-open probes.
+
+    *failure_threshold* consecutive failures open the breaker (0 never
+    opens it). After *reset_timeout* seconds up to *half_open_probes*
+    calls are let through; the first result decides the new state.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        name: str = "keycloak",
+        metrics: Metrics | None = None,
+    ):
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._max_probes = half_open_probes
+        self._name = name
+        self._metrics = metrics or NULL_METRICS
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        if self._state == OPEN and self._retry_in() <= 0:
+            return HALF_OPEN
+        return self._state
+
+    def acquire(self) -> None:
+        """Ask to make a call; raise :class:`CircuitOpen` if it may not."""
+        if self._state == CLOSED:
+            return
+        with self._lock:
+            if self._state == OPEN:
+                if self._retry_in() > 0:
+                    self._reject()
+                self._transition(HALF_OPEN)
+                self._probes = 0
+            if self._state == HALF_OPEN:
+                if self._probes >= self._max_probes:
+                    self._reject()
+                self._probes += 1
+
+    def success(self) -> None:
+        """Report that a permitted call succeeded."""
+        if self._state == CLOSED and not self._failures:
+            return
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def failure(self) -> None:
+        """Report that a permitted call failed."""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED
+                and self._threshold
+                and self._failures >= self._threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Report that a permitted call ended without a result (cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self._reset_timeout - time.monotonic()
+
+    def _reject(self) -> None:
+        if self._metrics.enabled:
+            self._metrics.increment(
+                "calls_rejected_total", client=self._name, reason="circuit_open"
+            )
+        raise CircuitOpen(
+            f"Keycloak {self._name} calls suspended after repeated failures"
+        )
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        if self._metrics.enabled:
+            self._metrics.increment(
+                "circuit_transitions_total", client=self._name, state=state
+            )
+
+
+class Bulkhead:
+    """Caps concurrent calls: *max_concurrent* per side (0: unlimited).
+
+    Threads and coroutines have separate slots, since a coroutine must
+    not block the event loop waiting for a thread's slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 0,
+        queue_timeout: float = 0.0,
+        name: str = "keycloak",
+        metrics: Metrics | None = None,
+    ):
+        self._queue_timeout = queue_timeout
+        self._name = name
+        self._metrics = metrics or NULL_METRICS
+        self._slots: threading.BoundedSemaphore | None = None
+        self._async_slots: asyncio.Semaphore | None = None
+        if max_concurrent > 0:
+            self._slots = threading.BoundedSemaphore(max_concurrent)
+            self._async_slots = asyncio.Semaphore(max_concurrent)
+
+    def acquire(self) -> None:
+        if self._slots is not None and not self._slots.acquire(
+            timeout=self._queue_timeout
+        ):
+            self._reject()
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    async def acquire_async(self) -> None:
+        slots = self._async_slots
+        if slots is None:
+            return
+        if not slots.locked():
+            await slots.acquire()
+            return
+        try:
+            await asyncio.wait_for(slots.acquire(), self._queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject()
+
+    def release_async(self) -> None:
+        if self._async_slots is not None:
+            self._async_slots.release()
+
+    def _reject(self) -> None:
+        if self._metrics.enabled:
+            self._metrics.increment(
+                "calls_rejected_total", client=self._name, reason="bulkhead"
+            )
+        raise KeycloakUnavailable(f"Too many concurrent Keycloak {self._name} calls")
+
+
+class KeycloakGuard:
+    """Runs calls to one Keycloak endpoint behind a bulkhead and a breaker.
+
+    A call that raises counts as a failure of the endpoint. Wrap the
+    request and the decoding of its body, but not the interpretation of
+    a well-formed response (an inactive token is not a Keycloak fault).
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker | None = None,
+        bulkhead: Bulkhead | None = None,
+    ):
+        self._breaker = breaker or CircuitBreaker(failure_threshold=0)
+        self._bulkhead = bulkhead or Bulkhead()
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: KeycloakSettings,
+        name: str,
+        metrics: Metrics | None = None,
+    ) -> KeycloakGuard:
+        """A guard for the *name* client (``jwks``, ``introspection``...)."""
+        return cls(
+            CircuitBreaker(
+                settings.breaker_failure_threshold,
+                settings.breaker_reset_timeout,
+                name=name,
+                metrics=metrics,
+            ),
+            Bulkhead(
+                settings.max_concurrent_requests,
+                settings.request_queue_timeout,
+                name=name,
+                metrics=metrics,
+            ),
+        )
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def bulkhead(self) -> Bulkhead:
+        return self._bulkhead
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run *fn* if the breaker and the bulkhead allow it."""
+        self._breaker.acquire()
+        try:
+            self._bulkhead.acquire()
+        except BaseException:
+            self._breaker.release()
+            raise
+        try:
+            result = fn()
+        except Exception:
+            self._breaker.failure()
+            raise
+        except BaseException:
+            self._breaker.release()
+            raise
+        finally:
+            self._bulkhead.release()
+        self._breaker.success()
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async :meth:`call`; waiting for a slot does not block the loop."""
+        self._breaker.acquire()
+        try:
+            await self._bulkhead.acquire_async()
+        except BaseException:
+            self._breaker.release()
+            raise
+        try:
+            result = await fn()
+        except Exception:
+            self._breaker.failure()
+            raise
+        except BaseException:
+            self._breaker.release()
+            raise
+        finally:
+            self._bulkhead.release_async()
+        self._breaker.success()
+        return result
@@ -0,0 +1,247 @@
+"""Local revocation list fed by OpenID Connect back-channel logout.
+
+Offline JWKS validation cannot tell that a user logged out. Keycloak can
+POST a signed *logout token* to each client when a session ends (client
+setting "Backchannel logout URL"). :func:`verify_logout_token` checks it,
+and :class:`RevocationList` remembers the ended session (``sid``) or
+subject (``sub``) until every access token issued for it has expired.
+:class:`JWKSTokenValidator` consults the list on every validation,
+including token-cache hits.
+
+Lookups are plain dictionary reads, so checking a token costs a few hash
+probes and no lock. Entries expire after ``revocation_ttl`` seconds, which
+should be at least the realm's access-token lifespan.
+
+Keycloak delivers each logout to one worker only. With a
+:class:`CacheBackend` (``cache_backend: shared``) revocations are also
+published there, and a token that is not revoked locally is looked up
+in the backend, so a logout received by any worker applies to all.
+"""
+
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import jwt
+
+from .backends import backend_from_settings
+from .cache import claims_namespace
+from .exceptions import TokenExpired, TokenInvalid
+
+if TYPE_CHECKING:
+    from .backends import CacheBackend
+    from .config import KeycloakSettings
+    from .jwks import JWKSKeyManager
+    from .models import TokenClaims
+
+BACKCHANNEL_LOGOUT_EVENT = "http://schemas.openid.net/event/backchannel-logout"
+
+# Shared entries: revoked_at, expires_at.
+_ENTRY = struct.Struct("<dd")
+
+
+class RevocationList:
+    """Revoked sessions, subjects and token ids with expiry.
+
+    - a revoked ``sid`` rejects every token of that session (Keycloak puts
+      the session id in ``sid``, or ``session_state`` in older versions);
+    - a revoked ``sub`` rejects that subject's tokens issued at or before
+      the revocation, so the user can log in again right away;
+    - a revoked ``jti`` rejects one specific token.
+
+    Each kind holds at most *max_entries* values; the oldest go first.
+
+    With a *backend*, revocations are also written there (keys prefixed
+    with *namespace*) and read back by every list sharing it.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 100_000,
+        backend: CacheBackend | None = None,
+        namespace: bytes = b"",
+    ):
+        if ttl <= 0 or max_entries <= 0:
+            raise ValueError("ttl and max_entries must be positive")
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._backend = backend
+        self._namespace = namespace
+        # value -> expires_at (subjects: value -> (revoked_at, expires_at))
+        self._sessions: OrderedDict[str, float] = OrderedDict()
+        self._tokens: OrderedDict[str, float] = OrderedDict()
+        self._subjects: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: KeycloakSettings) -> RevocationList:
+        return cls(
+            ttl=settings.revocation_ttl,
+            backend=backend_from_settings(settings),
+            namespace=claims_namespace(settings, "revocation"),
+        )
+
+    @property
+    def backend(self) -> CacheBackend | None:
+        return self._backend
+
+    def revoke(
+        self,
+        *,
+        sid: str | None = None,
+        sub: str | None = None,
+        jti: str | None = None,
+    ) -> None:
+        """Revoke a session, a subject's current tokens and/or one token.
+
+        A subject's tokens are compared by ``iat``, at one-second
+        resolution: tokens issued before the second of the revocation
+        end, while one issued within that second (possibly a new login)
+        stays valid. Revoke by ``sid`` to end a session exactly.
+        """
+        now = time.time()
+        expires_at = now + self._ttl
+        # ``iat`` has one-second resolution: a token issued in the second
+        # of the logout may be a fresh login, so only earlier ones end.
+        revoked_at = float(int(now))
+        with self._lock:
+            if sid:
+                self._remember(self._sessions, sid, expires_at)
+            if jti:
+                self._remember(self._tokens, jti, expires_at)
+            if sub:
+                self._remember(self._subjects, sub, (revoked_at, expires_at))
+            self._purge(now)
+        if self._backend is not None:
+            entry = _ENTRY.pack(revoked_at, expires_at)
+            for kind, value in ((b"sid", sid), (b"jti", jti), (b"sub", sub)):
+                if value:
+                    self._backend.set(self._key(kind, value), entry, self._ttl)
+
+    def revoke_logout(self, logout_claims: dict[str, Any]) -> None:
+        """Record a verified logout token (see :func:`verify_logout_token`).
+
+        A logout token names a session (``sid``), in which case only that
+        session ends, or otherwise a subject (``sub``) whose every session
+        ended.
+        """
+        sid = logout_claims.get("sid")
+        if sid:
+            self.revoke(sid=sid)
+        else:
+            self.revoke(sub=logout_claims.get("sub"))
+
+    def is_revoked(self, claims: TokenClaims) -> bool:
+        """Whether *claims* belong to a revoked session, subject or token."""
+        raw = claims.raw
+        now = time.time()
+        sid = raw.get("sid") or raw.get("session_state")
+        if sid is not None:
+            expires_at = self._sessions.get(sid)
+            if expires_at is not None and expires_at > now:
+                return True
+        jti = raw.get("jti")
+        if jti is not None:
+            expires_at = self._tokens.get(jti)
+            if expires_at is not None and expires_at > now:
+                return True
+        iat = raw.get("iat")
+        entry = self._subjects.get(claims.sub)
+        if entry is not None:
+            revoked_at, expires_at = entry
+            if expires_at > now and (iat is None or iat < revoked_at):
+                return True
+        if self._backend is None:
+            return False
+        return self._shared_revoked(sid, jti, claims.sub, iat, now)
+
+    def clear(self) -> None:
+        """Forget the local entries (shared ones expire on their own)."""
+        with self._lock:
+            self._sessions.clear()
+            self._tokens.clear()
+            self._subjects.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions) + len(self._tokens) + len(self._subjects)
+
+    def _remember(self, entries: OrderedDict[str, Any], key: str, value: Any) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+
+    def _key(self, kind: bytes, value: str) -> bytes:
+        return self._namespace + kind + b"\0" + value.encode()
+
+    def _shared_revoked(
+        self,
+        sid: str | None,
+        jti: str | None,
+        sub: str,
+        iat: Any,
+        now: float,
+    ) -> bool:
+        backend = self._backend
+        for kind, value in ((b"sid", sid), (b"jti", jti), (b"sub", sub)):
+            if not isinstance(value, str):
+                continue
+            data = backend.get(self._key(kind, value))  # type: ignore[union-attr]
+            if data is None or len(data) != _ENTRY.size:
+                continue
+            revoked_at, expires_at = _ENTRY.unpack(data)
+            if expires_at <= now:
+                continue
+            if kind != b"sub" or iat is None or iat < revoked_at:
+                return True
+        return False
+
+    def _purge(self, now: float) -> None:
+        # Every entry lives for the same TTL, so the oldest expire first.
+        for entries in (self._sessions, self._tokens):
+            while entries and next(iter(entries.values())) <= now:
+                entries.popitem(last=False)
+        while self._subjects and next(iter(self._subjects.values()))[1] <= now:
+            self._subjects.popitem(last=False)
+
+
+def verify_logout_token(
+    token: str, key_manager: JWKSKeyManager, settings: KeycloakSettings
+) -> dict[str, Any]:
+    """Verify a back-channel logout token and return its claims.
+
+    Checks the signature against the realm's JWKS, the issuer, the
+    audience (``client_id``) and the logout-token rules of OpenID Connect
+    Back-Channel Logout 1.0 §2.6. Raises :class:`TokenInvalid` otherwise.
+    """
+    jwk = key_manager.get_jwk(token)
+    try:
+        # Pinned to the key's own algorithm, which the key manager only
+        # accepts when it is listed in ``settings.algorithms``.
+        claims = jwt.decode(
+            token,
+            jwk.key,
+            algorithms=[jwk.algorithm_name],
+            issuer=settings.issuer,
+            audience=settings.client_id,
+            leeway=settings.leeway,
+            options={"require": ["iat"]},
+        )
+    except jwt.ExpiredSignatureError as exc:
+        raise TokenExpired() from exc
+    except jwt.InvalidTokenError as exc:
+        raise TokenInvalid(str(exc)) from exc
+
+    events = claims.get("events")
+    if not isinstance(events, dict) or BACKCHANNEL_LOGOUT_EVENT not in events:
+        raise TokenInvalid("Not a logout token")
+    if "nonce" in claims:
+        raise TokenInvalid("Logout token must not contain a nonce")
+    if not claims.get("sid") and not claims.get("sub"):
+        raise TokenInvalid("Logout token names neither a session nor a subject")
+    return claims
@@ -0,0 +1,310 @@
+"""Client-credentials access tokens for calls to other services.
+
+Usage::
+
+    from keycloak_auth import ServiceTokenProvider
+
+    tokens = ServiceTokenProvider(settings)          # client_id + client_secret
+    client = httpx.Client(auth=tokens.auth)          # or httpx.AsyncClient
+    client.get("https://orders.internal/api/orders")
+
+Like :class:`JWKSKeyManager`, the provider keeps the caller off the
+network almost always:
+
+  - The token is reused until ``refresh_ahead`` seconds (at most half
+    its lifetime) before it expires.
+  - After that, the next caller still gets the current token and a
+    refresh starts in the background — a thread for :meth:`get_token`,
+    a task for :meth:`get_token_async`.
+  - Only a missing or expired token makes callers wait, and concurrent
+    callers share one request to the token endpoint. Threads and
+    coroutines coalesce separately: if both need a token at the same
+    moment, one request is made for each side (a thread cannot await
+    the loop, and the loop must not block on a thread).
+  - A failed background refresh is retried after ``retry_interval``
+    seconds while the current token stays valid.
+
+Requests go through the pooled clients of :mod:`keycloak_auth.http_client`
+and a :class:`KeycloakGuard` (bulkhead and circuit breaker), and fail
+with :class:`KeycloakUnavailable`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass
+
+import httpx
+
+from .config import KeycloakSettings
+from .exceptions import KeycloakUnavailable
+from .metrics import NULL_METRICS, Metrics
+from .resilience import KeycloakGuard
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+_FETCH_KEY = "token"
+
+
+@dataclass(frozen=True)
+class ServiceToken:
+    """An access token and when (``time.monotonic()``) to stop using it."""
+
+    access_token: str
+    token_type: str
+    expires_at: float
+    refresh_at: float
+    scope: str = ""
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class ServiceTokenProvider:
+    """Obtains, caches and refreshes a client-credentials access token.
+
+    *scope* is sent with every token request when given. *client* and
+    *async_client* replace the pooled clients built from *settings*.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        scope: str = "",
+        refresh_ahead: float = 30.0,
+        retry_interval: float = 5.0,
+        client: httpx.Client | None = None,
+        async_client: httpx.AsyncClient | None = None,
+        metrics: Metrics | None = None,
+        guard: KeycloakGuard | None = None,
+    ):
+        if not settings.client_secret:
+            raise ValueError("client_secret is required for client-credentials tokens")
+        self._settings = settings
+        self._form = {
+            "grant_type": "client_credentials",
+            "client_id": settings.client_id,
+            "client_secret": settings.client_secret,
+        }
+        if scope:
+            self._form["scope"] = scope
+        self._refresh_ahead = refresh_ahead
+        self._retry_interval = retry_interval
+        self._client = client
+        self._async_client = async_client
+        self._metrics = metrics or NULL_METRICS
+        self._guard = guard or KeycloakGuard.from_settings(
+            settings, "service_token", metrics
+        )
+
+        self._token: ServiceToken | None = None
+        self._failed_at = float("-inf")
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_task: asyncio.Task | None = None
+
+    # --- Public API ------------------------------------------------------
+
+    @property
+    def token(self) -> ServiceToken | None:
+        """The cached token, if any (never fetches)."""
+        return self._token
+
+    @property
+    def auth(self) -> ServiceTokenAuth:
+        """An :class:`httpx.Auth` that sends the token (sync and async)."""
+        return ServiceTokenAuth(self)
+
+    def get_token(self) -> str:
+        """Return a valid access token, fetching one only when necessary."""
+        token = self._token
+        if token is None or token.expired:
+            token = self._flight.do(_FETCH_KEY, self._fetch_if_needed)
+        elif self._refresh_due(token):
+            self._schedule_refresh()
+        return token.access_token
+
+    async def get_token_async(self) -> str:
+        """Async :meth:`get_token`; never blocks the event loop."""
+        token = self._token
+        if token is None or token.expired:
+            token = await self._async_flight.do(
+                _FETCH_KEY, self._fetch_if_needed_async
+            )
+        elif self._refresh_due(token) and self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self._background_refresh_async()
+            )
+        return token.access_token
+
+    def invalidate(self, access_token: str | None = None) -> None:
+        """Forget the cached token (only if it is *access_token*, when given).
+
+        Call this when a downstream service rejects the token, so the next
+        :meth:`get_token` fetches a new one.
+        """
+        token = self._token
+        if token is not None and access_token in (None, token.access_token):
+            self._token = None
+
+    def close(self) -> None:
+        """Close the sync HTTP client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close both HTTP clients."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    # --- Internals -------------------------------------------------------
+
+    def _refresh_due(self, token: ServiceToken) -> bool:
+        now = time.monotonic()
+        return now >= token.refresh_at and now - self._failed_at >= self._retry_interval
+
+    def _fetch_if_needed(self) -> ServiceToken:
+        # A caller that waited for the lock may find the token renewed.
+        token = self._token
+        if token is not None and not token.expired:
+            return token
+        return self._fetch()
+
+    async def _fetch_if_needed_async(self) -> ServiceToken:
+        token = self._token
+        if token is not None and not token.expired:
+            return token
+        return await self._fetch_async()
+
+    def _schedule_refresh(self) -> None:
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._background_refresh, name="service-token-refresh", daemon=True
+        ).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._flight.do(_FETCH_KEY, self._fetch)
+        except KeycloakUnavailable:
+            pass  # keep the current token; retried after retry_interval
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    async def _background_refresh_async(self) -> None:
+        try:
+            await self._async_flight.do(_FETCH_KEY, self._fetch_async)
+        except KeycloakUnavailable:
+            pass
+        finally:
+            self._refresh_task = None
+
+    def _fetch(self) -> ServiceToken:
+        with self._metrics.track("service_token"):
+            try:
+                token = self._guard.call(self._post)
+            except KeycloakUnavailable:
+                self._failed_at = time.monotonic()
+                raise
+        self._token = token
+        return token
+
+    async def _fetch_async(self) -> ServiceToken:
+        with self._metrics.track("service_token"):
+            try:
+                token = await self._guard.call_async(self._post_async)
+            except KeycloakUnavailable:
+                self._failed_at = time.monotonic()
+                raise
+        self._token = token
+        return token
+
+    def _post(self) -> ServiceToken:
+        if self._client is None:
+            from .http_client import create_client
+
+            self._client = create_client(self._settings)
+        try:
+            response = self._client.post(self._settings.token_uri, data=self._form)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise KeycloakUnavailable(f"Token request failed: {exc}") from exc
+        return self._parse(response)
+
+    async def _post_async(self) -> ServiceToken:
+        if self._async_client is None:
+            from .http_client import create_async_client
+
+            self._async_client = create_async_client(self._settings)
+        try:
+            response = await self._async_client.post(
+                self._settings.token_uri, data=self._form
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise KeycloakUnavailable(f"Token request failed: {exc}") from exc
+        return self._parse(response)
+
+    def _parse(self, response: httpx.Response) -> ServiceToken:
+        # Runs inside the guard, so a garbled body counts as a failure.
+        try:
+            payload = response.json()
+            access_token = payload["access_token"]
+            if not isinstance(access_token, str) or not access_token:
+                raise TypeError("access_token is not a string")
+            lifetime = float(payload["expires_in"])
+            token_type = payload.get("token_type") or "Bearer"
+            scope = payload.get("scope", "")
+        except (TypeError, KeyError, ValueError) as exc:
+            raise KeycloakUnavailable("Malformed token response") from exc
+        now = time.monotonic()
+        return ServiceToken(
+            access_token=access_token,
+            token_type=token_type,
+            expires_at=now + lifetime,
+            refresh_at=now + lifetime - min(self._refresh_ahead, lifetime / 2),
+            scope=scope,
+        )
+
+
+class ServiceTokenAuth(httpx.Auth):
+    """Adds the provider's token to requests; retries once after a 401."""
+
+    def __init__(self, provider: ServiceTokenProvider):
+        self._provider = provider
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        token = self._provider.get_token()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            self._provider.invalidate(token)
+            request.headers["Authorization"] = f"Bearer {self._provider.get_token()}"
+            yield request
+
+    async def async_auth_flow(
+        self, request: httpx.Request
+    ) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        token = await self._provider.get_token_async()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            self._provider.invalidate(token)
+            token = await self._provider.get_token_async()
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
@@ -0,0 +1,76 @@
+"""On-disk JWKS snapshots for fast cold starts.
+
+A :class:`JWKSSnapshot` stores the last JWKS document fetched for a realm
+together with its fetch time. New workers load it at startup and can
+validate tokens before (or without) reaching Keycloak. Writes go to a
+temporary file in the same directory followed by :func:`os.replace`, so
+readers never see a partially written snapshot.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class JWKSSnapshot:
+    """A JWKS document persisted at *path* for the JWKS endpoint *jwks_uri*."""
+
+    def __init__(self, path: str | os.PathLike[str], jwks_uri: str):
+        self.path = Path(path)
+        self.jwks_uri = jwks_uri
+
+    @classmethod
+    def in_directory(cls, directory: str, realm: str, jwks_uri: str) -> JWKSSnapshot:
+        """Snapshot file for *realm* inside *directory*."""
+        return cls(Path(directory) / f"jwks-{_UNSAFE.sub('_', realm)}.json", jwks_uri)
+
+    def load(self, max_age: float) -> tuple[dict[str, Any], float] | None:
+        """Return ``(jwks, age_seconds)``, or ``None`` if missing, foreign or too old."""
+        try:
+            with self.path.open() as fh:
+                stored = json.load(fh)
+            fetched_at = float(stored["fetched_at"])
+            jwks = stored["jwks"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable JWKS snapshot %s: %s", self.path, exc)
+            return None
+
+        if stored.get("jwks_uri") != self.jwks_uri or not isinstance(jwks, dict):
+            return None
+        age = max(0.0, time.time() - fetched_at)
+        if age > max_age:
+            return None
+        return jwks, age
+
+    def save(self, jwks: dict[str, Any]) -> None:
+        """Atomically replace the snapshot with *jwks* (errors are logged, not raised)."""
+        document = {"jwks_uri": self.jwks_uri, "fetched_at": time.time(), "jwks": jwks}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as fh:
+                    json.dump(document, fh)
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as exc:
+            logger.warning("Could not write JWKS snapshot %s: %s", self.path, exc)
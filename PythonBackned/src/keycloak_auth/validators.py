@@ -1,26 +1,67 @@
 """Token validation strategies (Strategy pattern).
 
-Two concrete implementations:
+Concrete implementations:
   - ``JWKSTokenValidator`` – offline, verifies the signature locally.
   - ``IntrospectionTokenValidator`` – online, calls Keycloak's introspection
     endpoint (requires ``client_secret``).
+  - ``TieredTokenValidator`` – JWKS first, plus introspection when an
+    :class:`IntrospectionPolicy` asks for it.
+
+Each has an async counterpart implementing :class:`AsyncTokenValidator`
+so that FastAPI handlers never block the event loop.
+
+httpx is imported only once an introspection validator makes its first
+request, so JWKS-only deployments never load it.
 """
 
 from __future__ import annotations
 
+import asyncio
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-import httpx
-import jwt
+from jwt import PyJWK
 
-from .config import KeycloakSettings
+from .cache import TokenCache, claims_namespace, token_digest
+from .config import (
+    BACKEND_FIELDS,
+    CLAIM_FIELDS,
+    HTTP_FIELDS,
+    INTROSPECTION_FIELDS,
+    KEY_FIELDS,
+    KeycloakSettings,
+)
+from .decoding import DecodePlan, ParsedToken
 from .exceptions import (
+    AuthError,
     KeycloakUnavailable,
-    TokenExpired,
     TokenInvalid,
+    TokenRevoked,
+)
+from .executors import (
+    VerificationExecutor,
+    executor_from_settings,
+    verify_with_jwk,
 )
 from .jwks import JWKSKeyManager
-from .models import TokenClaims
+from .metrics import NULL_METRICS, Metrics
+from .models import TokenClaims, TrustedTokenClaims
+from .resilience import KeycloakGuard
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .revocation import RevocationList
+
+
+BatchResult = list[TokenClaims | AuthError]
 
 
 class TokenValidator(ABC):
@@ -33,74 +74,673 @@ class TokenValidator(ABC):
         Raises an :class:`AuthError` subclass on failure.
         """
 
+    def reconfigured(
+        self, settings: KeycloakSettings, changed: frozenset[str]
+    ) -> TokenValidator:
+        """Return a validator for *settings*, whose *changed* fields differ.
+
+        Used by :meth:`Authenticator.reconfigure`. The default keeps this
+        validator unchanged; built-in validators return a new instance that
+        reuses every cache the change does not affect.
+        """
+        return self
+
+    def validate_many(self, tokens: Iterable[str]) -> BatchResult:
+        """Validate every token, returning claims or the error per position.
+
+        A failing token never stops the batch. Subclasses may override
+        this to share work between tokens.
+        """
+        results: BatchResult = []
+        for token in tokens:
+            try:
+                results.append(self.validate(token))
+            except AuthError as exc:
+                results.append(exc)
+        return results
+
+
+class AsyncTokenValidator(ABC):
+    """Async interface for validators used from an event loop."""
+
+    @abstractmethod
+    async def validate(self, token: str) -> TokenClaims:
+        """Validate *token* without blocking the loop and return its claims.
+
+        Raises an :class:`AuthError` subclass on failure.
+        """
+
+    def retire(self, grace: float) -> None:
+        """Release resources once this validator has been replaced.
+
+        Called by :meth:`Authenticator.reconfigure` from any thread;
+        calls still in flight get *grace* seconds to finish. The default
+        holds nothing to release.
+        """
+
+
+class ThreadedTokenValidator(AsyncTokenValidator):
+    """Adapts any synchronous :class:`TokenValidator` by running it in a thread.
+
+    *executor* selects the thread pool (or inline execution); process
+    pools cannot run arbitrary validators, so they fall back to the
+    default thread pool.
+    """
+
+    def __init__(
+        self,
+        validator: TokenValidator,
+        executor: VerificationExecutor | None = None,
+    ):
+        self._validator = validator
+        self._executor = executor if executor and executor.in_process else None
+
+    async def validate(self, token: str) -> TokenClaims:
+        if self._executor is None:
+            return await asyncio.to_thread(self._validator.validate, token)
+        return await self._executor.run(self._validator.validate, token)
+
 
 class JWKSTokenValidator(TokenValidator):
-    """Validates tokens offline using the JWKS public key."""
+    """Validates tokens offline using the JWKS public key.
+
+    When a :class:`TokenCache` is supplied (or enabled through
+    ``KeycloakSettings.token_cache_size``), a token that was already
+    verified is served from the cache without a key lookup or signature
+    check. *metrics* is passed on to the default key manager and reports
+    the cache under ``cache="token"``.
+
+    Each JWKS key is verified with the algorithm it is published with
+    (``alg``, e.g. RS256, PS256, ES256 or EdDSA), as long as that
+    algorithm is listed in ``KeycloakSettings.algorithms``.
+
+    With a :class:`RevocationList`, tokens of logged-out sessions are
+    rejected with :class:`TokenRevoked`, whether verified or cached.
+    """
 
     def __init__(
         self,
         settings: KeycloakSettings,
         key_manager: JWKSKeyManager | None = None,
+        token_cache: TokenCache | None = None,
+        metrics: Metrics | None = None,
+        revocations: RevocationList | None = None,
     ):
         self._settings = settings
-        self._key_manager = key_manager or JWKSKeyManager(settings)
+        self._metrics = metrics
+        self._revocations = revocations
+        self._key_manager = key_manager or JWKSKeyManager(settings, metrics=metrics)
+        if token_cache is None:
+            token_cache = TokenCache.from_settings(settings)
+        self._token_cache = token_cache
+        if metrics is not None and token_cache is not None:
+            metrics.watch_cache("token", token_cache)
+        self._plan = DecodePlan.from_settings(settings)
+
+    @property
+    def token_cache(self) -> TokenCache | None:
+        return self._token_cache
+
+    @property
+    def key_manager(self) -> JWKSKeyManager:
+        return self._key_manager
+
+    @property
+    def revocations(self) -> RevocationList | None:
+        return self._revocations
+
+    def check_revoked(self, claims: TokenClaims) -> TokenClaims:
+        """Return *claims*, or raise :class:`TokenRevoked` if they were revoked."""
+        if self._revocations is not None and self._revocations.is_revoked(claims):
+            raise TokenRevoked()
+        return claims
+
+    def reconfigured(
+        self, settings: KeycloakSettings, changed: frozenset[str]
+    ) -> JWKSTokenValidator:
+        key_manager = None if changed & KEY_FIELDS else self._key_manager
+        cache = self._token_cache
+        if changed & ({"token_cache_size", "token_cache_ttl"} | BACKEND_FIELDS):
+            cache = None  # rebuilt from the new settings
+        elif cache is not None and changed & CLAIM_FIELDS:
+            cache = cache.fresh(claims_namespace(settings, "token"))
+        return type(self)(
+            settings,
+            key_manager=key_manager,
+            token_cache=cache,
+            metrics=self._metrics,
+            revocations=self._revocations,
+        )
+
+    @property
+    def decode_plan(self) -> DecodePlan:
+        return self._plan
 
     def validate(self, token: str) -> TokenClaims:
-        key = self._key_manager.get_signing_key(token)
-
-        decode_options: dict = {}
-        algorithms = ["RS256"]
-        kwargs: dict = {
-            "algorithms": algorithms,
-            "options": decode_options,
-        }
-        if self._settings.audience:
-            kwargs["audience"] = self._settings.audience
+        if self._token_cache is not None:
+            cached = self._token_cache.get(token)
+            if cached is not None:
+                return self.check_revoked(cached)
+
+        parsed = ParsedToken.parse(token)
+        jwk = self._key_manager.get_signing_key_for_kid(parsed.kid)
+        return self._decode(token, parsed, jwk)
+
+    def validate_many(
+        self,
+        tokens: Iterable[str],
+        max_workers: int | None = None,
+    ) -> BatchResult:
+        """Validate a batch, looking up each signing key once per ``kid``.
+
+        Tokens are grouped by the ``kid`` in their header; every group
+        resolves its key a single time and the signature checks run in
+        parallel on a thread pool. Results keep the input order.
+        """
+        tokens = list(tokens)
+        results: BatchResult = [None] * len(tokens)  # type: ignore[list-item]
+        groups: dict[str | None, list[int]] = {}
+        parsed: dict[int, ParsedToken] = {}
+
+        for i, token in enumerate(tokens):
+            if self._token_cache is not None:
+                cached = self._token_cache.get(token)
+                if cached is not None:
+                    try:
+                        results[i] = self.check_revoked(cached)
+                    except AuthError as exc:
+                        results[i] = exc
+                    continue
+            try:
+                parsed[i] = ParsedToken.parse(token)
+            except AuthError as exc:
+                results[i] = exc
+                continue
+            groups.setdefault(parsed[i].kid, []).append(i)
+
+        jobs: list[tuple[int, PyJWK]] = []
+        for kid, indexes in groups.items():
+            try:
+                jwk = self._key_manager.get_signing_key_for_kid(kid)
+            except AuthError as exc:
+                for i in indexes:
+                    results[i] = exc
+                continue
+            jobs.extend((i, jwk) for i in indexes)
+
+        def _verify(job: tuple[int, PyJWK]) -> None:
+            i, jwk = job
+            try:
+                results[i] = self._decode(tokens[i], parsed[i], jwk)
+            except AuthError as exc:
+                results[i] = exc
+
+        if len(jobs) <= 1:
+            for job in jobs:
+                _verify(job)
         else:
-            decode_options["verify_aud"] = False
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(_verify, jobs))
+        return results
 
-        kwargs["issuer"] = self._settings.issuer
+    def _decode(self, token: str, parsed: ParsedToken, jwk: PyJWK) -> TokenClaims:
+        # Verification is pinned to the JWK's own algorithm.
+        return self._accept(token, self._plan.verify(parsed, jwk))
+
+    def _accept(self, token: str, payload: dict[str, Any]) -> TokenClaims:
+        claims = self.check_revoked(TrustedTokenClaims(payload))
+        if self._token_cache is not None:
+            self._token_cache.put(token, claims)
+        return claims
+
+    async def validate_in(self, executor: VerificationExecutor, token: str) -> TokenClaims:
+        """Validate *token* with the signature check run on *executor*.
+
+        For process pools only the token, the raw JWK and the
+        :class:`DecodePlan` cross the process boundary. For them and for
+        inline execution the key lookup stays here and is pushed to a
+        thread only when it may hit the network.
+        """
+        if executor.in_process and not executor.on_loop:
+            return await executor.run(self.validate, token)
+
+        parsed = ParsedToken.parse(token)
+        kid = parsed.kid
+        if executor.on_loop:
+            if self._key_manager.has_key(kid):
+                jwk = self._key_manager.get_signing_key_for_kid(kid)
+            else:
+                jwk = await asyncio.to_thread(
+                    self._key_manager.get_signing_key_for_kid, kid
+                )
+            return self._decode(token, parsed, jwk)
+
+        if self._key_manager.has_key(kid):
+            jwk_data = self._key_manager.get_jwk_data(kid)
+        else:
+            jwk_data = await asyncio.to_thread(self._key_manager.get_jwk_data, kid)
+
+        payload = await executor.run(verify_with_jwk, token, jwk_data, self._plan)
+        return self._accept(token, payload)
 
-        try:
-            payload = jwt.decode(token, key, **kwargs)
-        except jwt.ExpiredSignatureError as exc:
-            raise TokenExpired() from exc
-        except jwt.InvalidTokenError as exc:
-            raise TokenInvalid(str(exc)) from exc
 
-        return TokenClaims(**payload, raw=payload)
+class AsyncJWKSTokenValidator(AsyncTokenValidator):
+    """Async JWKS validation.
+
+    Cache hits are answered directly on the event loop; the key lookup
+    (which may fetch the JWKS) and the signature check run on *executor*
+    — the shared thread pool unless configured otherwise.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        key_manager: JWKSKeyManager | None = None,
+        token_cache: TokenCache | None = None,
+        *,
+        sync_validator: JWKSTokenValidator | None = None,
+        executor: VerificationExecutor | None = None,
+    ):
+        self._sync_validator = sync_validator or JWKSTokenValidator(
+            settings, key_manager=key_manager, token_cache=token_cache
+        )
+        self._executor = executor or executor_from_settings(settings)
+
+    async def validate(self, token: str) -> TokenClaims:
+        cache = self._sync_validator.token_cache
+        if cache is not None:
+            cached = cache.get(token)
+            if cached is not None:
+                return self._sync_validator.check_revoked(cached)
+        return await self._sync_validator.validate_in(self._executor, token)
 
 
 class IntrospectionTokenValidator(TokenValidator):
-    """Validates tokens online via Keycloak's introspection endpoint."""
+    """Validates tokens online via Keycloak's introspection endpoint.
 
-    def __init__(self, settings: KeycloakSettings):
+    Requests go through a pooled keep-alive client and a
+    :class:`KeycloakGuard` (bulkhead and circuit breaker). Active results
+    are cached for ``introspection_cache_ttl`` seconds (never past
+    ``exp``) and concurrent introspections of the same token share one
+    call.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        client: httpx.Client | None = None,
+        cache: TokenCache | None = None,
+        metrics: Metrics | None = None,
+        guard: KeycloakGuard | None = None,
+    ):
         self._settings = settings
         if not settings.client_secret:
             raise ValueError(
                 "client_secret is required for introspection validation"
             )
+        self._client = client
+        if cache is None:
+            cache = TokenCache.for_introspection(settings)
+        self._cache = cache
+        self._metrics = metrics or NULL_METRICS
+        if cache is not None:
+            self._metrics.watch_cache("introspection", cache)
+        self._flight = SingleFlight()
+        self._guard = guard or KeycloakGuard.from_settings(
+            settings, "introspection", metrics
+        )
+
+    @property
+    def cache(self) -> TokenCache | None:
+        return self._cache
+
+    @property
+    def guard(self) -> KeycloakGuard:
+        return self._guard
+
+    def reconfigured(
+        self, settings: KeycloakSettings, changed: frozenset[str]
+    ) -> IntrospectionTokenValidator:
+        client, cache, guard = self._client, self._cache, self._guard
+        if changed & INTROSPECTION_FIELDS:
+            cache = None
+        if changed & ({"verify_ssl"} | HTTP_FIELDS):
+            client = guard = None
+            if self._client is not None:
+                # Let requests still using the old pool finish first.
+                timer = threading.Timer(
+                    self._settings.http_timeout, self._client.close
+                )
+                timer.daemon = True
+                timer.start()
+        return type(self)(
+            settings, client=client, cache=cache, metrics=self._metrics, guard=guard
+        )
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            from .http_client import create_client
+
+            self._client = create_client(self._settings)
+        return self._client
 
     def validate(self, token: str) -> TokenClaims:
+        if self._cache is not None:
+            cached = self._cache.get(token)
+            if cached is not None:
+                return cached
+        return self._flight.do(token_digest(token), lambda: self._introspect(token))
+
+    def _introspect(self, token: str) -> TokenClaims:
+        with self._metrics.track("introspection"):
+            payload = self._guard.call(lambda: self._post(token))
+            claims = _claims_from_introspection(payload)
+        if self._cache is not None:
+            self._cache.put(token, claims)
+        return claims
+
+    def _post(self, token: str) -> dict[str, Any]:
+        import httpx
+
         try:
-            response = httpx.post(
+            response = self._get_client().post(
                 self._settings.introspection_uri,
-                data={
-                    "token": token,
-                    "client_id": self._settings.client_id,
-                    "client_secret": self._settings.client_secret,
-                },
-                verify=self._settings.verify_ssl,
-                timeout=10.0,
+                data=_introspection_form(self._settings, token),
             )
             response.raise_for_status()
         except httpx.HTTPError as exc:
-            raise KeycloakUnavailable(
-                f"Introspection request failed: {exc}"
-            ) from exc
+            raise KeycloakUnavailable(f"Introspection request failed: {exc}") from exc
+        return _introspection_payload(response)
+
+    def close(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class AsyncIntrospectionTokenValidator(AsyncTokenValidator):
+    """Async introspection using a pooled :class:`httpx.AsyncClient`.
+
+    Shares the caching and coalescing behaviour of
+    :class:`IntrospectionTokenValidator`; pass the sync validator's
+    ``cache`` and ``guard`` to let both paths reuse the same results and
+    circuit breaker.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        client: httpx.AsyncClient | None = None,
+        cache: TokenCache | None = None,
+        metrics: Metrics | None = None,
+        guard: KeycloakGuard | None = None,
+    ):
+        self._settings = settings
+        if not settings.client_secret:
+            raise ValueError(
+                "client_secret is required for introspection validation"
+            )
+        self._client = client
+        if cache is None:
+            cache = TokenCache.for_introspection(settings)
+        self._cache = cache
+        self._metrics = metrics or NULL_METRICS
+        if cache is not None:
+            self._metrics.watch_cache("introspection", cache)
+        self._flight = AsyncSingleFlight()
+        self._guard = guard or KeycloakGuard.from_settings(
+            settings, "introspection", metrics
+        )
+        # Loop of the client built here; a client passed in is not ours.
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def cache(self) -> TokenCache | None:
+        return self._cache
+
+    @property
+    def guard(self) -> KeycloakGuard:
+        return self._guard
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            from .http_client import create_async_client
+
+            self._client = create_async_client(self._settings)
+            self._loop = asyncio.get_running_loop()
+        return self._client
+
+    def retire(self, grace: float) -> None:
+        """Close the pooled client on its loop after *grace* seconds."""
+        client, loop = self._client, self._loop
+        if client is None or loop is None or loop.is_closed():
+            return
+
+        def _close_later() -> None:
+            loop.call_later(grace, lambda: loop.create_task(client.aclose()))
+
+        try:
+            loop.call_soon_threadsafe(_close_later)
+        except RuntimeError:
+            pass  # the loop closed meanwhile, and the pool with it
+
+    async def validate(self, token: str) -> TokenClaims:
+        if self._cache is not None:
+            cached = self._cache.get(token)
+            if cached is not None:
+                return cached
+        return await self._flight.do(
+            token_digest(token), lambda: self._introspect(token)
+        )
+
+    async def _introspect(self, token: str) -> TokenClaims:
+        with self._metrics.track("introspection"):
+            payload = await self._guard.call_async(lambda: self._post(token))
+            claims = _claims_from_introspection(payload)
+        if self._cache is not None:
+            self._cache.put(token, claims)
+        return claims
+
+    async def _post(self, token: str) -> dict[str, Any]:
+        import httpx
+
+        try:
+            response = await self._get_client().post(
+                self._settings.introspection_uri,
+                data=_introspection_form(self._settings, token),
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise KeycloakUnavailable(f"Introspection request failed: {exc}") from exc
+        return _introspection_payload(response)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+@dataclass(frozen=True)
+class IntrospectionPolicy:
+    """When a tiered validator confirms a JWKS-verified token online.
+
+    *always* introspects every token; *max_age* (seconds) introspects
+    tokens whose ``iat`` is older than that (or missing); *sample_rate*
+    introspects that random fraction of the remaining requests.
+    """
+
+    always: bool = False
+    max_age: float | None = None
+    sample_rate: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: KeycloakSettings) -> IntrospectionPolicy:
+        return cls(
+            max_age=settings.introspect_after or None,
+            sample_rate=settings.introspect_sample_rate,
+        )
 
+    @property
+    def never(self) -> bool:
+        return not self.always and self.max_age is None and not self.sample_rate
+
+    def applies(self, claims: TokenClaims) -> bool:
+        if self.always:
+            return True
+        if self.max_age is not None:
+            iat = claims.iat
+            if iat is None or time.time() - iat > self.max_age:
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+INTROSPECT_ALWAYS = IntrospectionPolicy(always=True)
+
+
+class TieredTokenValidator(TokenValidator):
+    """Offline JWKS validation with introspection for selected tokens.
+
+    Every token is verified by *offline*; *online* (introspection) is
+    asked in addition when *policy* applies — by default the one built
+    from ``introspect_after`` / ``introspect_sample_rate`` — and whenever
+    :meth:`confirm` is called, e.g. by a route that demands it. Both tiers
+    keep their caches, so an introspection verdict is reused by every
+    later check of the same token.
+
+    With ``introspection_fail_open``, a policy-driven introspection that
+    fails with :class:`KeycloakUnavailable` (e.g. while the circuit
+    breaker is open) falls back to the offline verdict; :meth:`confirm`
+    never does.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        offline: JWKSTokenValidator | None = None,
+        online: IntrospectionTokenValidator | None = None,
+        policy: IntrospectionPolicy | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self._settings = settings
+        self._metrics = metrics
+        self._offline = offline or JWKSTokenValidator(settings, metrics=metrics)
+        self._online = online or IntrospectionTokenValidator(settings, metrics=metrics)
+        self._custom_policy = policy
+        self._policy = policy or IntrospectionPolicy.from_settings(settings)
+        self._fail_open = settings.introspection_fail_open
+
+    @property
+    def offline(self) -> JWKSTokenValidator:
+        return self._offline
+
+    @property
+    def online(self) -> IntrospectionTokenValidator:
+        return self._online
+
+    @property
+    def policy(self) -> IntrospectionPolicy:
+        return self._policy
+
+    @property
+    def fail_open(self) -> bool:
+        return self._fail_open
+
+    @property
+    def token_cache(self) -> TokenCache | None:
+        return self._offline.token_cache
+
+    def reconfigured(
+        self, settings: KeycloakSettings, changed: frozenset[str]
+    ) -> TieredTokenValidator:
+        return type(self)(
+            settings,
+            offline=self._offline.reconfigured(settings, changed),
+            online=self._online.reconfigured(settings, changed),
+            policy=self._custom_policy,
+            metrics=self._metrics,
+        )
+
+    def validate(self, token: str) -> TokenClaims:
+        claims = self._offline.validate(token)
+        if not self._policy.never and self._policy.applies(claims):
+            try:
+                self.confirm(token)
+            except KeycloakUnavailable:
+                if not self._fail_open:
+                    raise
+        return claims
+
+    def confirm(self, token: str) -> None:
+        """Check *token* online; raises if Keycloak reports it inactive."""
+        self._online.validate(token)
+
+
+class AsyncTieredTokenValidator(AsyncTokenValidator):
+    """Async counterpart of :class:`TieredTokenValidator`.
+
+    Build it from the sync validator so that both share the token and
+    introspection caches.
+    """
+
+    def __init__(
+        self,
+        settings: KeycloakSettings,
+        sync_validator: TieredTokenValidator,
+        executor: VerificationExecutor | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self._offline = AsyncJWKSTokenValidator(
+            settings, sync_validator=sync_validator.offline, executor=executor
+        )
+        self._online = AsyncIntrospectionTokenValidator(
+            settings,
+            cache=sync_validator.online.cache,
+            metrics=metrics,
+            guard=sync_validator.online.guard,
+        )
+        self._policy = sync_validator.policy
+        self._fail_open = sync_validator.fail_open
+
+    async def validate(self, token: str) -> TokenClaims:
+        claims = await self._offline.validate(token)
+        if not self._policy.never and self._policy.applies(claims):
+            try:
+                await self.confirm(token)
+            except KeycloakUnavailable:
+                if not self._fail_open:
+                    raise
+        return claims
+
+    async def confirm(self, token: str) -> None:
+        """Check *token* online; raises if Keycloak reports it inactive."""
+        await self._online.validate(token)
+
+    def retire(self, grace: float) -> None:
+        self._online.retire(grace)
+
+
+def _introspection_form(settings: KeycloakSettings, token: str) -> dict[str, str]:
+    return {
+        "token": token,
+        "client_id": settings.client_id,
+        "client_secret": settings.client_secret,
+    }
+
+
+def _introspection_payload(response: httpx.Response) -> dict[str, Any]:
+    # Decoded inside the guard: a garbled body is a Keycloak failure.
+    try:
         payload = response.json()
-        if not payload.get("active"):
-            raise TokenInvalid("Token is not active")
+    except ValueError as exc:
+        raise KeycloakUnavailable("Malformed introspection response") from exc
+    if not isinstance(payload, dict):
+        raise KeycloakUnavailable("Malformed introspection response")
+    return payload
+
 
-        return TokenClaims(**payload, raw=payload)
+def _claims_from_introspection(payload: dict) -> TokenClaims:
+    if not payload.get("active"):
+        raise TokenInvalid("Token is not active")
+    return TrustedTokenClaims(payload)
@@ -8,10 +8,12 @@ from typing import Any
 
 import jwt
 import pytest
+from jwt import PyJWK
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
 from keycloak_auth import Authenticator, KeycloakSettings
+from keycloak_auth.exceptions import SigningKeyNotFound
 from keycloak_auth.validators import JWKSTokenValidator, TokenValidator
 from keycloak_auth.models import TokenClaims
 
@@ -47,6 +49,14 @@ def rsa_public_pem(rsa_public_key) -> bytes:
     )
 
 
+@pytest.fixture(scope="session")
+def jwks_document(rsa_public_key) -> dict[str, Any]:
+    """A JWKS document publishing the test public key as ``test-key-1``."""
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(rsa_public_key))
+    jwk.update({"kid": "test-key-1", "alg": "RS256", "use": "sig"})
+    return {"keys": [jwk]}
+
+
 # ---------------------------------------------------------------------------
 # Settings
 # ---------------------------------------------------------------------------
@@ -128,6 +138,32 @@ class DirectKeyValidator(TokenValidator):
         return TokenClaims(**payload, raw=payload)
 
 
+class StaticKeyManager:
+    """Stand-in for :class:`JWKSKeyManager` that serves one known key."""
+
+    def __init__(self, jwk: PyJWK):
+        self._jwk = jwk
+        self.calls = 0
+
+    def get_jwk(self, token: str) -> PyJWK:
+        self.calls += 1
+        return self._jwk
+
+    def get_signing_key_for_kid(self, kid: str | None) -> PyJWK:
+        self.calls += 1
+        if kid != self._jwk.key_id:
+            raise SigningKeyNotFound()
+        return self._jwk
+
+    def has_key(self, kid: str | None) -> bool:
+        return kid == self._jwk.key_id
+
+
+@pytest.fixture()
+def key_manager(jwks_document) -> StaticKeyManager:
+    return StaticKeyManager(PyJWK(jwks_document["keys"][0]))
+
+
 @pytest.fixture()
 def validator(rsa_public_pem, settings) -> DirectKeyValidator:
     return DirectKeyValidator(rsa_public_pem, settings)
@@ -2,7 +2,14 @@
 
 import pytest
 
-from keycloak_auth.exceptions import InsufficientPermissions, TokenMissing
+from keycloak_auth import Authenticator
+from keycloak_auth.exceptions import InsufficientPermissions, TokenExpired, TokenMissing
+from keycloak_auth.validators import (
+    AsyncIntrospectionTokenValidator,
+    AsyncJWKSTokenValidator,
+    IntrospectionTokenValidator,
+    ThreadedTokenValidator,
+)
 
 
 class TestAuthenticator:
@@ -51,3 +58,44 @@ class TestAuthenticator:
         authenticator.require_roles(claims, {"viewer"}, client_id="my-app")
         with pytest.raises(InsufficientPermissions):
             authenticator.require_roles(claims, {"admin"}, client_id="my-app")
+
+
+class TestAuthenticateAsync:
+
+    async def test_authenticate_async_valid(self, authenticator, make_token):
+        claims = await authenticator.authenticate_async(make_token())
+        assert claims.sub == "user-123"
+
+    async def test_authenticate_async_missing(self, authenticator):
+        with pytest.raises(TokenMissing):
+            await authenticator.authenticate_async(None)
+
+    async def test_default_async_validator_for_jwks(self, settings):
+        auth = Authenticator(settings)
+        assert isinstance(auth.async_validator, AsyncJWKSTokenValidator)
+
+    async def test_default_async_introspection_shares_guard(self, settings):
+        settings = settings.model_copy(update={"client_secret": "secret"})
+        validator = IntrospectionTokenValidator(settings)
+        auth = Authenticator(settings, validator=validator)
+        assert isinstance(auth.async_validator, AsyncIntrospectionTokenValidator)
+        assert auth.async_validator.guard is validator.guard
+
+    async def test_custom_validator_is_offloaded(self, authenticator):
+        assert isinstance(authenticator.async_validator, ThreadedTokenValidator)
+
+
+class TestAuthenticateMany:
+
+    def test_mixed_batch(self, authenticator, make_token):
+        results = authenticator.authenticate_many(
+            [make_token(), None, make_token(expired=True), ""]
+        )
+        assert results[0].sub == "user-123"
+        assert isinstance(results[1], TokenMissing)
+        assert isinstance(results[2], TokenExpired)
+        assert isinstance(results[3], TokenMissing)
+
+    async def test_async_batch(self, authenticator, make_token):
+        results = await authenticator.authenticate_many_async([make_token()])
+        assert results[0].sub == "user-123"
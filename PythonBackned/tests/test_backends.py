@@ -0,0 +1,191 @@
+"""Tests for the cross-worker cache backends."""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from keycloak_auth import MemoryBackend, SharedMemoryBackend
+from keycloak_auth import backends as backends_module
+from keycloak_auth.backends import backend_from_settings
+from keycloak_auth.cache import TokenCache, claims_namespace
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.models import TokenClaims
+
+
+def _claims() -> TokenClaims:
+    return TokenClaims(sub="u1", exp=int(time.time() + 3600))
+
+
+@pytest.fixture()
+def shared(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "cache"), slots=64, slot_size=512)
+    yield backend
+    backend.close()
+
+
+class TestMemoryBackend:
+
+    def test_roundtrip_and_expiry(self, monkeypatch):
+        backend = MemoryBackend()
+        backend.set(b"k", b"v", ttl=10)
+        assert backend.get(b"k") == b"v"
+        later = time.time() + 11
+        monkeypatch.setattr(backends_module.time, "time", lambda: later)
+        assert backend.get(b"k") is None
+
+    def test_bounded(self):
+        backend = MemoryBackend(max_entries=2)
+        for key in (b"a", b"b", b"c"):
+            backend.set(key, key, ttl=10)
+        assert backend.get(b"a") is None
+        assert backend.get(b"c") == b"c"
+
+
+class TestSharedMemoryBackend:
+
+    def test_roundtrip(self, shared):
+        assert shared.get(b"k") is None
+        shared.set(b"k", b"value", ttl=10)
+        assert shared.get(b"k") == b"value"
+        shared.set(b"k", b"other", ttl=10)
+        assert shared.get(b"k") == b"other"
+        shared.delete(b"k")
+        assert shared.get(b"k") is None
+
+    def test_expiry(self, shared, monkeypatch):
+        shared.set(b"k", b"v", ttl=10)
+        later = time.time() + 11
+        monkeypatch.setattr(backends_module.time, "time", lambda: later)
+        assert shared.get(b"k") is None
+
+    def test_oversized_value_is_not_stored(self, shared):
+        shared.set(b"k", b"x" * 1024, ttl=10)
+        assert shared.get(b"k") is None
+
+    def test_full_neighbourhood_replaces_soonest_expiry(self, tmp_path):
+        backend = SharedMemoryBackend(str(tmp_path / "tiny"), slots=1, slot_size=128)
+        backend.set(b"a", b"1", ttl=10)
+        backend.set(b"b", b"2", ttl=20)
+        assert backend.get(b"a") is None
+        assert backend.get(b"b") == b"2"
+        backend.close()
+
+    def test_torn_slot_reads_as_miss(self, shared):
+        shared.set(b"k", b"value", ttl=10)
+        digest = backends_module.hashlib.sha256(b"k").digest()
+        offset = next(
+            o for o in shared._candidates(digest) if shared._mm[o + 4:o + 36] == digest
+        )
+        end = offset + backends_module._SLOT.size
+        shared._mm[end:end + 1] = b"V"
+        assert shared.get(b"k") is None
+
+    def test_visible_to_other_processes(self, shared):
+        shared.set(b"k", b"from-parent", ttl=10)
+        code = (
+            "from keycloak_auth import SharedMemoryBackend as B\n"
+            f"b = B({shared.path!r}, slots=64, slot_size=512)\n"
+            "print(b.get(b'k').decode())\n"
+            "b.set(b'child', b'from-child', 10)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "from-parent"
+        assert shared.get(b"child") == b"from-child"
+
+    def test_layout_mismatch(self, shared):
+        with pytest.raises(ValueError):
+            SharedMemoryBackend(shared.path, slots=128, slot_size=512)
+
+    def test_refuses_file_open_to_others(self, tmp_path):
+        path = tmp_path / "planted"
+        path.write_bytes(b"")
+        path.chmod(0o666)
+        with pytest.raises(PermissionError, match="0600"):
+            SharedMemoryBackend(str(path), slots=64, slot_size=512)
+
+    def test_refuses_symlink(self, tmp_path):
+        target = tmp_path / "target"
+        target.write_bytes(b"")
+        target.chmod(0o600)
+        (tmp_path / "link").symlink_to(target)
+        with pytest.raises(OSError):
+            SharedMemoryBackend(str(tmp_path / "link"), slots=64, slot_size=512)
+
+    def test_from_settings(self, settings, tmp_path):
+        assert backend_from_settings(settings) is None
+        settings = settings.model_copy(
+            update={
+                "cache_backend": "shared",
+                "shared_cache_path": str(tmp_path / "settings-cache"),
+            }
+        )
+        backend = backend_from_settings(settings)
+        assert isinstance(backend, SharedMemoryBackend)
+        assert backend_from_settings(settings) is backend
+
+
+class TestSharedTokenCache:
+
+    def test_claims_verified_once_per_host(self):
+        backend = MemoryBackend()
+        first = TokenCache(max_size=4, backend=backend)
+        second = TokenCache(max_size=4, backend=backend)
+        first.put("tok", _claims())
+
+        claims = second.get("tok")
+        assert claims is not None and claims.sub == "u1"
+        assert second.get("tok") is claims  # promoted to the local level
+        stats = second.stats()
+        assert (stats.hits, stats.shared_hits, stats.misses) == (2, 1, 0)
+
+    def test_namespaces_are_isolated(self, settings):
+        backend = MemoryBackend()
+        other = settings.model_copy(update={"audience": "another-api"})
+        first = TokenCache(backend=backend, namespace=claims_namespace(settings, "t"))
+        second = TokenCache(backend=backend, namespace=claims_namespace(other, "t"))
+        first.put("tok", _claims())
+        assert second.get("tok") is None
+
+    def test_garbage_is_a_miss(self):
+        backend = MemoryBackend()
+        cache = TokenCache(backend=backend)
+        cache.put("tok", _claims())
+        for key in list(backend._entries):
+            backend.set(key, b"{not json", ttl=10)
+        assert cache.fresh().get("tok") is None
+
+
+class TestSharedJWKS:
+
+    def test_one_fetch_serves_every_worker(self, settings, jwks_document, make_token):
+        backend = MemoryBackend()
+        calls = []
+
+        def _manager():
+            manager = JWKSKeyManager(settings, backend=backend)
+            manager._client.fetch_data = lambda: calls.append(1) or jwks_document
+            return manager
+
+        token = make_token()
+        _manager().get_signing_key(token)
+        _manager().get_signing_key(token)
+        assert len(calls) == 1
+
+    def test_unknown_kid_bypasses_shared_copy(
+        self, settings, jwks_document, make_token
+    ):
+        backend = MemoryBackend()
+        first = JWKSKeyManager(settings, backend=backend)
+        first._client.fetch_data = lambda: jwks_document
+        first.get_signing_key(make_token())
+
+        rotated = {"keys": [dict(jwks_document["keys"][0], kid="test-key-2")]}
+        calls = []
+        second = JWKSKeyManager(settings, backend=backend)
+        second._client.fetch_data = lambda: calls.append(1) or rotated
+        second.get_signing_key(make_token(headers={"kid": "test-key-2"}))
+        assert len(calls) == 1
@@ -0,0 +1,94 @@
+"""Tests for the verified-token cache."""
+
+import time
+
+import pytest
+
+from keycloak_auth import Authenticator, KeycloakSettings
+from keycloak_auth.cache import TokenCache
+from keycloak_auth.models import TokenClaims
+from keycloak_auth.validators import JWKSTokenValidator
+
+
+def _claims(exp: float | None = None) -> TokenClaims:
+    return TokenClaims(sub="u1", exp=int(exp or time.time() + 3600))
+
+
+class TestTokenCache:
+
+    def test_miss_then_hit(self):
+        cache = TokenCache(max_size=4)
+        claims = _claims()
+        assert cache.get("tok") is None
+        cache.put("tok", claims)
+        assert cache.get("tok") is claims
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_ratio == 0.5
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_size=2)
+        cache.put("a", _claims())
+        cache.put("b", _claims())
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", _claims())
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats().evictions == 1
+
+    def test_entry_never_outlives_exp(self, monkeypatch):
+        cache = TokenCache(max_size=4, ttl=3600)
+        now = time.time()
+        cache.put("tok", _claims(exp=now + 5))
+        monkeypatch.setattr(time, "time", lambda: now + 6)
+        assert cache.get("tok") is None
+
+    def test_ttl_bounds_long_lived_token(self, monkeypatch):
+        cache = TokenCache(max_size=4, ttl=10)
+        now = time.time()
+        cache.put("tok", _claims(exp=now + 3600))
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        assert cache.get("tok") is None
+
+    def test_expired_claims_not_stored(self):
+        cache = TokenCache(max_size=4)
+        cache.put("tok", _claims(exp=time.time() - 1))
+        assert len(cache) == 0
+
+    def test_from_settings_disabled_by_default(self, settings):
+        assert TokenCache.from_settings(settings) is None
+
+    def test_from_settings(self):
+        s = KeycloakSettings(token_cache_size=8, token_cache_ttl=60)
+        cache = TokenCache.from_settings(s)
+        assert cache is not None
+        assert cache.stats().max_size == 8
+
+
+class TestCachedJWKSValidator:
+
+    def test_repeat_token_skips_key_lookup(self, settings, key_manager, make_token):
+        validator = JWKSTokenValidator(
+            settings, key_manager=key_manager, token_cache=TokenCache()
+        )
+        token = make_token()
+        first = validator.validate(token)
+        second = validator.validate(token)
+        assert first is second
+        assert key_manager.calls == 1
+
+    def test_without_cache_every_call_verifies(self, settings, key_manager, make_token):
+        validator = JWKSTokenValidator(settings, key_manager=key_manager)
+        token = make_token()
+        validator.validate(token)
+        validator.validate(token)
+        assert key_manager.calls == 2
+
+    def test_authenticator_wires_cache(self, settings):
+        cache = TokenCache()
+        auth = Authenticator(settings, token_cache=cache)
+        assert auth.token_cache is cache
+
+    def test_authenticator_rejects_cache_with_custom_validator(self, settings, validator):
+        with pytest.raises(ValueError):
+            Authenticator(settings, validator=validator, token_cache=TokenCache())
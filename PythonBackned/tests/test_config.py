@@ -2,6 +2,9 @@
 
 import os
 
+import pytest
+from pydantic import ValidationError
+
 from keycloak_auth import KeycloakSettings
 
 
@@ -24,3 +27,8 @@ def test_env_override(monkeypatch):
     s = KeycloakSettings()
     assert s.realm == "from-env"
     assert s.server_url == "http://env-host:9090"
+
+
+def test_algorithms_reject_symmetric():
+    with pytest.raises(ValidationError):
+        KeycloakSettings(algorithms=["RS256", "HS256"])
@@ -0,0 +1,141 @@
+"""Tests for the single-pass decode pipeline."""
+
+import base64
+import json
+import time
+
+import jwt
+import pytest
+from jwt import PyJWK
+
+from keycloak_auth.decoding import DecodePlan, ParsedToken
+from keycloak_auth.exceptions import TokenExpired, TokenInvalid
+
+
+def _b64(data: dict) -> str:
+    raw = json.dumps(data).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+@pytest.fixture()
+def plan(settings):
+    return DecodePlan.from_settings(settings)
+
+
+@pytest.fixture()
+def jwk(jwks_document):
+    return PyJWK(jwks_document["keys"][0])
+
+
+def _verify(plan, token, jwk):
+    return plan.verify(ParsedToken.parse(token), jwk)
+
+
+class TestParsedToken:
+
+    def test_header(self, make_token):
+        parsed = ParsedToken.parse(make_token())
+        assert parsed.kid == "test-key-1"
+        assert parsed.header["alg"] == "RS256"
+        assert parsed.unverified_payload()["sub"] == "user-123"
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            "",
+            "abc",
+            "abc.def",
+            "!!!!.e30.sig",
+            f"{_b64({'alg': 'RS256'})[:-1]}.e30.sig",
+            f"{base64.urlsafe_b64encode(b'[1]').decode()}.e30.sig",
+            f"{_b64({'alg': 'RS256', 'kid': 1})}.e30.sig",
+            f"{_b64({'alg': 'RS256', 'crit': ['exp']})}.e30.sig",
+            f"{_b64({'alg': 'RS256', 'b64': False})}..sig",
+            "héader.e30.sig",
+        ],
+    )
+    def test_malformed(self, token):
+        with pytest.raises(TokenInvalid):
+            ParsedToken.parse(token)
+
+
+class TestDecodePlan:
+
+    def test_valid(self, plan, jwk, make_token):
+        assert _verify(plan, make_token(), jwk)["sub"] == "user-123"
+
+    def test_expired(self, plan, jwk, make_token):
+        with pytest.raises(TokenExpired):
+            _verify(plan, make_token(expired=True), jwk)
+
+    def test_leeway(self, settings, jwk, make_token):
+        token = make_token({"exp": int(time.time()) - 5})
+        with pytest.raises(TokenExpired):
+            _verify(DecodePlan.from_settings(settings), token, jwk)
+        lenient = DecodePlan.from_settings(settings.model_copy(update={"leeway": 30}))
+        assert _verify(lenient, token, jwk)["sub"] == "user-123"
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            {"iss": "http://evil/realms/testrealm"},
+            {"iss": "http://localhost:8080/realms/other"},
+            {"exp": None},
+            {"exp": "soon"},
+            {"nbf": int(time.time()) + 600},
+            {"iat": int(time.time()) + 600},
+            {"sub": 42},
+            {"jti": 42},
+        ],
+    )
+    def test_invalid_claims(self, plan, jwk, make_token, claims):
+        with pytest.raises(TokenInvalid):
+            _verify(plan, make_token(claims), jwk)
+
+    @pytest.mark.parametrize(
+        "aud, ok",
+        [
+            ("api", True),
+            (["other", "api"], True),
+            ("other", False),
+            ([1, "api"], False),
+            (None, False),
+        ],
+    )
+    def test_audience(self, settings, jwk, make_token, aud, ok):
+        plan = DecodePlan.from_settings(settings.model_copy(update={"audience": "api"}))
+        token = make_token({"aud": aud})
+        if ok:
+            assert _verify(plan, token, jwk)["aud"] == aud
+        else:
+            with pytest.raises(TokenInvalid):
+                _verify(plan, token, jwk)
+
+    def test_tampered_signature(self, plan, jwk, make_token):
+        header, _, signature = make_token().split(".")
+        forged = ParsedToken.parse(make_token()).unverified_payload()
+        forged = _b64({**forged, "sub": "admin"})
+        with pytest.raises(TokenInvalid, match="Signature verification failed"):
+            _verify(plan, f"{header}.{forged}.{signature}", jwk)
+
+    def test_algorithm_must_match_key(self, plan, jwk, make_token):
+        header, payload, signature = make_token().split(".")
+        for alg in ("none", "HS256", "PS256"):
+            token = f"{_b64({'alg': alg, 'kid': 'test-key-1'})}.{payload}.{signature}"
+            with pytest.raises(TokenInvalid):
+                _verify(plan, token, jwk)
+
+    def test_algorithm_must_be_allowed(self, settings, jwk, make_token):
+        plan = DecodePlan.from_settings(
+            settings.model_copy(update={"algorithms": ["ES256"]})
+        )
+        with pytest.raises(TokenInvalid, match="alg value is not allowed"):
+            _verify(plan, make_token(), jwk)
+
+    def test_matches_pyjwt(self, plan, jwk, make_token, settings):
+        token = make_token({"nbf": int(time.time()) - 1, "jti": "abc"})
+        expected = jwt.decode(
+            token, jwk, algorithms=settings.algorithms, issuer=settings.issuer,
+            options={"verify_aud": False},
+        )
+        assert _verify(plan, token, jwk) == expected
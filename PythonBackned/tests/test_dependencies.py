@@ -9,7 +9,21 @@ from keycloak_auth.fastapi import (
     create_auth_dependency,
     register_auth_error_handlers,
     require_roles,
+    require_scopes,
 )
+from keycloak_auth.validators import TokenValidator
+
+
+class CountingValidator(TokenValidator):
+    """Wraps a validator and counts how often it is invoked."""
+
+    def __init__(self, inner: TokenValidator):
+        self._inner = inner
+        self.calls = 0
+
+    def validate(self, token: str) -> TokenClaims:
+        self.calls += 1
+        return self._inner.validate(token)
 
 
 @pytest.fixture()
@@ -31,6 +45,16 @@ def app(authenticator):
     async def admin(user: TokenClaims = Depends(get_user)):
         return {"msg": "admin"}
 
+    @app.get(
+        "/open",
+        dependencies=[
+            Depends(require_roles(authenticator, set())),
+            Depends(require_scopes(authenticator, set())),
+        ],
+    )
+    async def open_route():
+        return {"msg": "open"}
+
     return app
 
 
@@ -69,9 +93,59 @@ class TestFastAPIDependencies:
         assert resp.status_code == 200
         assert resp.json()["msg"] == "admin"
 
+    def test_empty_requirements_only_authenticate(self, client, make_token):
+        token = make_token({"realm_access": {"roles": []}})
+        resp = client.get("/open", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert client.get("/open").status_code == 401
+
     def test_invalid_token_returns_401(self, client):
         resp = client.get(
             "/profile",
             headers={"Authorization": "Bearer not-a-jwt"},
         )
         assert resp.status_code == 401
+
+
+class TestSingleValidationPerRequest:
+
+    @pytest.fixture()
+    def counting(self, validator):
+        return CountingValidator(validator)
+
+    @pytest.fixture()
+    def counted_client(self, counting, settings):
+        authenticator = Authenticator(settings, validator=counting)
+        app = FastAPI()
+        register_auth_error_handlers(app)
+        get_user = create_auth_dependency(authenticator)
+
+        @app.get(
+            "/stacked",
+            dependencies=[
+                Depends(require_roles(authenticator, {"admin"})),
+                Depends(require_roles(authenticator, {"user"})),
+                Depends(require_scopes(authenticator, {"openid"})),
+            ],
+        )
+        async def stacked(user: TokenClaims = Depends(get_user)):
+            return {"sub": user.sub}
+
+        return TestClient(app)
+
+    def test_stacked_dependencies_validate_once(self, counted_client, counting, make_token):
+        token = make_token({"realm_access": {"roles": ["user", "admin"]}})
+        resp = counted_client.get("/stacked", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert counting.calls == 1
+
+    def test_memo_is_per_request(self, counted_client, counting, make_token):
+        token = make_token({"realm_access": {"roles": ["user", "admin"]}})
+        for _ in range(3):
+            counted_client.get("/stacked", headers={"Authorization": f"Bearer {token}"})
+        assert counting.calls == 3
+
+    def test_missing_scope_returns_403(self, counted_client, make_token):
+        token = make_token({"realm_access": {"roles": ["user", "admin"]}, "scope": "email"})
+        resp = counted_client.get("/stacked", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 403
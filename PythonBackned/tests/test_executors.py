@@ -0,0 +1,113 @@
+"""Tests for signature-verification execution strategies."""
+
+import threading
+
+import pytest
+
+from keycloak_auth import Authenticator
+from keycloak_auth.exceptions import TokenExpired, TokenInvalid
+from keycloak_auth.executors import (
+    InlineExecutor,
+    ProcessPoolVerificationExecutor,
+    ThreadPoolVerificationExecutor,
+    shared_executor,
+)
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.validators import AsyncJWKSTokenValidator
+
+
+@pytest.fixture()
+def jwks_manager(settings, jwks_document):
+    manager = JWKSKeyManager(settings)
+    manager._client.fetch_data = lambda: jwks_document
+    return manager
+
+
+class TestExecutors:
+
+    def test_shared_executor_is_reused(self):
+        assert shared_executor("thread", 2) is shared_executor("thread", 2)
+        assert isinstance(shared_executor("inline"), InlineExecutor)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            shared_executor("gpu")
+
+    async def test_inline_runs_directly(self):
+        assert await InlineExecutor().run(sum, [1, 2]) == 3
+
+    @pytest.mark.parametrize("kind", ["inline", "thread"])
+    async def test_authenticator_executor_kinds(self, settings, validator, make_token, kind):
+        auth = Authenticator(settings, validator=validator, executor=kind)
+        claims = await auth.authenticate_async(make_token())
+        assert claims.sub == "user-123"
+
+    async def test_inline_fetches_keys_off_the_loop(
+        self, settings, jwks_document, make_token
+    ):
+        fetched_on = []
+
+        def _fetch():
+            fetched_on.append(threading.get_ident())
+            return jwks_document
+
+        manager = JWKSKeyManager(settings)
+        manager._client.fetch_data = _fetch
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=manager, executor=InlineExecutor()
+        )
+        for _ in range(2):
+            assert (await async_validator.validate(make_token())).sub == "user-123"
+        assert len(fetched_on) == 1
+        assert fetched_on[0] != threading.get_ident()
+
+    async def test_thread_pool_with_jwks(self, settings, jwks_manager, make_token):
+        executor = ThreadPoolVerificationExecutor(2)
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=jwks_manager, executor=executor
+        )
+        try:
+            assert (await async_validator.validate(make_token())).sub == "user-123"
+        finally:
+            executor.shutdown()
+
+
+@pytest.fixture(scope="module")
+def process_executor():
+    executor = ProcessPoolVerificationExecutor(1)
+    yield executor
+    executor.shutdown()
+
+
+class TestProcessPool:
+
+    @pytest.fixture()
+    def executor(self, process_executor):
+        return process_executor
+
+    async def test_valid_token(self, settings, jwks_manager, make_token, executor):
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=jwks_manager, executor=executor
+        )
+        claims = await async_validator.validate(make_token())
+        assert claims.sub == "user-123"
+
+    async def test_expired_token(self, settings, jwks_manager, make_token, executor):
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=jwks_manager, executor=executor
+        )
+        with pytest.raises(TokenExpired):
+            await async_validator.validate(make_token(expired=True))
+
+    async def test_garbage_token(self, settings, jwks_manager, executor):
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=jwks_manager, executor=executor
+        )
+        with pytest.raises(TokenInvalid):
+            await async_validator.validate("not-a-jwt")
+
+    async def test_custom_validator_falls_back_to_threads(
+        self, settings, validator, make_token, executor
+    ):
+        auth = Authenticator(settings, validator=validator, executor=executor)
+        assert (await auth.authenticate_async(make_token())).sub == "user-123"
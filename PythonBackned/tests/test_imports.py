@@ -0,0 +1,93 @@
+"""Import cost of the package.
+
+Each check runs in a fresh interpreter (from an empty directory, so no
+``config.yaml`` is picked up) and reads ``python -X importtime``.
+The time budget is relative to importing a fixed set of standard library
+modules, measured the same way in an isolated interpreter, so it holds
+on slow and fast machines alike; ``KEYCLOAK_AUTH_IMPORT_BUDGET``
+overrides the factor (e.g. ``1`` to tighten it).
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+#: Standard library imports timed (with ``-I -S``) as the machine's yardstick.
+BASELINE_IMPORTS = "import asyncio, json, decimal, email.parser, http.client"
+#: Self time of keycloak_auth's own modules for the JWKS and FastAPI path,
+#: as a multiple of the baseline's total self time.
+BUDGET_FACTOR = float(os.environ.get("KEYCLOAK_AUTH_IMPORT_BUDGET") or 2)
+#: Best of this many runs, to keep a busy machine from failing the check.
+BUDGET_RUNS = 3
+
+OPTIONAL_MODULES = ("httpx", "yaml", "multiprocessing", "fastapi")
+
+
+def _import_profile(tmp_path, statement, flags=()):
+    """Return ``{module: (self_us, cumulative_us)}`` and the loaded module names."""
+    code = f"{statement}\nimport sys\nprint(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, *flags, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        self_us, cumulative_us, name = line[12:].split("|")
+        if self_us.strip().isdigit():
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings, set(result.stdout.split())
+
+
+def test_bare_import_is_lazy(tmp_path):
+    _, loaded = _import_profile(tmp_path, "import keycloak_auth")
+
+    for module in ("keycloak_auth.config", "jwt", "cryptography", "httpx", "fastapi"):
+        assert module not in loaded
+
+
+def test_settings_do_not_load_jwt(tmp_path):
+    _, loaded = _import_profile(tmp_path, "from keycloak_auth import KeycloakSettings")
+
+    assert "jwt" not in loaded
+    assert "yaml" not in loaded
+
+
+@pytest.mark.parametrize("module", OPTIONAL_MODULES)
+def test_jwks_path_skips_optional_modules(tmp_path, module):
+    _, loaded = _import_profile(
+        tmp_path, "from keycloak_auth import Authenticator, RealmRegistry"
+    )
+    assert module not in loaded
+
+
+def _self_ms(tmp_path, statement, package=None, flags=()):
+    """Fastest of ``BUDGET_RUNS`` total self times (of *package* only, if given)."""
+    runs = []
+    for _ in range(BUDGET_RUNS):
+        timings, _ = _import_profile(tmp_path, statement, flags)
+        runs.append(sum(
+            self_us for name, (self_us, _) in timings.items()
+            if package is None or name.split(".")[0] == package
+        ) / 1000)
+    return min(runs)
+
+
+def test_own_modules_within_budget(tmp_path):
+    baseline_ms = _self_ms(tmp_path, BASELINE_IMPORTS, flags=("-I", "-S"))
+    own_ms = _self_ms(
+        tmp_path,
+        "from keycloak_auth import Authenticator\n"
+        "from keycloak_auth.fastapi import create_auth_dependency",
+        package="keycloak_auth",
+    )
+    assert own_ms < baseline_ms * BUDGET_FACTOR, (
+        f"keycloak_auth imports took {own_ms:.1f} ms, "
+        f"budget {BUDGET_FACTOR} x {baseline_ms:.1f} ms"
+    )
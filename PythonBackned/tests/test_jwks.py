@@ -0,0 +1,355 @@
+"""Tests for JWKSKeyManager caching and refresh behaviour."""
+
+import json
+import threading
+import time
+
+import jwt
+import pytest
+
+from keycloak_auth import KeycloakSettings
+from keycloak_auth.exceptions import (
+    KeycloakUnavailable,
+    SigningKeyNotFound,
+    TokenInvalid,
+)
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.snapshot import JWKSSnapshot
+
+
+class FakeFetcher:
+    """Replaces ``PyJWKClient.fetch_data`` and records every call."""
+
+    def __init__(self, document, delay: float = 0.0):
+        self.document = document
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise jwt.PyJWKClientConnectionError("connection refused")
+        return self.document
+
+
+@pytest.fixture()
+def fetcher(jwks_document):
+    return FakeFetcher(jwks_document)
+
+
+@pytest.fixture()
+def manager(settings, fetcher):
+    mgr = JWKSKeyManager(settings, cache_ttl=300, refresh_ahead=30)
+    mgr._client.fetch_data = fetcher
+    return mgr
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJWKSKeyManager:
+
+    def test_first_lookup_fetches_then_caches(self, manager, fetcher, make_token):
+        token = make_token()
+        manager.get_signing_key(token)
+        manager.get_signing_key(token)
+        assert fetcher.calls == 1
+
+    def test_unknown_kid_raises(self, manager, make_token):
+        token = make_token(headers={"kid": "nope"})
+        with pytest.raises(SigningKeyNotFound) as info:
+            manager.get_signing_key(token)
+        assert info.value.status_code == 401
+
+    def test_fetch_failure_raises(self, manager, fetcher, make_token):
+        fetcher.fail = True
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(make_token())
+
+    @pytest.mark.parametrize(
+        "document", [{"keys": "abc"}, {"keys": ["x"]}, {"keys": None}, ["x"], "x"]
+    )
+    def test_malformed_key_set_is_unavailable(
+        self, manager, fetcher, make_token, document
+    ):
+        fetcher.document = document
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(make_token())
+        assert manager.guard.breaker._failures == 1
+
+    def test_concurrent_misses_collapse_into_one_fetch(self, manager, fetcher, make_token):
+        fetcher.delay = 0.1
+        token = make_token()
+        errors = []
+
+        def _lookup():
+            try:
+                manager.get_signing_key(token)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=_lookup) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert fetcher.calls == 1
+
+    def test_refresh_ahead_runs_in_background(self, manager, fetcher, make_token):
+        token = make_token()
+        manager.get_signing_key(token)
+        # Pretend the key set is about to expire and make the refetch slow.
+        manager._fetched_at -= 290
+        fetcher.delay = 0.2
+
+        started = time.monotonic()
+        key = manager.get_signing_key(token)
+        assert key is not None
+        assert time.monotonic() - started < 0.1  # served the cached key
+        assert _wait_for(lambda: fetcher.calls == 2)
+        assert _wait_for(lambda: manager.age < 1)
+
+    def test_stale_keys_served_when_refresh_fails(self, manager, fetcher, make_token):
+        token = make_token()
+        manager.get_signing_key(token)
+        manager._fetched_at -= 1000
+        fetcher.fail = True
+
+        assert manager.get_signing_key(token) is not None
+        assert _wait_for(lambda: fetcher.calls == 2)
+        assert manager.get_signing_key(token) is not None
+        # Failed refresh is not retried before ``retry_interval``.
+        time.sleep(0.05)
+        assert fetcher.calls == 2
+
+    def test_refresh_warms_cache(self, manager, fetcher, make_token):
+        manager.refresh()
+        manager.get_signing_key(make_token())
+        assert fetcher.calls == 1
+
+
+class TestUnknownKids:
+
+    def test_garbage_token_is_invalid(self, manager, fetcher):
+        with pytest.raises(TokenInvalid):
+            manager.get_signing_key("not-a-jwt")
+        assert fetcher.calls == 0
+
+    def test_unknown_kids_do_not_refetch_within_interval(
+        self, manager, fetcher, make_token
+    ):
+        manager.refresh()
+        for i in range(10):
+            with pytest.raises(SigningKeyNotFound):
+                manager.get_signing_key(make_token(headers={"kid": f"forged-{i}"}))
+        assert fetcher.calls == 2  # only the first miss refetched
+
+    def test_unknown_kid_refetches_after_interval(self, manager, fetcher, make_token):
+        manager.refresh()
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(make_token(headers={"kid": "forged"}))
+        manager._missed_at -= 11
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(make_token(headers={"kid": "rotated"}))
+        assert fetcher.calls == 3
+
+    def test_negative_cache_skips_refetch(self, manager, fetcher, make_token):
+        token = make_token(headers={"kid": "forged"})
+        manager.refresh()
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(token)
+        # Interval elapsed, but "forged" is remembered as unknown.
+        manager._missed_at -= 11
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(token)
+        assert fetcher.calls == 2
+
+    def test_negative_cache_survives_refresh(self, manager, fetcher, make_token):
+        token = make_token(headers={"kid": "forged"})
+        manager.refresh()
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(token)
+        manager.refresh()
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(token)
+        assert fetcher.calls == 3
+
+    def test_new_key_found_after_rotation(
+        self, manager, fetcher, jwks_document, make_token
+    ):
+        manager.refresh()
+        rotated = {"keys": [dict(jwks_document["keys"][0], kid="rotated")]}
+        fetcher.document = rotated
+
+        assert manager.get_signing_key(make_token(headers={"kid": "rotated"})) is not None
+        assert fetcher.calls == 2
+
+    def test_every_rotation_is_picked_up(
+        self, manager, fetcher, jwks_document, make_token
+    ):
+        manager.refresh()
+        for i in range(5):
+            fetcher.document = {
+                "keys": [dict(jwks_document["keys"][0], kid=f"key-{i}")]
+            }
+            assert manager.get_signing_key(make_token(headers={"kid": f"key-{i}"}))
+        assert fetcher.calls == 6
+
+    def test_rotation_after_a_miss_waits_for_interval(
+        self, manager, fetcher, jwks_document, make_token
+    ):
+        manager.refresh()
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(make_token(headers={"kid": "forged"}))
+        fetcher.document = {"keys": [dict(jwks_document["keys"][0], kid="rotated")]}
+        token = make_token(headers={"kid": "rotated"})
+        with pytest.raises(SigningKeyNotFound):
+            manager.get_signing_key(token)
+        manager._missed_at -= 11
+        assert manager.get_signing_key(token) is not None
+
+    def test_joining_an_older_fetch_refetches(
+        self, manager, jwks_document, make_token
+    ):
+        manager.refresh()
+        rotated = {"keys": [dict(jwks_document["keys"][0], kid="rotated")]}
+        documents = [jwks_document, rotated]
+        started, release = threading.Event(), threading.Event()
+
+        def _fetch():
+            document = documents.pop(0)  # the key set as of the request
+            started.set()
+            release.wait(2)
+            return document
+
+        manager._client.fetch_data = _fetch
+        forged = threading.Thread(
+            target=pytest.raises,
+            args=(SigningKeyNotFound, manager.get_signing_key,
+                  make_token(headers={"kid": "forged"})),
+        )
+        forged.start()
+        started.wait(2)
+        threading.Timer(0.1, release.set).start()
+        assert manager.get_signing_key(make_token(headers={"kid": "rotated"}))
+        forged.join()
+        assert documents == []
+
+    def test_intervals_from_settings(self, settings, fetcher, make_token):
+        manager = JWKSKeyManager(settings.model_copy(update={
+            "jwks_unknown_kid_interval": 0, "jwks_negative_ttl": 0,
+        }))
+        manager._client.fetch_data = fetcher
+        manager.refresh()
+        token = make_token(headers={"kid": "forged"})
+        for _ in range(3):
+            with pytest.raises(SigningKeyNotFound):
+                manager.get_signing_key(token)
+        assert fetcher.calls == 4
+
+    def test_fetch_failure_is_still_unavailable(self, settings, fetcher, make_token):
+        manager = JWKSKeyManager(settings)
+        manager._client.fetch_data = fetcher
+        fetcher.fail = True
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(make_token(headers={"kid": "any"}))
+
+
+class TestSnapshots:
+
+    @pytest.fixture()
+    def snapshot_settings(self, tmp_path):
+        return KeycloakSettings(
+            server_url="http://localhost:8080",
+            realm="testrealm",
+            client_id="test-client",
+            jwks_snapshot_dir=str(tmp_path),
+            jwks_max_staleness=3600,
+        )
+
+    def _manager(self, settings, fetcher):
+        manager = JWKSKeyManager(settings)
+        manager._client.fetch_data = fetcher
+        return manager
+
+    def test_fetch_writes_snapshot(self, snapshot_settings, fetcher, tmp_path):
+        self._manager(snapshot_settings, fetcher).refresh()
+
+        stored = json.loads((tmp_path / "jwks-testrealm.json").read_text())
+        assert stored["jwks_uri"] == snapshot_settings.jwks_uri
+        assert stored["jwks"]["keys"][0]["kid"] == "test-key-1"
+        assert [p.name for p in tmp_path.iterdir()] == ["jwks-testrealm.json"]
+
+    def test_new_manager_starts_from_snapshot(
+        self, snapshot_settings, fetcher, make_token
+    ):
+        self._manager(snapshot_settings, fetcher).refresh()
+        fetcher.fail = True
+
+        manager = self._manager(snapshot_settings, fetcher)
+        assert manager.get_signing_key(make_token()) is not None
+        assert fetcher.calls == 1
+
+    def test_snapshot_older_than_max_staleness_is_ignored(
+        self, snapshot_settings, fetcher, tmp_path, make_token
+    ):
+        self._manager(snapshot_settings, fetcher).refresh()
+        path = tmp_path / "jwks-testrealm.json"
+        stored = json.loads(path.read_text())
+        stored["fetched_at"] -= 7200
+        path.write_text(json.dumps(stored))
+        fetcher.fail = True
+
+        manager = self._manager(snapshot_settings, fetcher)
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(make_token())
+
+    def test_snapshot_for_other_endpoint_is_ignored(
+        self, snapshot_settings, jwks_document, tmp_path
+    ):
+        JWKSSnapshot.in_directory(
+            str(tmp_path), "testrealm", "http://elsewhere/certs"
+        ).save(jwks_document)
+        manager = JWKSKeyManager(snapshot_settings)
+        assert not manager.has_key("test-key-1")
+
+    def test_corrupt_snapshot_is_ignored(self, snapshot_settings, tmp_path):
+        (tmp_path / "jwks-testrealm.json").write_text("{not json")
+        manager = JWKSKeyManager(snapshot_settings)
+        assert not manager.has_key("test-key-1")
+
+    @pytest.mark.parametrize("jwks", [{"keys": "abc"}, {"keys": ["x"]}])
+    def test_malformed_snapshot_is_ignored(self, snapshot_settings, tmp_path, jwks):
+        JWKSSnapshot.in_directory(
+            str(tmp_path), "testrealm", snapshot_settings.jwks_uri
+        ).save(jwks)
+        manager = JWKSKeyManager(snapshot_settings)
+        assert not manager.has_key("test-key-1")
+
+    def test_keys_beyond_max_staleness_require_refetch(
+        self, snapshot_settings, fetcher, make_token
+    ):
+        manager = self._manager(snapshot_settings, fetcher)
+        token = make_token()
+        manager.get_signing_key(token)
+        manager._fetched_at -= 4000
+        fetcher.fail = True
+
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(token)
+        # Within retry_interval the stale keys are refused without a fetch.
+        with pytest.raises(KeycloakUnavailable):
+            manager.get_signing_key(token)
+        assert fetcher.calls == 2
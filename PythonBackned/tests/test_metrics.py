@@ -0,0 +1,167 @@
+"""Tests for the metrics hooks and the Prometheus endpoint."""
+
+import httpx
+import jwt
+import pytest
+import respx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from keycloak_auth import Authenticator, KeycloakSettings
+from keycloak_auth.cache import TokenCache
+from keycloak_auth.exceptions import KeycloakUnavailable, TokenExpired, TokenMissing
+from keycloak_auth.fastapi import register_metrics_endpoint
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.metrics import NULL_METRICS, InMemoryMetrics
+from keycloak_auth.validators import IntrospectionTokenValidator, JWKSTokenValidator
+
+
+@pytest.fixture()
+def metrics():
+    return InMemoryMetrics()
+
+
+class TestInMemoryMetrics:
+
+    def test_counters_and_histograms(self, metrics):
+        metrics.increment("validation_total", outcome="ok")
+        metrics.increment("validation_total", outcome="ok")
+        metrics.observe("validation_seconds", 0.002, outcome="ok")
+
+        assert metrics.counter("validation_total", outcome="ok") == 2
+        assert metrics.counter("validation_total", outcome="TokenInvalid") == 0
+        assert metrics.histogram_count("validation_seconds", outcome="ok") == 1
+
+    def test_track_records_exception_name(self, metrics):
+        with pytest.raises(TokenExpired):
+            with metrics.track("validation"):
+                raise TokenExpired()
+
+        assert metrics.counter("validation_total", outcome="TokenExpired") == 1
+        assert metrics.histogram_count("validation_seconds", outcome="TokenExpired") == 1
+
+    def test_render_prometheus_text(self, metrics):
+        metrics.increment("validation_total", outcome="ok")
+        metrics.observe("validation_seconds", 0.003, outcome="ok")
+        text = metrics.render()
+
+        assert "# TYPE keycloak_auth_validation_total counter" in text
+        assert 'keycloak_auth_validation_total{outcome="ok"} 1' in text
+        assert 'keycloak_auth_validation_seconds_bucket{outcome="ok",le="0.0025"} 0' in text
+        assert 'keycloak_auth_validation_seconds_bucket{outcome="ok",le="0.005"} 1' in text
+        assert 'keycloak_auth_validation_seconds_bucket{outcome="ok",le="+Inf"} 1' in text
+        assert 'keycloak_auth_validation_seconds_count{outcome="ok"} 1' in text
+
+    def test_watched_cache_stats(self, metrics, make_token):
+        cache = TokenCache()
+        metrics.watch_cache("token", cache)
+        cache.get(make_token())
+
+        text = metrics.render()
+        assert 'keycloak_auth_cache_misses_total{cache="token"} 1' in text
+        assert 'keycloak_auth_cache_size{cache="token"} 0' in text
+
+    def test_null_metrics_is_disabled(self):
+        assert NULL_METRICS.enabled is False
+        with NULL_METRICS.track("validation"):
+            pass
+
+
+class TestInstrumentation:
+
+    def test_authenticator_records_outcomes(self, settings, validator, make_token, metrics):
+        auth = Authenticator(settings, validator=validator, metrics=metrics)
+        auth.authenticate(make_token())
+        with pytest.raises(TokenExpired):
+            auth.authenticate(make_token(expired=True))
+        with pytest.raises(TokenMissing):
+            auth.authenticate(None)
+
+        assert metrics.counter("validation_total", outcome="ok") == 1
+        assert metrics.counter("validation_total", outcome="TokenExpired") == 1
+        assert metrics.counter("validation_total", outcome="TokenMissing") == 1
+
+    async def test_authenticate_async_records_outcome(
+        self, settings, validator, make_token, metrics
+    ):
+        auth = Authenticator(settings, validator=validator, metrics=metrics)
+        await auth.authenticate_async(make_token())
+
+        assert metrics.histogram_count("validation_seconds", outcome="ok") == 1
+
+    def test_authenticate_many_counts_each_result(
+        self, settings, validator, make_token, metrics
+    ):
+        auth = Authenticator(settings, validator=validator, metrics=metrics)
+        auth.authenticate_many([make_token(), None, make_token(expired=True)])
+
+        assert metrics.counter("validation_total", outcome="ok") == 1
+        assert metrics.counter("validation_total", outcome="TokenMissing") == 1
+        assert metrics.counter("validation_total", outcome="TokenExpired") == 1
+
+    def test_jwks_fetches_and_lookups(self, settings, jwks_document, make_token, metrics):
+        manager = JWKSKeyManager(settings, metrics=metrics)
+        manager._client.fetch_data = lambda: jwks_document
+        validator = JWKSTokenValidator(settings, key_manager=manager)
+
+        validator.validate(make_token())
+        validator.validate(make_token())
+
+        assert metrics.counter("jwks_fetch_total", outcome="ok") == 1
+        assert metrics.counter("jwks_key_lookup_total", result="miss") == 1
+        assert metrics.counter("jwks_key_lookup_total", result="hit") == 1
+
+    def test_jwks_fetch_failure(self, settings, metrics):
+        manager = JWKSKeyManager(settings, metrics=metrics)
+
+        def _fail():
+            raise jwt.PyJWKClientConnectionError("connection refused")
+
+        manager._client.fetch_data = _fail
+        with pytest.raises(KeycloakUnavailable):
+            manager.refresh()
+
+        assert metrics.counter("jwks_fetch_total", outcome="KeycloakUnavailable") == 1
+
+    @respx.mock
+    def test_introspection_round_trips(self, metrics):
+        settings = KeycloakSettings(
+            server_url="http://localhost:8080",
+            realm="testrealm",
+            client_id="test-client",
+            client_secret="secret",
+            introspection_cache_ttl=60,
+        )
+        respx.post(settings.introspection_uri).respond(
+            json={"active": True, "sub": "user-123", "exp": 4102444800}
+        )
+        validator = IntrospectionTokenValidator(settings, metrics=metrics)
+        validator.validate("opaque")
+        validator.validate("opaque")
+
+        assert metrics.counter("introspection_total", outcome="ok") == 1
+        assert 'keycloak_auth_cache_hits_total{cache="introspection"} 1' in metrics.render()
+
+    @respx.mock
+    def test_introspection_failure(self, metrics):
+        settings = KeycloakSettings(client_secret="secret")
+        respx.post(settings.introspection_uri).mock(
+            side_effect=httpx.ConnectError("refused")
+        )
+        validator = IntrospectionTokenValidator(settings, metrics=metrics)
+        with pytest.raises(KeycloakUnavailable):
+            validator.validate("opaque")
+
+        assert metrics.counter("introspection_total", outcome="KeycloakUnavailable") == 1
+
+
+def test_metrics_endpoint(settings, validator, make_token, metrics):
+    app = FastAPI()
+    register_metrics_endpoint(app, metrics)
+    Authenticator(settings, validator=validator, metrics=metrics).authenticate(make_token())
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'keycloak_auth_validation_total{outcome="ok"} 1' in response.text
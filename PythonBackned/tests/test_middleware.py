@@ -0,0 +1,166 @@
+"""Tests for the pure-ASGI KeycloakAuthMiddleware."""
+
+import pytest
+from fastapi import Depends, FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from keycloak_auth import Authenticator, RealmRegistry, TokenClaims
+from keycloak_auth.fastapi import (
+    KeycloakAuthMiddleware,
+    create_auth_dependency,
+    register_auth_error_handlers,
+    require_roles,
+)
+from keycloak_auth.fastapi.middleware import PathMatcher
+
+from .conftest import DirectKeyValidator
+from .test_dependencies import CountingValidator
+
+
+@pytest.fixture()
+def counting(validator):
+    return CountingValidator(validator)
+
+
+def _build_app(source, public_paths=None):
+    app = FastAPI()
+    register_auth_error_handlers(app)
+    options = {} if public_paths is None else {"public_paths": public_paths}
+    app.add_middleware(KeycloakAuthMiddleware, authenticator=source, **options)
+
+    get_user = create_auth_dependency(source)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/open")
+    async def forgotten_dependency():
+        return {"msg": "no dependency"}
+
+    @app.get(
+        "/admin",
+        dependencies=[Depends(require_roles(source, {"admin"}))],
+    )
+    async def admin(user: TokenClaims = Depends(get_user)):
+        return {"sub": user.sub}
+
+    @app.websocket("/ws")
+    async def websocket(websocket: WebSocket):
+        offered = websocket.scope.get("subprotocols") or []
+        await websocket.accept("bearer" if "bearer" in offered else None)
+        await websocket.send_json({"ok": True})
+        await websocket.close()
+
+    return app
+
+
+@pytest.fixture()
+def client(counting, settings):
+    return TestClient(_build_app(Authenticator(settings, validator=counting)))
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestPathMatcher:
+
+    def test_exact_and_prefix(self):
+        matches = PathMatcher(["/health", "/docs/*", "/static/*"])
+        assert matches("/health")
+        assert matches("/docs/oauth2-redirect")
+        assert matches("/static/css/app.css")
+        assert not matches("/health/deep")
+        assert not matches("/docsx")
+        assert not matches("/api/profile")
+
+    def test_empty(self):
+        assert not PathMatcher([])("/health")
+
+
+class TestKeycloakAuthMiddleware:
+
+    def test_public_path_skips_validation(self, client, counting):
+        resp = client.get("/health")
+        assert resp.status_code == 200
+        assert counting.calls == 0
+
+    def test_route_without_dependency_is_protected(self, client):
+        resp = client.get("/open")
+        assert resp.status_code == 401
+        assert resp.json() == {"detail": "Authorization header missing or invalid"}
+
+    def test_invalid_token_is_rejected_before_routing(self, client, counting):
+        resp = client.get("/open", headers=_bearer("not-a-jwt"))
+        assert resp.status_code == 401
+        assert counting.calls == 1
+
+    def test_non_bearer_scheme_counts_as_missing(self, client):
+        resp = client.get("/open", headers={"Authorization": "Basic dXNlcjpwdw=="})
+        assert resp.status_code == 401
+
+    def test_dependencies_reuse_middleware_claims(self, client, counting, make_token):
+        token = make_token({"realm_access": {"roles": ["admin"]}})
+        resp = client.get("/admin", headers=_bearer(token))
+        assert resp.status_code == 200
+        assert resp.json() == {"sub": "user-123"}
+        assert counting.calls == 1
+
+    def test_policy_still_enforced(self, client, make_token):
+        resp = client.get("/admin", headers=_bearer(make_token()))
+        assert resp.status_code == 403
+
+    def test_preflight_passes_through(self, client, counting):
+        resp = client.options("/open")
+        assert counting.calls == 0
+        assert resp.status_code == 405  # reached the router
+
+    def test_custom_public_paths(self, counting, settings):
+        app = _build_app(
+            Authenticator(settings, validator=counting), public_paths=["/open"]
+        )
+        client = TestClient(app)
+        assert client.get("/open").status_code == 200
+        assert client.get("/health").status_code == 401
+
+    def test_websocket_without_token_is_closed(self, client):
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/ws"):
+                pass
+        assert exc_info.value.code == 1008
+
+    def test_websocket_with_invalid_token_is_closed(self, client):
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/ws", headers=_bearer("garbage")):
+                pass
+        assert exc_info.value.code == 1008
+
+    def test_websocket_bearer_header(self, client, make_token):
+        with client.websocket_connect("/ws", headers=_bearer(make_token())) as ws:
+            assert ws.receive_json() == {"ok": True}
+
+    def test_websocket_bearer_subprotocol(self, client, counting, make_token):
+        with client.websocket_connect(
+            "/ws", subprotocols=["bearer", make_token()]
+        ) as ws:
+            assert ws.accepted_subprotocol == "bearer"
+            assert ws.receive_json() == {"ok": True}
+        assert counting.calls == 1
+
+    def test_realm_registry(self, settings, rsa_public_pem, make_token):
+        registry = RealmRegistry(
+            settings,
+            factory=lambda s: Authenticator(
+                s, validator=DirectKeyValidator(rsa_public_pem, s)
+            ),
+        )
+        client = TestClient(_build_app(registry))
+        token = make_token({
+            "iss": "http://localhost:8080/realms/tenant-a",
+            "realm_access": {"roles": ["admin"]},
+        })
+        headers = {**_bearer(token), "X-Relm": "tenant-a"}
+        assert client.get("/admin", headers=headers).status_code == 200
+        assert client.get("/admin", headers=_bearer(token)).status_code == 401
@@ -0,0 +1,103 @@
+"""Tests for precompiled authorization policies."""
+
+import pytest
+
+from keycloak_auth.exceptions import InsufficientPermissions
+from keycloak_auth.models import TokenClaims
+from keycloak_auth.policies import (
+    DEFAULT_INDEX,
+    AllOf,
+    AnyOf,
+    GrantIndex,
+    compile_policy,
+    role_policy,
+    scope_policy,
+)
+
+
+def _claims(realm=(), clients=None, scope=None) -> TokenClaims:
+    return TokenClaims(
+        sub="u1",
+        exp=0,
+        realm_access={"roles": list(realm)},
+        resource_access={
+            client: {"roles": list(roles)} for client, roles in (clients or {}).items()
+        },
+        scope=scope,
+    )
+
+
+@pytest.fixture()
+def index():
+    return GrantIndex()
+
+
+class TestPolicies:
+
+    def test_all_of_realm_roles(self, index):
+        policy = compile_policy(AllOf(realm_roles={"user", "admin"}), index)
+        assert policy.allows(_claims(realm=["user", "admin", "other"]))
+        assert not policy.allows(_claims(realm=["user"]))
+
+    def test_any_of_client_roles(self, index):
+        policy = compile_policy(AnyOf(client_roles={"app": {"editor", "owner"}}), index)
+        assert policy.allows(_claims(clients={"app": ["owner"]}))
+        assert not policy.allows(_claims(clients={"other": ["owner"]}))
+
+    def test_scopes(self, index):
+        policy = compile_policy(AllOf(scopes={"read", "write"}), index)
+        assert policy.allows(_claims(scope="openid read write"))
+        assert not policy.allows(_claims(scope="openid read"))
+
+    def test_and_or_combination(self, index):
+        policy = compile_policy(
+            AllOf(realm_roles={"user"})
+            & (AnyOf(client_roles={"app": {"editor"}}) | AllOf(scopes={"write"})),
+            index,
+        )
+        assert policy.allows(_claims(realm=["user"], clients={"app": ["editor"]}))
+        assert policy.allows(_claims(realm=["user"], scope="write"))
+        assert not policy.allows(_claims(realm=["user"]))
+        assert not policy.allows(_claims(scope="write"))
+
+    def test_grants_interned_once_per_token(self, index):
+        policy = compile_policy(AllOf(realm_roles={"user"}), index)
+        claims = _claims(realm=["user"])
+        assert policy.allows(claims)
+        # The interned mask is reused; the role list is not consulted again.
+        claims.realm_access["roles"].clear()
+        assert policy.allows(claims)
+
+    def test_policy_compiled_later_sees_new_grants(self, index):
+        claims = _claims(realm=["user", "admin"])
+        assert compile_policy(AllOf(realm_roles={"user"}), index).allows(claims)
+        assert compile_policy(AllOf(realm_roles={"admin"}), index).allows(claims)
+
+    def test_enforce_message(self, index):
+        policy = compile_policy(AllOf(realm_roles={"admin"}), index)
+        with pytest.raises(InsufficientPermissions, match="Missing required roles: admin"):
+            policy.enforce(_claims(realm=["user"]))
+
+    def test_enforce_any_of_message(self, index):
+        policy = compile_policy(AnyOf(scopes={"a", "b"}), index)
+        with pytest.raises(InsufficientPermissions, match="any of: a, b"):
+            policy.enforce(_claims(scope="c"))
+
+    def test_empty_requirement_rejected(self):
+        with pytest.raises(ValueError):
+            AllOf()
+
+    def test_ad_hoc_checks_do_not_grow_the_shared_index(self):
+        size = DEFAULT_INDEX._size
+        claims = _claims(realm=["ad-hoc-a"], scope="ad-hoc-s")
+        role_policy(frozenset({"ad-hoc-a"})).enforce(claims)
+        scope_policy(frozenset({"ad-hoc-s"})).enforce(claims)
+        with pytest.raises(InsufficientPermissions, match="ad-hoc-b"):
+            role_policy(frozenset({"ad-hoc-b"}), "app").enforce(claims)
+        assert DEFAULT_INDEX._size == size
+
+    def test_ad_hoc_checks_reuse_declared_bits(self):
+        compile_policy(AllOf(realm_roles={"declared-role"}))
+        policy = role_policy(frozenset({"declared-role"}))
+        assert policy.allows(_claims(realm=["declared-role"]))
+        assert policy._index is DEFAULT_INDEX
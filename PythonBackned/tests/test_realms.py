@@ -0,0 +1,195 @@
+"""Tests for the multi-realm RealmRegistry."""
+
+import threading
+import time
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from keycloak_auth import Authenticator, KeycloakSettings, RealmRegistry, TokenClaims
+from keycloak_auth.exceptions import (
+    KeycloakUnavailable,
+    TokenExpired,
+    TokenInvalid,
+    TokenMissing,
+)
+from keycloak_auth.fastapi import (
+    create_auth_dependency,
+    register_auth_error_handlers,
+    require_roles,
+)
+
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.validators import JWKSTokenValidator
+
+from .conftest import DirectKeyValidator
+
+
+@pytest.fixture()
+def registry(settings, rsa_public_pem):
+    def _factory(realm_settings: KeycloakSettings) -> Authenticator:
+        return Authenticator(
+            realm_settings,
+            validator=DirectKeyValidator(rsa_public_pem, realm_settings),
+        )
+
+    return RealmRegistry(settings, factory=_factory, max_realms=2)
+
+
+def _issuer(realm: str) -> str:
+    return f"http://localhost:8080/realms/{realm}"
+
+
+class TestRealmRegistry:
+
+    def test_for_realm_recomputes_uris(self, settings):
+        other = settings.for_realm("tenant-a")
+        assert settings.issuer.endswith("/testrealm")
+        assert other.issuer == _issuer("tenant-a")
+        assert other.jwks_uri.startswith(_issuer("tenant-a"))
+
+    def test_authenticators_are_lazy_and_reused(self, registry):
+        assert len(registry) == 0
+        first = registry.get("tenant-a")
+        assert registry.get("tenant-a") is first
+        assert first.settings.realm == "tenant-a"
+
+    def test_lru_eviction(self, registry):
+        registry.get("a")
+        registry.get("b")
+        registry.get("a")
+        registry.get("c")
+        assert "b" not in registry
+        assert "a" in registry and "c" in registry
+
+    def test_default_realm(self, registry):
+        assert registry.get(None).settings.realm == "testrealm"
+
+    def test_authenticate_matching_issuer(self, registry, make_token):
+        token = make_token({"iss": _issuer("tenant-a")})
+        assert registry.authenticate(token, "tenant-a").sub == "user-123"
+
+    def test_issuer_must_match_header(self, registry, make_token):
+        token = make_token({"iss": _issuer("tenant-a")})
+        with pytest.raises(TokenInvalid, match="issuer"):
+            registry.authenticate(token, "tenant-b")
+
+    def test_only_validated_realms_are_cached(self, registry, make_token):
+        registry.authenticate(make_token({"iss": _issuer("a")}), "a")
+        registry.authenticate(make_token({"iss": _issuer("b")}), "b")
+        for realm in ("x", "y", "z"):
+            with pytest.raises(TokenInvalid):
+                registry.authenticate(make_token({"iss": _issuer("a")}), realm)
+            with pytest.raises(TokenExpired):
+                registry.authenticate(
+                    make_token({"iss": _issuer(realm)}, expired=True), realm
+                )
+        assert "a" in registry and "b" in registry
+        assert len(registry) == 2
+
+    def test_unproven_realm_fetches_once(self, settings, make_token):
+        built, fetches = [], []
+
+        def _unreachable():
+            fetches.append(1)
+            raise jwt.PyJWKClientConnectionError("connection refused")
+
+        def _factory(realm_settings):
+            built.append(realm_settings.realm)
+            manager = JWKSKeyManager(realm_settings)
+            manager._client.fetch_data = _unreachable
+            return Authenticator(
+                realm_settings,
+                validator=JWKSTokenValidator(realm_settings, key_manager=manager),
+            )
+
+        registry = RealmRegistry(settings, factory=_factory, max_realms=2)
+        token = make_token({"iss": _issuer("ghost")}, headers={"kid": "forged"})
+        for _ in range(20):
+            with pytest.raises(KeycloakUnavailable):
+                registry.authenticate(token, "ghost")
+        assert built == ["ghost"]
+        assert fetches == [1]
+        assert "ghost" not in registry
+
+    def test_new_realm_is_built_once(self, settings, rsa_public_pem, make_token):
+        built = []
+
+        def _factory(realm_settings):
+            built.append(realm_settings.realm)
+            time.sleep(0.05)
+            return Authenticator(
+                realm_settings,
+                validator=DirectKeyValidator(rsa_public_pem, realm_settings),
+            )
+
+        registry = RealmRegistry(settings, factory=_factory)
+        token = make_token({"iss": _issuer("tenant-a")})
+        threads = [
+            threading.Thread(target=registry.authenticate, args=(token, "tenant-a"))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert built == ["tenant-a"]
+        assert "tenant-a" in registry
+
+    def test_missing_token(self, registry):
+        with pytest.raises(TokenMissing):
+            registry.authenticate(None, "tenant-a")
+
+    def test_invalid_realm_name(self, registry):
+        with pytest.raises(TokenInvalid):
+            registry.get("../etc")
+
+    def test_allowed_realms(self):
+        settings = KeycloakSettings(realm="a", allowed_realms=["a", "b"])
+        registry = RealmRegistry(settings)
+        registry.get("b")
+        with pytest.raises(TokenInvalid):
+            registry.get("c")
+
+
+class TestRealmDependencies:
+
+    @pytest.fixture()
+    def client(self, registry):
+        app = FastAPI()
+        register_auth_error_handlers(app)
+        get_user = create_auth_dependency(registry)
+
+        @app.get(
+            "/admin",
+            dependencies=[Depends(require_roles(registry, {"admin"}))],
+        )
+        async def admin(user: TokenClaims = Depends(get_user)):
+            return {"iss": user.iss}
+
+        return TestClient(app)
+
+    def test_header_selects_realm(self, client, make_token):
+        token = make_token({
+            "iss": _issuer("tenant-a"),
+            "realm_access": {"roles": ["admin"]},
+        })
+        resp = client.get(
+            "/admin",
+            headers={"Authorization": f"Bearer {token}", "X-Relm": "tenant-a"},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["iss"] == _issuer("tenant-a")
+
+    def test_wrong_header_is_401(self, client, make_token):
+        token = make_token({
+            "iss": _issuer("tenant-a"),
+            "realm_access": {"roles": ["admin"]},
+        })
+        resp = client.get(
+            "/admin",
+            headers={"Authorization": f"Bearer {token}", "X-Relm": "tenant-b"},
+        )
+        assert resp.status_code == 401
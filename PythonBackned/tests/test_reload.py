@@ -0,0 +1,219 @@
+"""Tests for cached config.yaml loading and hot settings reload."""
+
+import asyncio
+import os
+
+import pytest
+
+from keycloak_auth import Authenticator, KeycloakSettings, RealmRegistry
+from keycloak_auth import config as config_module
+from keycloak_auth.exceptions import TokenInvalid
+from keycloak_auth.reload import SettingsWatcher
+from keycloak_auth.validators import IntrospectionTokenValidator, JWKSTokenValidator
+
+from .conftest import DirectKeyValidator
+
+
+def _write_config(path, **values):
+    lines = ["keycloak:"] + [f"  {key}: {value!r}" for key, value in values.items()]
+    path.write_text("\n".join(lines) + "\n")
+    # Guarantee a new signature even on filesystems with coarse mtimes.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture()
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in list(os.environ):
+        if name.startswith("KEYCLOAK_"):
+            monkeypatch.delenv(name)
+    return tmp_path
+
+
+@pytest.fixture()
+def jwks_authenticator(settings, key_manager):
+    settings = settings.model_copy(update={"token_cache_size": 100})
+    return Authenticator(
+        settings, validator=JWKSTokenValidator(settings, key_manager=key_manager)
+    )
+
+
+class TestYamlCache:
+
+    def test_parsed_once_per_modification(self, config_dir, monkeypatch):
+        yaml = pytest.importorskip("yaml")
+        calls = []
+        safe_load = yaml.safe_load
+        monkeypatch.setattr(yaml, "safe_load", lambda fh: calls.append(1) or safe_load(fh))
+
+        _write_config(config_dir / "config.yaml", realm="first")
+        assert KeycloakSettings().realm == "first"
+        assert KeycloakSettings().realm == "first"
+        assert len(calls) == 1
+
+        _write_config(config_dir / "config.yaml", realm="second")
+        assert KeycloakSettings().realm == "second"
+        assert len(calls) == 2
+
+    def test_missing_file(self, config_dir):
+        assert config_module.config_signature() is None
+        assert KeycloakSettings().realm == "master"
+
+
+def test_changed_fields(settings):
+    other = settings.model_copy(update={"audience": "api", "token_cache_ttl": 5})
+    assert settings.changed_fields(other) == {"audience", "token_cache_ttl"}
+    assert settings.changed_fields(settings) == frozenset()
+
+
+class TestAuthenticatorReconfigure:
+
+    def test_unrelated_change_keeps_keys_and_cache(self, jwks_authenticator):
+        validator = jwks_authenticator.validator
+        changed = jwks_authenticator.reconfigure(
+            jwks_authenticator.settings.model_copy(update={"metrics_path": "/m"})
+        )
+        assert changed == {"metrics_path"}
+        assert jwks_authenticator.validator._key_manager is validator._key_manager
+        assert jwks_authenticator.token_cache is validator.token_cache
+        assert jwks_authenticator.settings.metrics_path == "/m"
+
+    def test_no_change_keeps_pipeline(self, jwks_authenticator):
+        validator = jwks_authenticator.validator
+        assert jwks_authenticator.reconfigure(jwks_authenticator.settings) == frozenset()
+        assert jwks_authenticator.validator is validator
+
+    def test_audience_change_drops_cached_claims(self, jwks_authenticator, make_token):
+        token = make_token()
+        jwks_authenticator.authenticate(token)
+        old_cache = jwks_authenticator.token_cache
+        assert len(old_cache) == 1
+
+        jwks_authenticator.reconfigure(
+            jwks_authenticator.settings.model_copy(update={"audience": "other-api"})
+        )
+        new_cache = jwks_authenticator.token_cache
+        assert new_cache is not old_cache and len(new_cache) == 0
+        with pytest.raises(TokenInvalid):
+            jwks_authenticator.authenticate(token)
+
+    def test_realm_change_rebuilds_key_manager(self, jwks_authenticator):
+        key_manager = jwks_authenticator.validator._key_manager
+        jwks_authenticator.reconfigure(jwks_authenticator.settings.for_realm("other"))
+        assert jwks_authenticator.validator._key_manager is not key_manager
+        assert jwks_authenticator.settings.issuer.endswith("/realms/other")
+
+    async def test_async_validator_follows_swap(self, jwks_authenticator, make_token):
+        old = jwks_authenticator.async_validator
+        jwks_authenticator.reconfigure(
+            jwks_authenticator.settings.model_copy(update={"audience": "other-api"})
+        )
+        assert jwks_authenticator.async_validator is not old
+        with pytest.raises(TokenInvalid):
+            await jwks_authenticator.authenticate_async(make_token())
+
+    async def test_replaced_introspection_clients_are_closed(self, settings):
+        settings = settings.model_copy(
+            update={"client_secret": "secret", "http_timeout": 0.01}
+        )
+        authenticator = Authenticator(
+            settings, validator=IntrospectionTokenValidator(settings)
+        )
+        async_client = authenticator.async_validator._get_client()
+        sync_client = authenticator.validator._get_client()
+
+        authenticator.reconfigure(settings.model_copy(update={"audience": "x"}))
+        assert authenticator.validator._get_client() is sync_client
+        await asyncio.sleep(0.05)
+        assert async_client.is_closed
+        assert not sync_client.is_closed
+
+        authenticator.reconfigure(
+            authenticator.settings.model_copy(update={"http_timeout": 1})
+        )
+        await asyncio.sleep(0.05)
+        assert sync_client.is_closed
+
+    def test_custom_validator_is_kept(self, authenticator):
+        validator = authenticator.validator
+        authenticator.reconfigure(
+            authenticator.settings.model_copy(update={"audience": "x"})
+        )
+        assert authenticator.validator is validator
+
+
+def test_registry_reconfigure(settings, rsa_public_pem):
+    registry = RealmRegistry(
+        settings,
+        factory=lambda s: Authenticator(s, validator=DirectKeyValidator(rsa_public_pem, s)),
+    )
+    registry.get("tenant-a")
+    registry.get("tenant-b")
+
+    new = settings.model_copy(update={"allowed_realms": ["tenant-a"], "audience": "x"})
+    assert registry.reconfigure(new) == {"allowed_realms", "audience"}
+    assert "tenant-b" not in registry
+    kept = registry.get("tenant-a").settings
+    assert kept.audience == "x" and kept.realm == "tenant-a"
+
+
+@pytest.fixture()
+def watched(config_dir, jwks_authenticator):
+    _write_config(config_dir / "config.yaml", realm="testrealm", token_cache_size=100)
+
+    def factory():
+        return KeycloakSettings(server_url="http://localhost:8080", client_id="test-client")
+
+    return SettingsWatcher(jwks_authenticator, interval=60, factory=factory)
+
+
+class TestSettingsWatcher:
+
+    def test_no_change_is_a_noop(self, watched):
+        assert watched.check() == frozenset()
+
+    def test_yaml_change_is_applied(self, watched, config_dir, jwks_authenticator):
+        _write_config(config_dir / "config.yaml", realm="testrealm", audience="api")
+        assert "audience" in watched.check()
+        assert jwks_authenticator.settings.audience == "api"
+        assert watched.check() == frozenset()
+
+    def test_env_change_is_applied(self, watched, monkeypatch, jwks_authenticator):
+        monkeypatch.setenv("KEYCLOAK_AUDIENCE", "from-env")
+        assert "audience" in watched.check()
+        assert jwks_authenticator.settings.audience == "from-env"
+
+    def test_invalid_config_keeps_settings(
+        self, watched, monkeypatch, jwks_authenticator, caplog
+    ):
+        monkeypatch.setenv("KEYCLOAK_ALGORITHMS", '["HS256"]')
+        before = jwks_authenticator.settings
+        assert watched.check() == frozenset()
+        assert jwks_authenticator.settings is before
+        assert "Ignoring invalid Keycloak configuration" in caplog.text
+
+    def test_start_stop(self, watched):
+        watched.start()
+        watched.start()
+        watched.stop()
+        watched.stop()
+
+    def test_config_path_is_loaded(self, config_dir, jwks_authenticator):
+        path = config_dir / "auth.yaml"
+        _write_config(path, server_url="http://localhost:8080", realm="testrealm")
+        watcher = SettingsWatcher(jwks_authenticator, interval=60, config_path=path)
+        _write_config(config_dir / "config.yaml", audience="ignored")
+        assert watcher.check() == frozenset()
+
+        _write_config(
+            path, server_url="http://localhost:8080", realm="testrealm",
+            client_id="test-client", audience="from-path",
+        )
+        assert "audience" in watcher.check()
+        assert jwks_authenticator.settings.audience == "from-path"
+        assert KeycloakSettings().audience == "ignored"
+
+    def test_interval_must_be_positive(self, jwks_authenticator):
+        with pytest.raises(ValueError):
+            SettingsWatcher(jwks_authenticator, interval=0)
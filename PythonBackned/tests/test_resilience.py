@@ -0,0 +1,268 @@
+"""Tests for the circuit breaker, bulkhead and their use around Keycloak calls."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import jwt
+import pytest
+import respx
+
+from keycloak_auth import (
+    Bulkhead,
+    CircuitBreaker,
+    CircuitOpen,
+    KeycloakGuard,
+    TieredTokenValidator,
+)
+from keycloak_auth.exceptions import KeycloakUnavailable
+from keycloak_auth.http_client import create_client
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.metrics import InMemoryMetrics
+from keycloak_auth.resilience import CLOSED, HALF_OPEN, OPEN
+from keycloak_auth.validators import (
+    INTROSPECT_ALWAYS,
+    AsyncIntrospectionTokenValidator,
+    IntrospectionTokenValidator,
+    JWKSTokenValidator,
+)
+
+
+def _fail():
+    raise KeycloakUnavailable("down")
+
+
+def _trip(guard, times):
+    for _ in range(times):
+        with pytest.raises(KeycloakUnavailable):
+            guard.call(_fail)
+
+
+@pytest.fixture()
+def guarded_settings(settings):
+    return settings.model_copy(update={
+        "client_secret": "secret",
+        "breaker_failure_threshold": 2,
+        "breaker_reset_timeout": 0.05,
+    })
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self):
+        metrics = InMemoryMetrics()
+        guard = KeycloakGuard(CircuitBreaker(3, 60, name="jwks", metrics=metrics))
+        _trip(guard, 2)
+        assert guard.call(lambda: "ok") == "ok"  # a success resets the count
+        _trip(guard, 3)
+        assert guard.breaker.state == OPEN
+        calls = []
+        with pytest.raises(CircuitOpen):
+            guard.call(lambda: calls.append(1))
+        assert calls == []
+        text = metrics.render()
+        assert 'circuit_transitions_total{client="jwks",state="open"} 1' in text
+        assert 'calls_rejected_total{client="jwks",reason="circuit_open"} 1' in text
+
+    def test_half_open_probe_closes(self):
+        guard = KeycloakGuard(CircuitBreaker(1, 0.05))
+        _trip(guard, 1)
+        time.sleep(0.06)
+        assert guard.breaker.state == HALF_OPEN
+        assert guard.call(lambda: "ok") == "ok"
+        assert guard.breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        guard = KeycloakGuard(CircuitBreaker(1, 0.05))
+        _trip(guard, 1)
+        time.sleep(0.06)
+        _trip(guard, 1)
+        assert guard.breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            guard.call(lambda: "ok")
+
+    def test_single_probe_at_a_time(self):
+        guard = KeycloakGuard(CircuitBreaker(1, 0.05))
+        _trip(guard, 1)
+        time.sleep(0.06)
+        started, finish = threading.Event(), threading.Event()
+
+        def _probe():
+            started.set()
+            finish.wait(2)
+            return "ok"
+
+        thread = threading.Thread(target=guard.call, args=(_probe,))
+        thread.start()
+        started.wait(2)
+        with pytest.raises(CircuitOpen):
+            guard.call(lambda: "ok")
+        finish.set()
+        thread.join()
+        assert guard.breaker.state == CLOSED
+
+    def test_disabled(self):
+        guard = KeycloakGuard(CircuitBreaker(0, 60))
+        _trip(guard, 20)
+        assert guard.breaker.state == CLOSED
+
+
+class TestBulkhead:
+
+    def test_rejects_beyond_capacity(self):
+        guard = KeycloakGuard(bulkhead=Bulkhead(1, queue_timeout=0.01))
+        inside, leave = threading.Event(), threading.Event()
+
+        def _hold():
+            inside.set()
+            leave.wait(2)
+
+        thread = threading.Thread(target=guard.call, args=(_hold,))
+        thread.start()
+        inside.wait(2)
+        with pytest.raises(KeycloakUnavailable, match="concurrent"):
+            guard.call(lambda: "ok")
+        leave.set()
+        thread.join()
+        assert guard.call(lambda: "ok") == "ok"
+
+    def test_rejection_does_not_count_as_failure(self):
+        guard = KeycloakGuard(CircuitBreaker(1, 60), Bulkhead(1))
+        guard.bulkhead.acquire()
+        with pytest.raises(KeycloakUnavailable):
+            guard.call(lambda: "ok")
+        guard.bulkhead.release()
+        assert guard.breaker.state == CLOSED
+
+    async def test_async_rejects_beyond_capacity(self):
+        guard = KeycloakGuard(bulkhead=Bulkhead(2, queue_timeout=0.01))
+
+        async def _slow():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        results = await asyncio.gather(
+            *(guard.call_async(_slow) for _ in range(3)), return_exceptions=True
+        )
+        assert results.count("ok") == 2
+        assert isinstance(results[2], KeycloakUnavailable)
+        assert await guard.call_async(_slow) == "ok"
+
+
+class TestGuardedClients:
+
+    def test_http_timeouts_from_settings(self, settings):
+        client = create_client(
+            settings.model_copy(update={"http_timeout": 2.5, "http_connect_timeout": 1})
+        )
+        assert client.timeout == httpx.Timeout(2.5, connect=1.0)
+        client.close()
+
+    def test_jwks_serves_cached_keys_while_open(
+        self, guarded_settings, jwks_document, make_token
+    ):
+        calls = []
+
+        def _fetch():
+            calls.append(1)
+            if len(calls) > 1:
+                raise jwt.PyJWKClientConnectionError("connection refused")
+            return jwks_document
+
+        manager = JWKSKeyManager(
+            guarded_settings, cache_ttl=300, refresh_ahead=300, retry_interval=0
+        )
+        manager._client.fetch_data = _fetch
+        token = make_token()
+        manager.get_signing_key(token)
+        for _ in range(2):
+            with pytest.raises(KeycloakUnavailable):
+                manager.refresh()
+        assert manager.guard.breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            manager.refresh()
+        assert len(calls) == 3
+        assert manager.get_signing_key(token) is not None
+
+    @respx.mock
+    def test_introspection_fails_fast_while_open(self, guarded_settings):
+        route = respx.post(guarded_settings.introspection_uri).respond(503)
+        validator = IntrospectionTokenValidator(guarded_settings)
+        for _ in range(2):
+            with pytest.raises(KeycloakUnavailable):
+                validator.validate("opaque")
+        with pytest.raises(CircuitOpen):
+            validator.validate("opaque")
+        assert route.call_count == 2
+
+        time.sleep(0.06)
+        route.respond(json={"active": True, "sub": "u", "exp": 4102444800})
+        assert validator.validate("opaque").sub == "u"
+        assert validator.guard.breaker.state == CLOSED
+        validator.close()
+
+    @respx.mock
+    @pytest.mark.parametrize("body", [b"<html>", b'"active"'])
+    async def test_malformed_introspection_counts_as_failure(
+        self, guarded_settings, body
+    ):
+        respx.post(guarded_settings.introspection_uri).respond(200, content=body)
+        sync_validator = IntrospectionTokenValidator(guarded_settings)
+        validator = AsyncIntrospectionTokenValidator(
+            guarded_settings, guard=sync_validator.guard
+        )
+        with pytest.raises(KeycloakUnavailable, match="Malformed"):
+            sync_validator.validate("opaque")
+        with pytest.raises(KeycloakUnavailable, match="Malformed"):
+            await validator.validate("opaque")
+        assert sync_validator.guard.breaker.state == OPEN
+        sync_validator.close()
+        await validator.aclose()
+
+    @respx.mock
+    async def test_async_introspection_shares_breaker(self, guarded_settings):
+        respx.post(guarded_settings.introspection_uri).respond(503)
+        sync_validator = IntrospectionTokenValidator(guarded_settings)
+        validator = AsyncIntrospectionTokenValidator(
+            guarded_settings, guard=sync_validator.guard
+        )
+        for _ in range(2):
+            with pytest.raises(KeycloakUnavailable):
+                await validator.validate("opaque")
+        with pytest.raises(CircuitOpen):
+            sync_validator.validate("opaque")
+        await validator.aclose()
+
+    def test_reconfigured_keeps_breaker(self, guarded_settings):
+        validator = IntrospectionTokenValidator(guarded_settings)
+        kept = validator.reconfigured(guarded_settings, frozenset({"introspect_after"}))
+        assert kept.guard is validator.guard
+        changed = validator.reconfigured(
+            guarded_settings.model_copy(update={"http_timeout": 1}),
+            frozenset({"http_timeout"}),
+        )
+        assert changed.guard is not validator.guard
+
+    @respx.mock
+    @pytest.mark.parametrize("fail_open", [False, True])
+    def test_tiered_fail_open(
+        self, guarded_settings, key_manager, make_token, fail_open
+    ):
+        respx.post(guarded_settings.introspection_uri).respond(503)
+        settings = guarded_settings.model_copy(
+            update={"introspection_fail_open": fail_open}
+        )
+        tiered = TieredTokenValidator(
+            settings,
+            offline=JWKSTokenValidator(settings, key_manager=key_manager),
+            policy=INTROSPECT_ALWAYS,
+        )
+        token = make_token()
+        if fail_open:
+            assert tiered.validate(token).sub == "user-123"
+        else:
+            with pytest.raises(KeycloakUnavailable):
+                tiered.validate(token)
+        with pytest.raises(KeycloakUnavailable):
+            tiered.confirm(token)  # explicit confirmation never fails open
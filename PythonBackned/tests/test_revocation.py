@@ -0,0 +1,246 @@
+"""Tests for the revocation list and back-channel logout."""
+
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from keycloak_auth import Authenticator, RevocationList, TokenClaims
+from keycloak_auth import revocation as revocation_module
+from keycloak_auth import jwks as jwks_module
+from keycloak_auth.backends import SharedMemoryBackend
+from keycloak_auth.exceptions import TokenInvalid, TokenRevoked
+from keycloak_auth.fastapi import (
+    create_auth_dependency,
+    register_auth_error_handlers,
+    register_backchannel_logout,
+)
+from keycloak_auth.models import TrustedTokenClaims
+from keycloak_auth.revocation import BACKCHANNEL_LOGOUT_EVENT, verify_logout_token
+from keycloak_auth.validators import AsyncJWKSTokenValidator, JWKSTokenValidator
+
+
+def _claims(**extra):
+    return TrustedTokenClaims({"sub": "user-1", "exp": 4102444800, **extra})
+
+
+@pytest.fixture()
+def revocations():
+    return RevocationList(ttl=60)
+
+
+@pytest.fixture()
+def logout_token(make_token, settings):
+    def _factory(**claims):
+        payload = {
+            "aud": settings.client_id,
+            "events": {BACKCHANNEL_LOGOUT_EVENT: {}},
+            "sid": "session-1",
+        }
+        payload.update(claims)
+        return make_token(payload)
+
+    return _factory
+
+
+class TestRevocationList:
+
+    def test_session(self, revocations):
+        revocations.revoke(sid="session-1")
+        assert revocations.is_revoked(_claims(sid="session-1"))
+        assert revocations.is_revoked(_claims(session_state="session-1"))
+        assert not revocations.is_revoked(_claims(sid="session-2"))
+        assert not revocations.is_revoked(_claims())
+
+    def test_token_id(self, revocations):
+        revocations.revoke(jti="abc")
+        assert revocations.is_revoked(_claims(jti="abc"))
+        assert not revocations.is_revoked(_claims(jti="abd"))
+
+    def test_subject_only_affects_earlier_tokens(self, revocations):
+        now = int(time.time())
+        revocations.revoke(sub="user-1")
+        assert revocations.is_revoked(_claims(iat=now - 10))
+        assert revocations.is_revoked(_claims())
+        assert not revocations.is_revoked(_claims(iat=now + 10))
+
+    def test_login_in_the_logout_second_stays_valid(self, revocations, monkeypatch):
+        monkeypatch.setattr(time, "time", lambda: 1000.7)
+        revocations.revoke(sub="user-1")
+        assert revocations.is_revoked(_claims(iat=999))
+        assert not revocations.is_revoked(_claims(iat=1000))
+
+    def test_entries_expire(self, revocations, monkeypatch):
+        revocations.revoke(sid="session-1")
+        later = time.time() + 61
+        monkeypatch.setattr(revocation_module.time, "time", lambda: later)
+        assert not revocations.is_revoked(_claims(sid="session-1"))
+        revocations.revoke(jti="other")
+        assert len(revocations) == 1  # the expired session was purged
+
+    def test_bounded(self):
+        revocations = RevocationList(ttl=60, max_entries=2)
+        for sid in ("a", "b", "c"):
+            revocations.revoke(sid=sid)
+        assert len(revocations) == 2
+        assert not revocations.is_revoked(_claims(sid="a"))
+        assert revocations.is_revoked(_claims(sid="c"))
+
+    def test_revoke_logout_prefers_session(self, revocations):
+        revocations.revoke_logout({"sid": "session-1", "sub": "user-1"})
+        assert not revocations.is_revoked(_claims(iat=0))
+        revocations.revoke_logout({"sub": "user-1"})
+        assert revocations.is_revoked(_claims(iat=0))
+
+    def test_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "revocations")
+        # Two processes map the same file through their own backend.
+        worker_a, worker_b = (
+            RevocationList(ttl=60, backend=SharedMemoryBackend(path, 64, 256))
+            for _ in range(2)
+        )
+        now = int(time.time())
+        worker_a.revoke(sid="session-1")
+        worker_a.revoke_logout({"sub": "user-2"})
+        assert worker_b.is_revoked(_claims(sid="session-1"))
+        assert not worker_b.is_revoked(_claims(sid="session-2"))
+        assert worker_b.is_revoked(
+            TrustedTokenClaims({"sub": "user-2", "exp": 4102444800, "iat": now - 5})
+        )
+        assert not worker_b.is_revoked(
+            TrustedTokenClaims({"sub": "user-2", "exp": 4102444800, "iat": now + 5})
+        )
+        assert len(worker_b) == 0  # nothing was copied locally
+
+    def test_from_settings_uses_cache_backend(self, settings, tmp_path):
+        assert RevocationList.from_settings(settings).backend is None
+        shared = settings.model_copy(update={
+            "cache_backend": "shared",
+            "shared_cache_path": str(tmp_path / "cache"),
+        })
+        first = RevocationList.from_settings(shared)
+        first.revoke(jti="abc")
+        assert RevocationList.from_settings(shared).is_revoked(_claims(jti="abc"))
+        other_realm = RevocationList.from_settings(shared.for_realm("other"))
+        assert not other_realm.is_revoked(_claims(jti="abc"))
+
+
+class TestValidator:
+
+    @pytest.fixture()
+    def jwks_validator(self, settings, key_manager, revocations):
+        settings = settings.model_copy(update={"token_cache_size": 10})
+        return JWKSTokenValidator(
+            settings, key_manager=key_manager, revocations=revocations
+        )
+
+    def test_rejects_revoked_session(self, jwks_validator, revocations, make_token):
+        token = make_token({"sid": "session-1"})
+        assert jwks_validator.validate(token).sub == "user-123"
+        revocations.revoke(sid="session-1")
+        with pytest.raises(TokenRevoked):
+            jwks_validator.validate(token)  # cache hit
+
+    def test_batch(self, jwks_validator, revocations, make_token):
+        tokens = [make_token({"sid": "session-1"}), make_token({"sid": "session-2"})]
+        revocations.revoke(sid="session-1")
+        first, second = jwks_validator.validate_many(tokens)
+        assert isinstance(first, TokenRevoked)
+        assert second.sub == "user-123"
+
+    async def test_async_cache_hit(self, jwks_validator, revocations, make_token):
+        validator = AsyncJWKSTokenValidator(
+            jwks_validator._settings, sync_validator=jwks_validator
+        )
+        token = make_token({"sid": "session-1"})
+        await validator.validate(token)
+        revocations.revoke(sid="session-1")
+        with pytest.raises(TokenRevoked):
+            await validator.validate(token)
+
+    def test_survives_reconfigure(self, jwks_validator, revocations):
+        changed = frozenset({"realm"})
+        new = jwks_validator.reconfigured(jwks_validator._settings, changed)
+        assert new.revocations is revocations
+
+
+class TestLogoutToken:
+
+    def test_valid(self, logout_token, key_manager, settings):
+        claims = verify_logout_token(logout_token(), key_manager, settings)
+        assert claims["sid"] == "session-1"
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            {"events": {}},
+            {"nonce": "n"},
+            {"aud": "another-client"},
+            {"iss": "http://evil/realms/testrealm"},
+        ],
+    )
+    def test_invalid(self, logout_token, key_manager, settings, claims):
+        with pytest.raises(TokenInvalid):
+            verify_logout_token(logout_token(**claims), key_manager, settings)
+
+
+@pytest.fixture()
+def client(settings, key_manager, revocations):
+    authenticator = Authenticator(
+        settings,
+        validator=JWKSTokenValidator(
+            settings, key_manager=key_manager, revocations=revocations
+        ),
+    )
+    app = FastAPI()
+    register_auth_error_handlers(app)
+    register_backchannel_logout(app, authenticator, revocations)
+    get_user = create_auth_dependency(authenticator)
+
+    @app.get("/profile")
+    async def profile(user: TokenClaims = Depends(get_user)):
+        return {"sub": user.sub}
+
+    return TestClient(app)
+
+
+class TestBackchannelLogoutEndpoint:
+
+    def test_logout_revokes_session(self, client, logout_token, make_token):
+        headers = {"Authorization": f"Bearer {make_token({'sid': 'session-1'})}"}
+        assert client.get("/profile", headers=headers).status_code == 200
+
+        resp = client.post("/backchannel-logout", data={"logout_token": logout_token()})
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == "no-store"
+
+        resp = client.get("/profile", headers=headers)
+        assert resp.status_code == 401
+        assert resp.json() == {"detail": "Token has been revoked"}
+
+    def test_missing_token(self, client):
+        resp = client.post("/backchannel-logout", data={})
+        assert resp.status_code == 400
+        assert resp.json()["error"] == "invalid_request"
+
+    def test_invalid_token(self, client, logout_token, revocations):
+        resp = client.post(
+            "/backchannel-logout", data={"logout_token": logout_token(events={})}
+        )
+        assert resp.status_code == 400
+        assert len(revocations) == 0
+
+    def test_authenticator_without_jwks_validator(
+        self, authenticator, logout_token, jwks_document, monkeypatch
+    ):
+        # A custom validator has no key manager; one is built on first use.
+        calls = []
+        monkeypatch.setattr(
+            jwks_module.PyJWKClient,
+            "fetch_data",
+            lambda client: calls.append(1) or jwks_document,
+        )
+        assert authenticator.verify_logout_token(logout_token())["sid"] == "session-1"
+        authenticator.verify_logout_token(logout_token())
+        assert len(calls) == 1
@@ -1,8 +1,16 @@
 """Tests for the sample app routes (kept lightweight — main logic tested elsewhere)."""
 
+import pickle
+
 import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
 
-from keycloak_auth.models import TokenClaims
+from keycloak_auth import Authenticator
+from keycloak_auth.exceptions import TokenInvalid
+from keycloak_auth.fastapi import create_auth_dependency
+from keycloak_auth.models import TokenClaims, TrustedTokenClaims
+from keycloak_auth.validators import JWKSTokenValidator
 
 
 class TestTokenClaimsModel:
@@ -40,3 +48,105 @@ class TestTokenClaimsModel:
         )
         assert claims.has_any_role({"viewer", "admin"})
         assert not claims.has_any_role({"admin", "editor"})
+
+
+class TestTrustedTokenClaims:
+
+    PAYLOAD = {
+        "sub": "u1",
+        "exp": 4102444800,
+        "preferred_username": "alice",
+        "scope": "openid profile",
+        "realm_access": {"roles": ["admin", "user"]},
+        "resource_access": {"app1": {"roles": ["editor"]}},
+    }
+
+    def test_same_api_as_token_claims(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        model = TokenClaims(**self.PAYLOAD, raw=self.PAYLOAD)
+        assert trusted.sub == model.sub
+        assert trusted.exp == model.exp
+        assert trusted.preferred_username == model.preferred_username
+        assert trusted.email is None and model.email is None
+        assert trusted.realm_roles == model.realm_roles
+        assert trusted.client_roles("app1") == model.client_roles("app1")
+        assert trusted.client_roles("missing") == model.client_roles("missing")
+        assert trusted.scopes == model.scopes
+        assert trusted.has_role("editor", client_id="app1")
+        assert trusted.has_any_role({"admin", "nobody"})
+        assert not trusted.has_any_role({"nobody"})
+
+    def test_sets_are_computed_once(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        assert trusted.realm_roles is trusted.realm_roles
+        assert trusted.scopes is trusted.scopes
+        assert trusted.client_roles("app1") is trusted.client_roles("app1")
+
+    def test_missing_required_claims(self):
+        with pytest.raises(TokenInvalid):
+            TrustedTokenClaims({"exp": 1})
+        with pytest.raises(TokenInvalid):
+            TrustedTokenClaims({"sub": "u1"})
+
+    def test_to_model_and_dump(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        assert trusted.to_model().sub == "u1"
+        model = TokenClaims(**self.PAYLOAD, raw=self.PAYLOAD)
+        assert trusted.model_dump() == model.model_dump()
+        assert trusted.model_dump_json() == model.model_dump_json()
+
+    def test_is_a_token_claims_model(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        assert isinstance(trusted, TokenClaims)
+        assert trusted.model_fields_set >= {"sub", "exp", "scope", "raw"}
+        assert "email" not in trusted.model_fields_set
+        assert TrustedTokenClaims(sub="u2", exp=1).sub == "u2"
+
+    def test_instances_share_no_state(self):
+        first = TrustedTokenClaims({"sub": "u1", "exp": 1})
+        second = TrustedTokenClaims({"sub": "u2", "exp": 2})
+        first.realm_access["roles"] = ["admin"]
+        assert second.realm_access == {}
+        assert "email" not in first.model_fields_set
+        assert second.realm_roles == frozenset()
+        assert first.realm_roles == {"admin"}
+
+    def test_model_copy_drops_cached_roles(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        assert trusted.realm_roles == {"admin", "user"}
+        clone = trusted.model_copy(update={"realm_access": {"roles": ["guest"]}})
+        assert isinstance(clone, TrustedTokenClaims)
+        assert clone.realm_roles == {"guest"}
+        assert trusted.realm_roles == {"admin", "user"}
+
+    def test_returned_from_route(self, settings, key_manager, make_token):
+        validator = JWKSTokenValidator(settings, key_manager=key_manager)
+        get_user = create_auth_dependency(
+            Authenticator(settings, validator=validator)
+        )
+        app = FastAPI()
+
+        @app.get("/me", response_model=TokenClaims)
+        async def me(user: TokenClaims = Depends(get_user)):
+            assert isinstance(user, TrustedTokenClaims)
+            return user
+
+        @app.get("/me/raw")
+        async def me_raw(user: TokenClaims = Depends(get_user)):
+            return user.model_copy(update={"email": None})
+
+        headers = {"Authorization": f"Bearer {make_token()}"}
+        with TestClient(app) as client:
+            body = client.get("/me", headers=headers).json()
+            assert body["sub"] == "user-123"
+            assert body["realm_access"] == {"roles": ["user"]}
+            assert "raw" not in body
+            body = client.get("/me/raw", headers=headers).json()
+            assert body["preferred_username"] == "testuser"
+            assert body["email"] is None
+
+    def test_pickle_round_trip(self):
+        trusted = TrustedTokenClaims(dict(self.PAYLOAD))
+        clone = pickle.loads(pickle.dumps(trusted))
+        assert clone == trusted
+        assert clone.realm_roles == {"admin", "user"}
@@ -0,0 +1,243 @@
+"""Tests for client-credentials service tokens."""
+
+import asyncio
+import dataclasses
+import threading
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+import respx
+
+from keycloak_auth import (
+    CircuitBreaker,
+    KeycloakGuard,
+    KeycloakSettings,
+    ServiceTokenProvider,
+)
+from keycloak_auth.exceptions import KeycloakUnavailable
+from keycloak_auth.metrics import InMemoryMetrics
+from keycloak_auth.resilience import OPEN
+
+
+@pytest.fixture()
+def service_settings() -> KeycloakSettings:
+    return KeycloakSettings(
+        server_url="http://kc:8080",
+        realm="testrealm",
+        client_id="svc",
+        client_secret="secret",
+    )
+
+
+def _issued():
+    """A token endpoint that hands out ``t1``, ``t2``, ... on each call."""
+    calls = []
+
+    def _respond(request):
+        calls.append(parse_qs(request.content.decode()))
+        return httpx.Response(
+            200, json={"access_token": f"t{len(calls)}", "expires_in": 300}
+        )
+
+    return calls, _respond
+
+
+def _age(provider, **fields):
+    """Move the cached token's deadlines into the past."""
+    provider._token = dataclasses.replace(provider.token, **fields)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestServiceTokenProvider:
+
+    def test_requires_secret(self, settings):
+        with pytest.raises(ValueError):
+            ServiceTokenProvider(settings)
+
+    def test_token_uri(self, service_settings):
+        assert service_settings.token_uri == (
+            "http://kc:8080/realms/testrealm/protocol/openid-connect/token"
+        )
+        assert service_settings.for_realm("other").token_uri.endswith(
+            "/realms/other/protocol/openid-connect/token"
+        )
+
+    @respx.mock
+    def test_token_is_cached(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        provider = ServiceTokenProvider(service_settings, scope="orders")
+        assert provider.get_token() == "t1"
+        assert provider.get_token() == "t1"
+        assert calls == [{
+            "grant_type": ["client_credentials"],
+            "client_id": ["svc"],
+            "client_secret": ["secret"],
+            "scope": ["orders"],
+        }]
+        assert provider.token.refresh_at == pytest.approx(
+            provider.token.expires_at - 30, abs=0.01
+        )
+        provider.close()
+
+    @respx.mock
+    def test_refreshes_in_background_before_expiry(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        provider = ServiceTokenProvider(service_settings)
+        provider.get_token()
+        _age(provider, refresh_at=0.0)
+        assert provider.get_token() == "t1"  # served while refreshing
+        _wait_for(lambda: provider.token.access_token == "t2")
+        assert provider.get_token() == "t2"
+        assert len(calls) == 2
+        provider.close()
+
+    @respx.mock
+    def test_expired_token_is_fetched_inline(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        provider = ServiceTokenProvider(service_settings)
+        provider.get_token()
+        _age(provider, refresh_at=0.0, expires_at=0.0)
+        assert provider.get_token() == "t2"
+        provider.invalidate("stale")
+        assert provider.get_token() == "t2"
+        provider.invalidate("t2")
+        assert provider.get_token() == "t3"
+        provider.close()
+
+    @respx.mock
+    def test_concurrent_fetches_coalesce(self, service_settings):
+        calls, respond = _issued()
+
+        def _slow(request):
+            time.sleep(0.1)
+            return respond(request)
+
+        respx.post(service_settings.token_uri).mock(side_effect=_slow)
+        provider = ServiceTokenProvider(service_settings)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(provider.get_token()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["t1"] * 5
+        assert len(calls) == 1
+        provider.close()
+
+    @respx.mock
+    def test_failed_refresh_keeps_valid_token(self, service_settings):
+        route = respx.post(service_settings.token_uri)
+        route.respond(json={"access_token": "t1", "expires_in": 300})
+        metrics = InMemoryMetrics()
+        provider = ServiceTokenProvider(service_settings, metrics=metrics)
+        provider.get_token()
+        route.respond(503)
+        _age(provider, refresh_at=0.0)
+        assert provider.get_token() == "t1"
+        _wait_for(lambda: not provider._refreshing)
+        assert route.call_count == 2
+        assert provider.get_token() == "t1"  # within retry_interval
+        assert route.call_count == 2
+        assert 'outcome="KeycloakUnavailable"' in metrics.render()
+
+        _age(provider, expires_at=0.0)
+        with pytest.raises(KeycloakUnavailable):
+            provider.get_token()
+        provider.close()
+
+    @respx.mock
+    @pytest.mark.parametrize("body", [
+        b'{"token": "x"}', b"<html>", b"[]",
+        b'{"access_token": 42, "expires_in": 300}',
+        b'{"access_token": ["t"], "expires_in": 300}',
+    ])
+    def test_malformed_response(self, service_settings, body):
+        respx.post(service_settings.token_uri).respond(200, content=body)
+        guard = KeycloakGuard(CircuitBreaker(1, 60))
+        provider = ServiceTokenProvider(service_settings, guard=guard)
+        with pytest.raises(KeycloakUnavailable, match="Malformed"):
+            provider.get_token()
+        assert guard.breaker.state == OPEN
+        provider.close()
+
+    @respx.mock
+    async def test_malformed_response_async(self, service_settings):
+        respx.post(service_settings.token_uri).respond(200, content=b"<html>")
+        guard = KeycloakGuard(CircuitBreaker(1, 60))
+        provider = ServiceTokenProvider(service_settings, guard=guard)
+        with pytest.raises(KeycloakUnavailable, match="Malformed"):
+            await provider.get_token_async()
+        assert guard.breaker.state == OPEN
+        await provider.aclose()
+
+    @respx.mock
+    def test_auth_retries_once_after_401(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        api = respx.get("http://orders/api").mock(side_effect=[
+            httpx.Response(401), httpx.Response(200),
+        ])
+        provider = ServiceTokenProvider(service_settings)
+        with httpx.Client(auth=provider.auth) as client:
+            assert client.get("http://orders/api").status_code == 200
+        assert [c.request.headers["Authorization"] for c in api.calls] == [
+            "Bearer t1", "Bearer t2",
+        ]
+        provider.close()
+
+
+class TestServiceTokenProviderAsync:
+
+    @respx.mock
+    async def test_concurrent_fetches_coalesce(self, service_settings):
+        calls, respond = _issued()
+
+        async def _slow(request):
+            await asyncio.sleep(0.05)
+            return respond(request)
+
+        respx.post(service_settings.token_uri).mock(side_effect=_slow)
+        provider = ServiceTokenProvider(service_settings)
+        tokens = await asyncio.gather(*(provider.get_token_async() for _ in range(5)))
+        assert tokens == ["t1"] * 5
+        assert len(calls) == 1
+        await provider.aclose()
+
+    @respx.mock
+    async def test_refreshes_in_background(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        provider = ServiceTokenProvider(service_settings)
+        await provider.get_token_async()
+        _age(provider, refresh_at=0.0)
+        assert await provider.get_token_async() == "t1"
+        await provider._refresh_task
+        assert await provider.get_token_async() == "t2"
+        await provider.aclose()
+
+    @respx.mock
+    async def test_auth_flow(self, service_settings):
+        calls, respond = _issued()
+        respx.post(service_settings.token_uri).mock(side_effect=respond)
+        api = respx.get("http://orders/api").respond(200)
+        provider = ServiceTokenProvider(service_settings)
+        async with httpx.AsyncClient(auth=provider.auth) as client:
+            await client.get("http://orders/api")
+            await client.get("http://orders/api")
+        assert api.calls.last.request.headers["Authorization"] == "Bearer t1"
+        assert len(calls) == 1
+        await provider.aclose()
@@ -0,0 +1,86 @@
+"""Tests for the request-coalescing helpers."""
+
+import asyncio
+import threading
+
+import pytest
+
+from keycloak_auth.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_followers_share_the_result(self):
+        flight = SingleFlight()
+        calls, release = [], threading.Event()
+
+        def _work():
+            calls.append(1)
+            release.wait(2)
+            return "done"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", _work)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        while not flight.in_flight("k"):
+            pass
+        release.set()
+        for t in threads:
+            t.join()
+        assert results == ["done"] * 4
+        assert not flight.in_flight("k")
+
+
+class TestAsyncSingleFlight:
+
+    async def test_followers_share_the_result(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def _work():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("k", _work) for _ in range(5)))
+        assert results == ["done"] * 5
+        assert calls == [1]
+        assert not flight.in_flight("k")
+
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = AsyncSingleFlight()
+        started = asyncio.Event()
+        calls = []
+
+        async def _work():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", _work))
+        await started.wait()
+        followers = [asyncio.create_task(flight.do("k", _work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await asyncio.gather(*followers) == ["done"] * 3
+        assert calls == [1]
+
+    async def test_followers_share_the_error(self):
+        flight = AsyncSingleFlight()
+
+        async def _fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("k", _fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert not flight.in_flight("k")
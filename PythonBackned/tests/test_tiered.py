@@ -0,0 +1,173 @@
+"""Tests for the tiered (JWKS + introspection) validator and per-route policy."""
+
+import time
+
+import pytest
+import respx
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from keycloak_auth import (
+    Authenticator,
+    IntrospectionPolicy,
+    TieredTokenValidator,
+    TokenClaims,
+)
+from keycloak_auth.exceptions import TokenInvalid
+from keycloak_auth.fastapi import (
+    create_auth_dependency,
+    register_auth_error_handlers,
+    require_roles,
+)
+from keycloak_auth.validators import INTROSPECT_ALWAYS, JWKSTokenValidator
+
+ACTIVE = {"active": True, "sub": "user-123", "exp": 4102444800}
+
+
+@pytest.fixture()
+def tiered_settings(settings):
+    return settings.model_copy(
+        update={"client_secret": "secret", "introspection_cache_ttl": 30}
+    )
+
+
+@pytest.fixture()
+def tiered(tiered_settings, key_manager):
+    def _factory(policy=None):
+        return TieredTokenValidator(
+            tiered_settings,
+            offline=JWKSTokenValidator(tiered_settings, key_manager=key_manager),
+            policy=policy,
+        )
+
+    return _factory
+
+
+@pytest.fixture()
+def introspection(tiered_settings):
+    with respx.mock:
+        yield respx.post(tiered_settings.introspection_uri).respond(json=ACTIVE)
+
+
+class TestIntrospectionPolicy:
+
+    def test_never_by_default(self, settings):
+        policy = IntrospectionPolicy.from_settings(settings)
+        assert policy.never
+        assert not policy.applies(TokenClaims(sub="u", exp=0))
+
+    def test_max_age(self):
+        policy = IntrospectionPolicy(max_age=60)
+        now = int(time.time())
+        assert not policy.applies(TokenClaims(sub="u", exp=0, iat=now))
+        assert policy.applies(TokenClaims(sub="u", exp=0, iat=now - 120))
+        assert policy.applies(TokenClaims(sub="u", exp=0))
+
+    def test_sampling(self, monkeypatch):
+        policy = IntrospectionPolicy(sample_rate=0.25)
+        claims = TokenClaims(sub="u", exp=0, iat=int(time.time()))
+        monkeypatch.setattr("random.random", lambda: 0.1)
+        assert policy.applies(claims)
+        monkeypatch.setattr("random.random", lambda: 0.9)
+        assert not policy.applies(claims)
+
+    def test_from_settings(self, settings):
+        settings = settings.model_copy(
+            update={"introspect_after": 300, "introspect_sample_rate": 0.5}
+        )
+        policy = IntrospectionPolicy.from_settings(settings)
+        assert policy == IntrospectionPolicy(max_age=300, sample_rate=0.5)
+
+
+class TestTieredTokenValidator:
+
+    def test_offline_only_by_default(self, tiered, introspection, make_token):
+        assert tiered().validate(make_token()).sub == "user-123"
+        assert introspection.call_count == 0
+
+    def test_policy_triggers_introspection(self, tiered, introspection, make_token):
+        validator = tiered(INTROSPECT_ALWAYS)
+        token = make_token()
+        validator.validate(token)
+        validator.validate(token)
+        assert introspection.call_count == 1  # verdict cached
+
+    def test_inactive_token_rejected(self, tiered, tiered_settings, make_token):
+        with respx.mock:
+            respx.post(tiered_settings.introspection_uri).respond(json={"active": False})
+            with pytest.raises(TokenInvalid):
+                tiered(INTROSPECT_ALWAYS).validate(make_token())
+
+    def test_offline_failure_skips_introspection(self, tiered, introspection, make_token):
+        with pytest.raises(TokenInvalid):
+            tiered(INTROSPECT_ALWAYS).validate(make_token({"iss": "http://evil"}))
+        assert introspection.call_count == 0
+
+    async def test_async_shares_introspection_cache(
+        self, tiered, tiered_settings, introspection, make_token
+    ):
+        auth = Authenticator(tiered_settings, validator=tiered(), executor="inline")
+        token = make_token()
+        claims = auth.authenticate(token)
+        assert auth.confirm(token, claims, INTROSPECT_ALWAYS)
+        assert await auth.confirm_async(token, claims, INTROSPECT_ALWAYS)
+        assert introspection.call_count == 1
+
+    def test_reconfigured_keeps_tiers(self, tiered):
+        validator = tiered()
+        new = validator.reconfigured(validator._settings, frozenset({"metrics_path"}))
+        assert new.offline.key_manager is validator.offline.key_manager
+        assert new.online.cache is validator.online.cache
+
+    def test_confirm_requires_online_tier(self, authenticator, make_token):
+        assert not authenticator.supports_introspection
+        with pytest.raises(ValueError):
+            authenticator.confirm(
+                make_token(), TokenClaims(sub="u", exp=0), INTROSPECT_ALWAYS
+            )
+
+
+@pytest.fixture()
+def client(tiered, tiered_settings):
+    authenticator = Authenticator(tiered_settings, validator=tiered())
+    app = FastAPI()
+    register_auth_error_handlers(app)
+    get_user = create_auth_dependency(authenticator)
+    get_fresh_user = create_auth_dependency(authenticator, introspect=True)
+
+    @app.get("/profile")
+    async def profile(user: TokenClaims = Depends(get_user)):
+        return {"sub": user.sub}
+
+    @app.get(
+        "/transfer",
+        dependencies=[Depends(require_roles(authenticator, {"user"}, introspect=True))],
+    )
+    async def transfer(user: TokenClaims = Depends(get_fresh_user)):
+        return {"sub": user.sub}
+
+    return TestClient(app)
+
+
+class TestRoutePolicy:
+
+    def test_regular_route_stays_offline(self, client, introspection, make_token):
+        headers = {"Authorization": f"Bearer {make_token()}"}
+        assert client.get("/profile", headers=headers).status_code == 200
+        assert introspection.call_count == 0
+
+    def test_sensitive_route_introspects_once(self, client, introspection, make_token):
+        headers = {"Authorization": f"Bearer {make_token()}"}
+        assert client.get("/transfer", headers=headers).status_code == 200
+        assert introspection.call_count == 1
+
+    def test_sensitive_route_rejects_inactive(self, client, tiered_settings, make_token):
+        headers = {"Authorization": f"Bearer {make_token()}"}
+        with respx.mock:
+            respx.post(tiered_settings.introspection_uri).respond(json={"active": False})
+            assert client.get("/transfer", headers=headers).status_code == 401
+            assert client.get("/profile", headers=headers).status_code == 200
+
+    def test_factory_rejects_offline_only_authenticator(self, authenticator):
+        with pytest.raises(ValueError):
+            create_auth_dependency(authenticator, introspect=True)
@@ -1,8 +1,33 @@
 """Tests for token validators."""
 
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import jwt
 import pytest
+import respx
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 
-from keycloak_auth.exceptions import TokenExpired, TokenInvalid
+from keycloak_auth import KeycloakSettings
+from keycloak_auth.cache import TokenCache
+from keycloak_auth.exceptions import (
+    KeycloakUnavailable,
+    SigningKeyNotFound,
+    TokenExpired,
+    TokenInvalid,
+)
+from keycloak_auth.executors import InlineExecutor
+from keycloak_auth.jwks import JWKSKeyManager
+from keycloak_auth.validators import (
+    AsyncIntrospectionTokenValidator,
+    AsyncJWKSTokenValidator,
+    IntrospectionTokenValidator,
+    JWKSTokenValidator,
+    ThreadedTokenValidator,
+)
 
 
 class TestDirectKeyValidator:
@@ -54,3 +79,282 @@ class TestDirectKeyValidator:
         claims = validator.validate(token)
         assert claims.realm_roles == {"user", "editor"}
         assert claims.scopes == {"openid", "profile"}
+
+
+class RecordingExecutor(InlineExecutor):
+    """Inline executor that counts how often work is offloaded."""
+
+    on_loop = False  # stands in for a pool
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, fn, *args):
+        self.calls += 1
+        return fn(*args)
+
+
+class TestAsyncValidators:
+
+    async def test_threaded_adapter(self, validator, make_token):
+        claims = await ThreadedTokenValidator(validator).validate(make_token())
+        assert claims.sub == "user-123"
+
+    async def test_threaded_adapter_propagates_errors(self, validator, make_token):
+        with pytest.raises(TokenExpired):
+            await ThreadedTokenValidator(validator).validate(make_token(expired=True))
+
+    async def test_async_jwks_validator(self, settings, key_manager, make_token):
+        async_validator = AsyncJWKSTokenValidator(settings, key_manager=key_manager)
+        claims = await async_validator.validate(make_token())
+        assert claims.sub == "user-123"
+
+    async def test_async_jwks_cache_hit_stays_on_loop(
+        self, settings, key_manager, make_token
+    ):
+        executor = RecordingExecutor()
+        async_validator = AsyncJWKSTokenValidator(
+            settings, key_manager=key_manager, token_cache=TokenCache(),
+            executor=executor,
+        )
+        token = make_token()
+        await async_validator.validate(token)
+        assert executor.calls == 1
+
+        claims = await async_validator.validate(token)
+        assert executor.calls == 1
+        assert claims.sub == "user-123"
+        assert key_manager.calls == 1
+
+
+@pytest.fixture()
+def introspection_settings():
+    return KeycloakSettings(
+        server_url="http://kc:8080",
+        realm="testrealm",
+        client_id="test-client",
+        client_secret="secret",
+        introspection_cache_ttl=30,
+    )
+
+
+ACTIVE = {"active": True, "sub": "user-1", "exp": 4102444800}
+
+
+class TestIntrospectionValidator:
+
+    @respx.mock
+    def test_active_result_is_cached(self, introspection_settings):
+        route = respx.post(introspection_settings.introspection_uri).respond(json=ACTIVE)
+        validator = IntrospectionTokenValidator(introspection_settings)
+        assert validator.validate("opaque").sub == "user-1"
+        assert validator.validate("opaque").sub == "user-1"
+        assert route.call_count == 1
+        validator.close()
+
+    @respx.mock
+    def test_cache_disabled_by_default(self):
+        settings = KeycloakSettings(
+            server_url="http://kc:8080", realm="r", client_id="c", client_secret="s",
+        )
+        route = respx.post(settings.introspection_uri).respond(json=ACTIVE)
+        validator = IntrospectionTokenValidator(settings)
+        validator.validate("opaque")
+        validator.validate("opaque")
+        assert route.call_count == 2
+        validator.close()
+
+    @respx.mock
+    def test_inactive_result_not_cached(self, introspection_settings):
+        route = respx.post(introspection_settings.introspection_uri).respond(
+            json={"active": False},
+        )
+        validator = IntrospectionTokenValidator(introspection_settings)
+        for _ in range(2):
+            with pytest.raises(TokenInvalid):
+                validator.validate("opaque")
+        assert route.call_count == 2
+        validator.close()
+
+    @respx.mock
+    def test_concurrent_calls_coalesce(self, introspection_settings):
+        def _slow(request):
+            time.sleep(0.1)
+            return httpx.Response(200, json=ACTIVE)
+
+        route = respx.post(introspection_settings.introspection_uri).mock(side_effect=_slow)
+        validator = IntrospectionTokenValidator(introspection_settings)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(validator.validate("opaque")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(results) == 5
+        assert route.call_count == 1
+        validator.close()
+
+    @respx.mock
+    def test_unreachable(self, introspection_settings):
+        respx.post(introspection_settings.introspection_uri).mock(
+            side_effect=httpx.ConnectError("down"),
+        )
+        validator = IntrospectionTokenValidator(introspection_settings)
+        with pytest.raises(KeycloakUnavailable):
+            validator.validate("opaque")
+        validator.close()
+
+
+class TestAsyncIntrospectionValidator:
+
+    @respx.mock
+    async def test_active_token(self, introspection_settings):
+        route = respx.post(introspection_settings.introspection_uri).respond(json=ACTIVE)
+        async_validator = AsyncIntrospectionTokenValidator(introspection_settings)
+        claims = await async_validator.validate("opaque")
+        assert claims.sub == "user-1"
+        await async_validator.validate("opaque")
+        assert route.call_count == 1
+        await async_validator.aclose()
+
+    @respx.mock
+    async def test_concurrent_calls_coalesce(self, introspection_settings):
+        async def _slow(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=ACTIVE)
+
+        route = respx.post(introspection_settings.introspection_uri).mock(side_effect=_slow)
+        async_validator = AsyncIntrospectionTokenValidator(introspection_settings)
+        results = await asyncio.gather(
+            *(async_validator.validate("opaque") for _ in range(5))
+        )
+        assert {c.sub for c in results} == {"user-1"}
+        assert route.call_count == 1
+        await async_validator.aclose()
+
+    @respx.mock
+    async def test_inactive_token(self, introspection_settings):
+        respx.post(introspection_settings.introspection_uri).respond(
+            json={"active": False},
+        )
+        async_validator = AsyncIntrospectionTokenValidator(introspection_settings)
+        with pytest.raises(TokenInvalid):
+            await async_validator.validate("opaque")
+        await async_validator.aclose()
+
+    @respx.mock
+    async def test_unreachable(self, introspection_settings):
+        respx.post(introspection_settings.introspection_uri).mock(
+            side_effect=httpx.ConnectError("down"),
+        )
+        async_validator = AsyncIntrospectionTokenValidator(introspection_settings)
+        with pytest.raises(KeycloakUnavailable):
+            await async_validator.validate("opaque")
+        await async_validator.aclose()
+
+
+class TestValidateMany:
+
+    def test_default_implementation_collects_errors(self, validator, make_token):
+        results = validator.validate_many(
+            [make_token(), make_token(expired=True), "garbage"]
+        )
+        assert results[0].sub == "user-123"
+        assert isinstance(results[1], TokenExpired)
+        assert isinstance(results[2], TokenInvalid)
+
+    def test_jwks_groups_by_kid(self, settings, key_manager, make_token):
+        validator = JWKSTokenValidator(settings, key_manager=key_manager)
+        tokens = [make_token({"sub": f"user-{i}"}) for i in range(8)]
+        tokens.append(make_token(headers={"kid": "unknown"}))
+        tokens.append(make_token(headers={"kid": "unknown"}))
+        tokens.append("not-a-jwt")
+
+        results = validator.validate_many(tokens)
+
+        assert [r.sub for r in results[:8]] == [f"user-{i}" for i in range(8)]
+        assert isinstance(results[8], SigningKeyNotFound)
+        assert isinstance(results[9], SigningKeyNotFound)
+        assert isinstance(results[10], TokenInvalid)
+        # One lookup for "test-key-1" and one for "unknown".
+        assert key_manager.calls == 2
+
+    def test_jwks_batch_uses_cache(self, settings, key_manager, make_token):
+        validator = JWKSTokenValidator(
+            settings, key_manager=key_manager, token_cache=TokenCache()
+        )
+        token = make_token()
+        validator.validate(token)
+        results = validator.validate_many([token, token])
+        assert all(r.sub == "user-123" for r in results)
+        assert key_manager.calls == 1
+
+
+@pytest.fixture(scope="module")
+def algorithm_keys():
+    return {
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+        "PS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    }
+
+
+@pytest.fixture(scope="module")
+def algorithm_jwks(algorithm_keys):
+    documents = []
+    for alg, private_key in algorithm_keys.items():
+        algorithm = jwt.get_algorithm_by_name(alg)
+        jwk = json.loads(algorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": f"{alg}-key", "alg": alg, "use": "sig"})
+        documents.append(jwk)
+    return {"keys": documents}
+
+
+class TestAlgorithms:
+    """Each JWKS key verifies with its own algorithm."""
+
+    def _validator(self, settings, jwks):
+        manager = JWKSKeyManager(settings)
+        manager._client.fetch_data = lambda: jwks
+        return JWKSTokenValidator(settings, key_manager=manager)
+
+    def _token(self, settings, private_key, alg, kid):
+        payload = {
+            "sub": "user-123",
+            "iss": settings.issuer,
+            "exp": int(time.time()) + 60,
+        }
+        return jwt.encode(payload, private_key, algorithm=alg, headers={"kid": kid})
+
+    @pytest.mark.parametrize("alg", ["ES256", "EdDSA", "PS256"])
+    def test_verifies_with_published_algorithm(
+        self, settings, algorithm_keys, algorithm_jwks, alg
+    ):
+        validator = self._validator(settings, algorithm_jwks)
+        token = self._token(settings, algorithm_keys[alg], alg, f"{alg}-key")
+        assert validator.validate(token).sub == "user-123"
+
+    def test_header_algorithm_must_match_key(
+        self, settings, algorithm_keys, algorithm_jwks
+    ):
+        validator = self._validator(settings, algorithm_jwks)
+        # PS256's key, but signed as RS256, which that JWK does not allow.
+        token = self._token(settings, algorithm_keys["PS256"], "RS256", "PS256-key")
+        with pytest.raises(TokenInvalid):
+            validator.validate(token)
+
+    def test_keys_outside_allowed_algorithms_are_ignored(
+        self, algorithm_keys, algorithm_jwks
+    ):
+        settings = KeycloakSettings(realm="testrealm", algorithms=["ES256"])
+        validator = self._validator(settings, algorithm_jwks)
+
+        es256 = self._token(settings, algorithm_keys["ES256"], "ES256", "ES256-key")
+        eddsa = self._token(settings, algorithm_keys["EdDSA"], "EdDSA", "EdDSA-key")
+
+        assert validator.validate(es256).sub == "user-123"
+        with pytest.raises(SigningKeyNotFound):
+            validator.validate(eddsa)